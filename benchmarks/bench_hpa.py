@@ -0,0 +1,73 @@
+"""Compare HierarchicalPathfinder queries with plain A* on a large hex map.
+
+Run: python benchmarks/bench_hpa.py [--radius N] [--queries N]
+Routes run between opposite edges of the map, like warehouse-to-front trips.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from board.map import Map  # noqa: E402
+from board.hpa import HierarchicalPathfinder  # noqa: E402
+from board.pathfinding import find_path  # noqa: E402
+
+
+def build(radius: int, seed: int) -> Map:
+    rnd = random.Random(seed)
+    m = Map()
+    for q in range(-radius, radius + 1):
+        for r in range(max(-radius, -q - radius), min(radius, -q + radius) + 1):
+            # scatter impassable holes and some upgraded roads
+            if rnd.random() < 0.1:
+                continue
+            h = m.add_hex(q, r)
+            h.road_upgraded = rnd.random() < 0.3
+    return m
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--radius", type=int, default=100)
+    ap.add_argument("--queries", type=int, default=20)
+    ap.add_argument("--cluster-size", type=int, default=10)
+    ap.add_argument("--entrance-width", type=int, default=5)
+    args = ap.parse_args()
+
+    m = build(args.radius, seed=1)
+    rnd = random.Random(2)
+    west = [(h.q, h.r) for h in m.hexes() if h.q <= -args.radius + 5]
+    east = [(h.q, h.r) for h in m.hexes() if h.q >= args.radius - 5]
+    queries = [(rnd.choice(west), rnd.choice(east)) for _ in range(args.queries)]
+
+    t0 = time.perf_counter()
+    hpa = HierarchicalPathfinder(m, cluster_size=args.cluster_size, entrance_width=args.entrance_width)
+    t_build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    ref = [find_path(m, s, g) for s, g in queries]
+    t_astar = time.perf_counter() - t0
+
+    # first pass also fills the lazily computed chunk edges
+    t0 = time.perf_counter()
+    got = [hpa.find_path(s, g) for s, g in queries]
+    t_cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = [hpa.find_path(s, g) for s, g in queries]
+    t_warm = time.perf_counter() - t0
+
+    pairs = [(a, b) for a, b in zip(ref, got) if a is not None]
+    excess = sum(b["cost"] - a["cost"] for a, b in pairs) / max(1, sum(a["cost"] for a, _ in pairs))
+    n = len(queries)
+    print(f"tiles={len(m)} queries={n} build={t_build:.2f}s")
+    print(f"A*         {t_astar / n * 1e3:8.1f} ms/query")
+    print(f"HPA* cold  {t_cold / n * 1e3:8.1f} ms/query")
+    print(f"HPA* warm  {t_warm / n * 1e3:8.1f} ms/query  speedup x{t_astar / t_warm:.1f}")
+    print(f"HPA* total cost excess over optimal: {excess * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
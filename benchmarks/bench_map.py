@@ -0,0 +1,78 @@
+"""Compare the dict-backed Map with the array-backed ArrayMap.
+
+Run: python benchmarks/bench_map.py [--radius N]
+Reports memory held by each backend and get_hex/neighbors/find_path timings.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from board.map import Map, ArrayMap  # noqa: E402
+from board.pathfinding import find_path  # noqa: E402
+
+
+def build(board_map, radius: int):
+    for q in range(-radius, radius + 1):
+        for r in range(max(-radius, -q - radius), min(radius, -q + radius) + 1):
+            board_map.add_hex(q, r)
+    return board_map
+
+
+def measure_memory(factory, radius: int):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    m = build(factory(), radius)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return m, after - before
+
+
+def time_it(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--radius", type=int, default=180, help="hex map radius (180 -> ~97k tiles)")
+    args = ap.parse_args()
+    radius = args.radius
+
+    backends = [
+        ("dict", Map),
+        ("array", lambda: ArrayMap(-radius, radius, -radius, radius)),
+    ]
+    coords = [(q, r) for q in range(-radius, radius + 1, 3) for r in range(-radius, radius + 1, 3)]
+    start = (-radius + 1, 0)
+    goal = (radius - 1, 0)
+
+    print(f"radius={radius}")
+    for name, factory in backends:
+        m, mem = measure_memory(factory, radius)
+
+        def lookups():
+            for q, r in coords:
+                m.get_hex(q, r)
+
+        def neighbor_scan():
+            for q, r in coords:
+                m.neighbors(q, r)
+
+        t_get = time_it(lookups)
+        t_nb = time_it(neighbor_scan)
+        t_path = time_it(lambda: find_path(m, start, goal), repeat=1)
+        print(f"{name:6s} tiles={len(m):7d} memory={mem / 1e6:8.2f} MB "
+              f"({mem / len(m):6.1f} B/tile) get_hex={t_get / len(coords) * 1e9:7.1f} ns "
+              f"neighbors={t_nb / len(coords) * 1e9:7.1f} ns find_path={t_path * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
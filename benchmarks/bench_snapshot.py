@@ -0,0 +1,69 @@
+"""Compare GameEngine.snapshot/restore and push/pop with copy.deepcopy of the engine.
+
+Run: python benchmarks/bench_snapshot.py [--iterations N]
+The engine is a standard game a few rounds in, with one road upgrade
+underway, so snapshots carry non-trivial cargo and map state.
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from board import scenario  # noqa: E402
+from board.engineering import start_upgrade  # noqa: E402
+from board.entities import Engineer  # noqa: E402
+from board.game_engine import GameEngine  # noqa: E402
+from board.sim import SupplyPolicy  # noqa: E402
+
+
+def build() -> GameEngine:
+    board_map, players = scenario.standard_game()
+    rng = random.Random(1)
+    engine = GameEngine(board_map, players, rng=rng.random)
+    policies = {pid: SupplyPolicy() for pid in players}
+    for _ in range(3):
+        for pid, policy in policies.items():
+            policy(engine, pid, rng)
+        engine.run_round()
+    start_upgrade(board_map, Engineer(id="e1", owner_id="p1", position=(2, -2)), 2, -2)
+    return engine
+
+
+def timed(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iterations", type=int, default=2000)
+    args = ap.parse_args()
+    n = args.iterations
+
+    engine = build()
+    snap = engine.snapshot()
+
+    snap_us = timed(engine.snapshot, n)
+    restore_us = timed(lambda: engine.restore(snap), n)
+    deep_us = timed(lambda: copy.deepcopy(engine), max(1, n // 10))
+
+    def push_pop():
+        engine.push(("food",))
+        engine.pop()
+
+    push_us = timed(push_pop, n)
+    print(f"snapshot():          {snap_us:8.1f} us")
+    print(f"restore():           {restore_us:8.1f} us")
+    print(f"snapshot+restore:    {snap_us + restore_us:8.1f} us")
+    print(f"push+pop (food):     {push_us:8.1f} us")
+    print(f"copy.deepcopy:       {deep_us:8.1f} us  ({deep_us / (snap_us + restore_us):.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Exact attrition model: win odds and game length without sampling.
+
+Models the fight at the frontline as a Markov chain over (own soldiers,
+enemy soldiers, own ammo, own food). Each round follows
+`GameEngine.run_round`:
+
+1. both sides attack (in queue order, own side first by default): own
+   side with min(soldiers, ammo), the enemy with all its soldiers. Each
+   attack succeeds with `success_probability`, dealing
+   max(1, floor(0.4 * n)) damage, or fails and loses floor(0.1 * n);
+2. own side eats one food per soldier and loses max(1, soldiers // 10)
+   when food runs out.
+
+The enemy is assumed fully supplied and nobody is resupplied, i.e. the
+odds of a side that stops delivering against one that never runs short.
+The chain is absorbing (counts never grow), so one pass over the states
+in increasing order solves it exactly.
+
+    table = solve(20, 20, 20, 20)
+    table.win_probability(12, 9, 10, 30)
+    table.save("attrition.npz")
+
+Full positions (trucks on the road, upgrades pending) are estimated by
+`estimate_win_probability`, which plays the game out from the engine's
+state with scripted policies, in parallel, until a Wilson interval is
+tight enough.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .combat import success_probability
+from .game_engine import GameEngine
+from .rng import RngService
+from .sim import MAX_ROUNDS, PolicySpec, _make_policy, game_seed, play_out
+
+
+State = Tuple[int, int, int, int]
+
+
+def _attack(n: int, defenders: int):
+    """[(p, damage, attacker loss)] for an attack by n soldiers."""
+    if n <= 0:
+        return [(1.0, 0, 0)]
+    p = success_probability(n, defenders)
+    out = [(p, max(1, math.floor(n * 0.4)), 0)]
+    if p < 1.0:
+        out.append((1.0 - p, 0, math.floor(n * 0.1)))
+    return out
+
+
+def transitions(state: State, own_first: bool = True) -> Dict[State, float]:
+    """Distribution of the state after one round from a non-terminal `state`."""
+    a0, b0, ammo0, food0 = state
+    dist: Dict[State, float] = {}
+
+    def own_attack(p, a, b, ammo, then):
+        n = min(a, ammo)
+        for q, dmg, loss in _attack(n, b):
+            then(p * q, a - loss, max(0, b - dmg), ammo - n)
+
+    def enemy_attack(p, a, b, ammo, then):
+        for q, dmg, loss in _attack(b, a):
+            then(p * q, max(0, a - dmg), b - loss, ammo)
+
+    def food(p, a, b, ammo):
+        f = food0
+        if f >= a:
+            f -= a
+        else:
+            f = 0
+            if a > 0:
+                a -= max(1, a // 10)
+        s = (a, b, ammo, f)
+        dist[s] = dist.get(s, 0.0) + p
+
+    if own_first:
+        own_attack(1.0, a0, b0, ammo0, lambda p, a, b, m: enemy_attack(p, a, b, m, food))
+    else:
+        enemy_attack(1.0, a0, b0, ammo0, lambda p, a, b, m: own_attack(p, a, b, m, food))
+    return dist
+
+
+@dataclass
+class AttritionTable:
+    """Solved values for every state up to the table's shape, indexed [own, enemy, ammo, food]."""
+
+    win: np.ndarray
+    draw: np.ndarray
+    rounds: np.ndarray
+    own_first: bool = True
+
+    @property
+    def shape(self) -> Tuple[int, int, int, int]:
+        return self.win.shape
+
+    def covers(self, state: State) -> bool:
+        return all(0 <= s < n for s, n in zip(state, self.shape))
+
+    def win_probability(self, own: int, enemy: int, ammo: int, food: int) -> float:
+        return float(self.win[own, enemy, ammo, food])
+
+    def loss_probability(self, own: int, enemy: int, ammo: int, food: int) -> float:
+        return float(1.0 - self.win[own, enemy, ammo, food] - self.draw[own, enemy, ammo, food])
+
+    def expected_rounds(self, own: int, enemy: int, ammo: int, food: int) -> float:
+        """Expected rounds until one or both sides are wiped out."""
+        return float(self.rounds[own, enemy, ammo, food])
+
+    def save(self, path: str) -> None:
+        np.savez(path, win=self.win, draw=self.draw, rounds=self.rounds, own_first=self.own_first)
+
+    @classmethod
+    def load(cls, path: str) -> "AttritionTable":
+        with np.load(path) as data:
+            return cls(win=data["win"], draw=data["draw"], rounds=data["rounds"],
+                       own_first=bool(data["own_first"]))
+
+
+def solve(max_own: int, max_enemy: int, max_ammo: int, max_food: int,
+          own_first: bool = True) -> AttritionTable:
+    """Solve every state with counts up to the given maxima (inclusive)."""
+    shape = (max_own + 1, max_enemy + 1, max_ammo + 1, max_food + 1)
+    win = np.zeros(shape)
+    draw = np.zeros(shape)
+    rounds = np.zeros(shape)
+    win[1:, 0] = 1.0
+    draw[0, 0] = 1.0
+    for a in range(1, shape[0]):
+        for b in range(1, shape[1]):
+            for m in range(shape[2]):
+                for f in range(shape[3]):
+                    s = (a, b, m, f)
+                    stay = 0.0
+                    w = d = r = 0.0
+                    for nxt, p in transitions(s, own_first).items():
+                        if nxt == s:
+                            stay += p
+                            continue
+                        w += p * win[nxt]
+                        d += p * draw[nxt]
+                        r += p * rounds[nxt]
+                    # a round that changes nothing is repeated until it does
+                    go = 1.0 - stay
+                    win[s] = w / go
+                    draw[s] = d / go
+                    rounds[s] = (1.0 + r) / go
+    return AttritionTable(win=win, draw=draw, rounds=rounds, own_first=own_first)
+
+
+_table: Dict[bool, AttritionTable] = {}
+
+
+def lookup(state: State, own_first: bool = True) -> AttritionTable:
+    """Memoized table covering `state`, grown (re-solved) when a state falls outside it."""
+    table = _table.get(own_first)
+    if table is None or not table.covers(state):
+        bounds = state if table is None else np.maximum(state, np.array(table.shape) - 1)
+        table = _table[own_first] = solve(*(int(x) for x in bounds), own_first=own_first)
+    return table
+
+
+def use_table(table: AttritionTable) -> None:
+    """Make a loaded table the one `lookup` answers from."""
+    _table[table.own_first] = table
+
+
+def win_probability(own: int, enemy: int, ammo: int, food: int, own_first: bool = True) -> float:
+    return lookup((own, enemy, ammo, food), own_first).win_probability(own, enemy, ammo, food)
+
+
+def expected_rounds(own: int, enemy: int, ammo: int, food: int, own_first: bool = True) -> float:
+    return lookup((own, enemy, ammo, food), own_first).expected_rounds(own, enemy, ammo, food)
+
+
+# ----- Monte Carlo estimates -----
+@dataclass
+class WinEstimate:
+    probability: float
+    # Wilson score interval at the requested confidence
+    low: float
+    high: float
+    playouts: int
+    wins: int
+    draws: int
+
+
+def wilson_interval(wins: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = wins / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _run_playouts(engine: GameEngine, player_id: str, seeds: Sequence[int],
+                  policies: Sequence[PolicySpec], max_rounds: int) -> Tuple[int, int]:
+    """(wins, draws) for `player_id` over one playout per seed; the engine is restored after each."""
+    snap = engine.snapshot()
+    game_rng, game_rngs = engine.rng, engine.rngs
+    wins = draws = 0
+    try:
+        with engine.offline():
+            for seed in seeds:
+                service = RngService(seed)
+                engine.rng, engine.rngs = None, service
+                agents = {pid: _make_policy(spec) for pid, spec in zip(engine.players, policies)}
+                rngs = {pid: service.random("policy", pid) for pid in engine.players}
+                winner, _, _ = play_out(engine, agents, rngs, max_rounds)
+                wins += winner == player_id
+                draws += winner is None
+                engine.restore(snap)
+    finally:
+        engine.rng, engine.rngs = game_rng, game_rngs
+    return wins, draws
+
+
+def _playout_worker(board_map, players, snap, player_id: str, seeds: List[int],
+                    policies: Sequence[PolicySpec], max_rounds: int) -> Tuple[int, int]:
+    engine = GameEngine(board_map, players)
+    engine.restore(snap)
+    return _run_playouts(engine, player_id, seeds, policies, max_rounds)
+
+
+def estimate_win_probability(engine: GameEngine, n_playouts: int = 10000, workers: Optional[int] = None,
+                             player_id: Optional[str] = None,
+                             policies: Sequence[PolicySpec] = ("supply", "supply"), seed: int = 0,
+                             tolerance: float = 0.01, confidence: float = 0.95,
+                             max_rounds: int = MAX_ROUNDS, chunk_size: int = 100) -> WinEstimate:
+    """Monte Carlo odds that `player_id` (default: first player) wins from the engine's state.
+
+    Plays up to `n_playouts` games from the current state, starting with a
+    fresh round, with one policy per player. Playouts run in chunks of
+    `chunk_size` over `workers` processes (1: in this process) and stop
+    early once the Wilson interval's half-width is at most `tolerance`.
+    Chunks are counted in order, so the result depends only on `seed`,
+    never on the worker count. The engine is left unchanged.
+    """
+    player_id = player_id or next(iter(engine.players))
+    chunks = [[game_seed(seed, i) for i in range(start, min(start + chunk_size, n_playouts))]
+              for start in range(0, n_playouts, chunk_size)]
+    wins = draws = n = 0
+
+    def done() -> bool:
+        low, high = wilson_interval(wins, n, confidence)
+        return n > 0 and (high - low) / 2 <= tolerance
+
+    if workers is None or workers <= 1:
+        for seeds in chunks:
+            w, d = _run_playouts(engine, player_id, seeds, policies, max_rounds)
+            wins, draws, n = wins + w, draws + d, n + len(seeds)
+            if done():
+                break
+    else:
+        snap = engine.snapshot()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            todo = iter(chunks)
+
+            def submit() -> None:
+                seeds = next(todo, None)
+                if seeds is not None:
+                    futures.append((len(seeds), pool.submit(_playout_worker, engine.map, engine.players,
+                                                            snap, player_id, seeds, policies, max_rounds)))
+
+            for _ in range(workers * 2):
+                submit()
+            i = 0
+            while i < len(futures):
+                size, fut = futures[i]
+                w, d = fut.result()
+                wins, draws, n = wins + w, draws + d, n + size
+                i += 1
+                if done():
+                    for _, f in futures[i:]:
+                        f.cancel()
+                    break
+                submit()
+    low, high = wilson_interval(wins, n, confidence)
+    return WinEstimate(probability=wins / n if n else 0.0, low=low, high=high, playouts=n,
+                       wins=wins, draws=draws)
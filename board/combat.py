@@ -1,6 +1,8 @@
 import math
 import random
-from typing import Callable, Dict
+from typing import Callable, Dict, Tuple, Union
+
+import numpy as np
 
 
 def clamp(x: float, lo: float, hi: float) -> float:
@@ -63,3 +65,65 @@ def resolve_attack(attacking_soldiers: int, defending_soldiers: int, ammo_availa
         "prob": prob,
         "roll": roll,
     }
+
+
+# ----- batches -----
+def success_probability_batch(attacking, defending) -> np.ndarray:
+    """Vectorized `success_probability` over arrays of soldier counts."""
+    a = np.asarray(attacking, dtype=np.float64)
+    d = np.asarray(defending, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.clip(0.5 + 0.15 * (a / d - 1), 0.05, 0.95)
+    return np.where(d <= 0, 1.0, p)
+
+
+def resolve_attacks_batch(attacking, defending, ammo, *, damage_ratio: float = 0.4,
+                          rng: Union[None, int, np.random.Generator] = None) -> Dict[str, np.ndarray]:
+    """Resolve many attacks at once with the rules of `resolve_attack`.
+
+    `attacking`, `defending` and `ammo` are equal-length integer arrays (or
+    scalars, broadcast). `rng` is a NumPy Generator or a seed for
+    `np.random.default_rng`; one roll is drawn per attack, including ones
+    without participants, so a given seed always gives the same results
+    element for element. Returns arrays under the same keys as
+    `resolve_attack`.
+    """
+    if not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+    attacking, defending, ammo = np.broadcast_arrays(
+        np.asarray(attacking, dtype=np.int64), np.asarray(defending, dtype=np.int64),
+        np.asarray(ammo, dtype=np.int64))
+    participating = np.maximum(np.minimum(attacking, ammo), 0)
+    active = participating > 0
+    prob = np.where(active, success_probability_batch(participating, defending), 0.0)
+    roll = rng.random(participating.shape)
+    success = active & (roll < prob)
+    damage = np.where(success, np.maximum(1, np.floor(participating * damage_ratio)), 0).astype(np.int64)
+    attacker_loss = np.where(active & ~success, np.floor(participating * 0.1), 0).astype(np.int64)
+    return {
+        "participating": participating,
+        "ammo_used": participating.copy(),
+        "success": success,
+        "damage": damage,
+        "attacker_loss": attacker_loss,
+        "prob": prob,
+        "roll": roll,
+    }
+
+
+def outcome_distribution(attacking_soldiers: int, defending_soldiers: int, ammo_available: int, *,
+                         damage_ratio: float = 0.4) -> Dict[Tuple[int, int], float]:
+    """Exact distribution of an attack's outcome, without sampling.
+
+    Maps (damage, attacker_loss) to its probability under `resolve_attack`.
+    """
+    participating = min(attacking_soldiers, ammo_available)
+    if participating <= 0:
+        return {(0, 0): 1.0}
+    prob = success_probability(participating, defending_soldiers)
+    dist: Dict[Tuple[int, int], float] = {}
+    for outcome, p in (((max(1, math.floor(participating * damage_ratio)), 0), prob),
+                       ((0, math.floor(participating * 0.1)), 1.0 - prob)):
+        if p > 0:
+            dist[outcome] = dist.get(outcome, 0.0) + p
+    return dist
@@ -0,0 +1,169 @@
+"""Cooperative routing of many trucks under a per-hex stacking limit.
+
+Routes are planned one truck at a time with a space-time A* search against
+a reservation table of (hex, tick) occupancy counts left by the trucks
+planned before it. Time is measured in MP: entering a hex of cost c takes
+c ticks, during which the truck still occupies the hex it is leaving, and
+a truck may wait in place for a tick. A truck that arrives stays parked on
+its goal. No hex ever holds more than `stack_limit` trucks at any tick.
+
+Changing one truck's route only releases and replans that truck; all other
+reservations stay as they are.
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from .map import Map
+from .pathfinding import Coord, DistanceField, FRONTLINE, neighbors
+from . import rules
+
+
+class CooperativePlanner:
+    def __init__(self, board_map: Map, stack_limit: int = rules.TRUCK_STACK_LIMIT, horizon: int = 256):
+        self.map = board_map
+        self.stack_limit = stack_limit
+        self.horizon = horizon
+        self._table: Dict[Tuple[Coord, int], int] = {}
+        # hex -> arrival ticks of trucks parked there for good
+        self._parked: Dict[Coord, List[int]] = {}
+        # hex -> last tick with a table reservation (never lowered; only bounds loops)
+        self._last_tick: Dict[Coord, int] = {}
+        self._routes: Dict[str, Dict] = {}
+        self._fields: Dict[Coord, DistanceField] = {}
+
+    # ----- reservation table -----
+    def occupancy(self, coord: Coord, tick: int) -> int:
+        """Number of trucks on `coord` at `tick`."""
+        parked = sum(1 for t in self._parked.get(coord, ()) if t <= tick)
+        return self._table.get((coord, tick), 0) + parked
+
+    def _free(self, coord: Coord, tick: int) -> bool:
+        return self.occupancy(coord, tick) < self.stack_limit
+
+    def _can_park(self, coord: Coord, tick: int) -> bool:
+        parked = self._parked.get(coord, ())
+        if len(parked) >= self.stack_limit:
+            return False
+        last = max(self._last_tick.get(coord, -1), max(parked, default=-1))
+        return all(self._free(coord, t) for t in range(tick, last + 1))
+
+    def _reserve(self, truck_id: str, schedule: List[Tuple[Coord, int]]) -> None:
+        cells = []
+        for (coord, arrive), (_, leave) in zip(schedule, schedule[1:]):
+            for t in range(arrive, leave):
+                cells.append((coord, t))
+        for key in cells:
+            self._table[key] = self._table.get(key, 0) + 1
+            coord, t = key
+            if t > self._last_tick.get(coord, -1):
+                self._last_tick[coord] = t
+        goal, arrival = schedule[-1]
+        self._parked.setdefault(goal, []).append(arrival)
+        self._routes[truck_id] = {"cells": cells, "park": (goal, arrival), "schedule": schedule}
+
+    def release(self, truck_id: str) -> None:
+        """Drop every reservation held by `truck_id`."""
+        route = self._routes.pop(truck_id, None)
+        if route is None:
+            return
+        for key in route["cells"]:
+            n = self._table[key] - 1
+            if n:
+                self._table[key] = n
+            else:
+                del self._table[key]
+        goal, arrival = route["park"]
+        self._parked[goal].remove(arrival)
+
+    def hold(self, truck_id: str, coord: Coord) -> None:
+        """Register a truck that stays on `coord` (e.g. it is not moving this turn)."""
+        self.release(truck_id)
+        self._reserve(truck_id, [(coord, 0)])
+
+    # ----- planning -----
+    def _field(self, goal: Coord) -> DistanceField:
+        field = self._fields.get(goal)
+        if field is None:
+            field = self._fields[goal] = DistanceField(self.map, [goal])
+        return field
+
+    def plan(self, truck_id: str, start: Coord, goal: Coord) -> Optional[Dict]:
+        """Route `truck_id` around existing reservations and reserve the result.
+
+        Returns a dict with 'path' (hexes entered in order, start first),
+        'cost' (MP spent) and 'schedule' ([(hex, arrival tick), ...]), or None
+        if no conflict-free route exists within the horizon; the truck then
+        holds its start hex.
+        """
+        self.release(truck_id)
+        field = self._field(goal)
+        h0 = field.cost_from(start)
+        if h0 is None or len(self._parked.get(goal, ())) >= self.stack_limit:
+            # unreachable, or the goal is already full for good
+            self._reserve(truck_id, [(start, 0)])
+            return None
+
+        # states are (hex, tick); g is MP spent, the key orders by arrival tick
+        best: Dict[Tuple[Coord, int], int] = {(start, 0): 0}
+        came_from: Dict[Tuple[Coord, int], Optional[Tuple[Coord, int]]] = {(start, 0): None}
+        frontier = [(h0, 0, 0, start)]
+        found = None
+        costs = self.map.cost_table()
+        while frontier:
+            _, t, mp, x = heapq.heappop(frontier)
+            state = (x, t)
+            if mp > best[state]:
+                continue
+            if x == goal and self._can_park(x, t):
+                found = state
+                break
+            if t >= self.horizon:
+                continue
+            # wait one tick
+            succ = []
+            if self._free(x, t + 1):
+                succ.append((x, t + 1, mp))
+            for y in neighbors(x):
+                c = costs.get(y)
+                if c is None or y == FRONTLINE:
+                    continue
+                if all(self._free(x, t + k) for k in range(1, c)) and self._free(y, t + c):
+                    succ.append((y, t + c, mp + c))
+            for y, ty, my in succ:
+                if ty > self.horizon:
+                    continue
+                hy = field.cost_from(y)
+                if hy is None:
+                    continue
+                key = (y, ty)
+                if key not in best or my < best[key]:
+                    best[key] = my
+                    came_from[key] = state
+                    heapq.heappush(frontier, (ty + hy, ty, my, y))
+
+        if found is None:
+            self._reserve(truck_id, [(start, 0)])
+            return None
+
+        states = []
+        cur: Optional[Tuple[Coord, int]] = found
+        while cur is not None:
+            states.append(cur)
+            cur = came_from[cur]
+        states.reverse()
+        # collapse waits into a single (hex, arrival) entry
+        schedule = [states[0]]
+        for coord, t in states[1:]:
+            if coord != schedule[-1][0]:
+                schedule.append((coord, t))
+        self._reserve(truck_id, schedule)
+        return {"path": [c for c, _ in schedule], "cost": best[found], "schedule": schedule}
+
+    def plan_all(self, requests: Dict[str, Tuple[Coord, Coord]]) -> Dict[str, Optional[Dict]]:
+        """Plan several trucks in order; earlier trucks get priority."""
+        return {tid: self.plan(tid, start, goal) for tid, (start, goal) in requests.items()}
+
+    def schedule(self, truck_id: str) -> Optional[List[Tuple[Coord, int]]]:
+        """[(hex, arrival tick), ...] currently reserved for `truck_id`."""
+        r = self._routes.get(truck_id)
+        return None if r is None else r["schedule"]
@@ -0,0 +1,46 @@
+"""Axial hex coordinates.
+
+`Coord` is a (q, r) named tuple, so it compares and hashes like the plain
+tuples used for map keys and paths and can be mixed with them freely.
+Entity positions hold interned Coords from `coord()`; the "q,r" string
+form only appears at I/O boundaries (CLI input, labels, save files) via
+`parse_coord` and `format_coord`.
+"""
+from typing import Dict, NamedTuple, Tuple, Union
+
+
+class Coord(NamedTuple):
+    q: int
+    r: int
+
+    def __str__(self) -> str:
+        return f"{self.q},{self.r}"
+
+
+_interned: Dict[Tuple[int, int], Coord] = {}
+
+
+def coord(q: int, r: int) -> Coord:
+    """Shared Coord instance for (q, r)."""
+    key = (q, r)
+    c = _interned.get(key)
+    if c is None:
+        c = _interned[key] = Coord(q, r)
+    return c
+
+
+def parse_coord(s: str) -> Coord:
+    """Parse "q,r" into a Coord."""
+    q, r = s.split(",")
+    return coord(int(q), int(r))
+
+
+def format_coord(c: Tuple[int, int]) -> str:
+    return f"{c[0]},{c[1]}"
+
+
+def as_coord(value: Union[Coord, Tuple[int, int], str]) -> Coord:
+    """Coerce a Coord, (q, r) tuple or "q,r" string to an interned Coord."""
+    if isinstance(value, str):
+        return parse_coord(value)
+    return coord(value[0], value[1])
@@ -1,5 +1,8 @@
+from typing import Iterable, List, Optional, Tuple
+
 from .map import Map
 from .entities import Engineer
+from .coords import coord
 
 
 UPGRADE_TURNS = 1
@@ -15,17 +18,25 @@ def start_upgrade(board_map: Map, engineer: Engineer, q: int, r: int) -> None:
         raise ValueError("upgrade already in progress")
 
     # place engineer
-    engineer.position = f"{q},{r}"
+    engineer.position = coord(q, r)
     h.upgrade_in_progress = True
     h.upgrade_turns_left = UPGRADE_TURNS
+    board_map.mark_state_changed()
 
 
-def advance_upgrades(board_map: Map) -> None:
-    # decrement turns left and complete upgrades
-    for h in list(board_map._hexes.values()):
-        if h.upgrade_in_progress:
+def advance_upgrades(board_map: Map, coords: Optional[Iterable[Tuple[int, int]]] = None) -> List[Tuple[int, int]]:
+    # decrement turns left and complete upgrades; `coords` limits the scan to
+    # hexes known to have an upgrade in progress. Returns the completed ones.
+    hexes = board_map.hexes() if coords is None else [board_map.get_hex(*c) for c in coords]
+    done = []
+    for h in hexes:
+        if h is not None and h.upgrade_in_progress:
             h.upgrade_turns_left -= 1
+            board_map.mark_state_changed()
             if h.upgrade_turns_left <= 0:
                 h.upgrade_in_progress = False
                 h.road_upgraded = True
                 h.upgrade_turns_left = 0
+                board_map.mark_changed(h.q, h.r)
+                done.append((h.q, h.r))
+    return done
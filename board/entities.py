@@ -1,31 +1,42 @@
 from dataclasses import dataclass, field
 from typing import Dict
 
+from .coords import Coord, as_coord
+
 
 @dataclass
 class Truck:
     id: str
     owner_id: str
-    position: str  # hex id like 'q,r'
+    position: Coord
     capacity: int = 10
     cargo: Dict[str, int] = field(default_factory=lambda: {"soldiers": 0, "ammo": 0, "food": 0, "engineers": 0})
     remaining_mp: int = 0
 
+    def __post_init__(self):
+        self.position = as_coord(self.position)
+
 
 @dataclass
 class Warehouse:
     id: str
     owner_id: str
-    position: str = "0,0"
+    position: Coord = Coord(0, 0)
     stock: Dict[str, int] = field(default_factory=lambda: {"soldiers": 0, "ammo": 0, "food": 0})
 
+    def __post_init__(self):
+        self.position = as_coord(self.position)
+
 @dataclass
 class Frontline:
     id: str
     owner_id: str
-    position: str = "0,0"
+    position: Coord = Coord(0, 0)
     stock: Dict[str, int] = field(default_factory=lambda: {"soldiers": 0, "ammo": 0, "food": 0})
 
+    def __post_init__(self):
+        self.position = as_coord(self.position)
+
 
 @dataclass
 class PlayerState:
@@ -42,4 +53,7 @@ class PlayerState:
 class Engineer:
     id: str
     owner_id: str
-    position: str
+    position: Coord
+
+    def __post_init__(self):
+        self.position = as_coord(self.position)
@@ -0,0 +1,230 @@
+"""Engine events and per-tick change sets.
+
+`GameEngine.events` is an `EventBus`. After every action that runs
+outside `push`, the engine turns the action's `Delta` (see `board.undo`)
+into typed events, comparing each recorded field with its new value, and
+publishes them in the order the fields were touched. `GameEngine.restore`
+publishes a single `Restored`, after which a `ChangeSet` reports
+`everything`. Nothing is computed while the bus has no subscribers.
+
+    engine.events.subscribe(print, TruckMoved, UpgradeCompleted)
+    tracker = ChangeTracker(engine.events)
+    ...
+    changes = tracker.take()      # everything that changed since the last take
+    if changes.trucks: ...
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple, Type
+
+from .coords import Coord
+from .undo import Delta, MISSING
+
+
+@dataclass(frozen=True)
+class Event:
+    pass
+
+
+@dataclass(frozen=True)
+class TruckMoved(Event):
+    truck_id: str
+    owner_id: str
+    src: Coord
+    dst: Coord
+
+
+@dataclass(frozen=True)
+class CargoChanged(Event):
+    truck_id: str
+    resource: str
+    old: int
+    new: int
+
+
+@dataclass(frozen=True)
+class StockChanged(Event):
+    # warehouse id, or "frontline"
+    depot_id: str
+    resource: str
+    old: int
+    new: int
+
+
+@dataclass(frozen=True)
+class PoolChanged(Event):
+    player_id: str
+    resource: str
+    old: int
+    new: int
+
+
+@dataclass(frozen=True)
+class UpgradeStarted(Event):
+    q: int
+    r: int
+
+
+@dataclass(frozen=True)
+class UpgradeCompleted(Event):
+    q: int
+    r: int
+
+
+@dataclass(frozen=True)
+class AttackResolved(Event):
+    attacker: str
+    defender: str
+    participating: int
+    success: bool
+    damage: int
+    attacker_loss: int
+
+
+@dataclass(frozen=True)
+class Starvation(Event):
+    player_id: str
+    loss: int
+
+
+@dataclass(frozen=True)
+class Restored(Event):
+    """The engine restored a snapshot; any part of the state may have changed."""
+
+
+Handler = Callable[[Event], None]
+
+
+class EventBus:
+    def __init__(self):
+        # event type (Event for all) -> handlers
+        self._handlers: Dict[Type[Event], List[Handler]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._handlers)
+
+    def subscribe(self, handler: Handler, *types: Type[Event]) -> Callable[[], None]:
+        """Call `handler` for events of `types` (default: all); returns an unsubscribe function."""
+        types = types or (Event,)
+        for t in types:
+            self._handlers.setdefault(t, []).append(handler)
+
+        def unsubscribe() -> None:
+            for t in types:
+                handlers = self._handlers.get(t, [])
+                if handler in handlers:
+                    handlers.remove(handler)
+                if not handlers:
+                    self._handlers.pop(t, None)
+        return unsubscribe
+
+    def publish(self, event: Event) -> None:
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
+        for handler in self._handlers.get(Event, ()):
+            handler(event)
+
+
+@dataclass
+class ChangeSet:
+    """What changed since the last `ChangeTracker.take`, by id."""
+
+    trucks: Set[str] = field(default_factory=set)
+    cargo: Set[str] = field(default_factory=set)
+    stock: Set[str] = field(default_factory=set)
+    pools: Set[str] = field(default_factory=set)
+    hexes: Set[Coord] = field(default_factory=set)
+    attacks: List[AttackResolved] = field(default_factory=list)
+    starvation: List[Starvation] = field(default_factory=list)
+    # a snapshot was restored: treat everything as changed
+    everything: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.everything or self.trucks or self.cargo or self.stock or self.pools or self.hexes
+                    or self.attacks or self.starvation)
+
+
+class ChangeTracker:
+    """Accumulates a `ChangeSet` from a bus, e.g. once per GUI frame."""
+
+    def __init__(self, bus: EventBus):
+        self.changes = ChangeSet()
+        self.unsubscribe = bus.subscribe(self._on_event)
+
+    def _on_event(self, e: Event) -> None:
+        c = self.changes
+        if isinstance(e, TruckMoved):
+            c.trucks.add(e.truck_id)
+        elif isinstance(e, CargoChanged):
+            c.cargo.add(e.truck_id)
+        elif isinstance(e, StockChanged):
+            c.stock.add(e.depot_id)
+        elif isinstance(e, PoolChanged):
+            c.pools.add(e.player_id)
+        elif isinstance(e, (UpgradeStarted, UpgradeCompleted)):
+            c.hexes.add((e.q, e.r))
+        elif isinstance(e, AttackResolved):
+            c.attacks.append(e)
+        elif isinstance(e, Starvation):
+            c.starvation.append(e)
+        elif isinstance(e, Restored):
+            c.everything = True
+
+    def take(self) -> ChangeSet:
+        changes, self.changes = self.changes, ChangeSet()
+        return changes
+
+
+def delta_events(engine, kind: str, delta: Delta, result) -> List[Event]:
+    """Events for an action that recorded `delta` and returned `result`."""
+    events: List[Event] = []
+    seen: Set[Tuple[int, object]] = set()
+    for obj, name, old in delta.attrs:
+        if (id(obj), name) in seen:
+            continue
+        seen.add((id(obj), name))
+        new = getattr(obj, name)
+        if new == old:
+            continue
+        tag = engine.object_tag(obj)
+        if tag is None:
+            # a hex
+            if name == "upgrade_in_progress" and new:
+                events.append(UpgradeStarted(obj.q, obj.r))
+            elif name == "road_upgraded" and new:
+                events.append(UpgradeCompleted(obj.q, obj.r))
+        elif tag[0] == "truck" and name == "position":
+            events.append(TruckMoved(obj.id, obj.owner_id, old, new))
+        elif tag[0] == "player":
+            events.append(PoolChanged(tag[1], name, old, new))
+    for d, key, old in delta.items:
+        if (id(d), key) in seen:
+            continue
+        seen.add((id(d), key))
+        old = 0 if old is MISSING else old
+        new = d.get(key, 0)
+        if new == old:
+            continue
+        tag = engine.object_tag(d)
+        if tag is None:
+            continue
+        if tag[0] == "cargo":
+            events.append(CargoChanged(tag[1], key, old, new))
+        elif tag[0] == "stock":
+            events.append(StockChanged(tag[1], key, old, new))
+        elif tag[0] == "front":
+            events.append(StockChanged("frontline", key, old, new))
+    attacks: Optional[list] = None
+    starvation: Optional[dict] = None
+    if kind == "round":
+        attacks, starvation = result["attack_results"], result["starvation"]
+    elif kind == "resolve_attacks":
+        attacks = result
+    elif kind == "food":
+        starvation = result
+    for a in attacks or ():
+        events.append(AttackResolved(a["attacker"], a["defender"], a["participating"], a["success"],
+                                     a["damage"], a["attacker_loss"]))
+    for pid, loss in (starvation or {}).items():
+        if loss:
+            events.append(Starvation(pid, loss))
+    return events
@@ -0,0 +1,181 @@
+"""Streaming per-round export of game records.
+
+Every round of every game becomes one fixed-width row per player (see
+`ROW_DTYPE`): pools after the round, truck positions, the player's
+attacks and starvation losses. Rows are built straight from
+`GameEngine.run_round` results into a NumPy structured array and written
+in chunks, so memory stays flat however many games are exported:
+
+    with RoundExporter("rounds.npy") as out:
+        for rnd in ...:
+            out.add(engine, game, rnd, engine.run_round())
+    rows = load_rounds("rounds.npy")    # memory-mapped
+
+A ".npy" target is a regular NumPy file whose header is patched with the
+final row count on close; a ".csv" target gets a header line and one line
+per row, with truck positions as truck<i>_q / truck<i>_r columns.
+"""
+import csv
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from . import rules
+
+
+# truck slots per row; unused slots hold NO_TRUCK
+TRUCKS = rules.TRUCK_COUNT
+NO_TRUCK = -32768
+
+
+def row_dtype(trucks: int = TRUCKS) -> np.dtype:
+    return np.dtype([
+        ("game", "<u4"),
+        ("round", "<u4"),
+        # index of the player in engine.players
+        ("player", "u1"),
+        ("soldiers", "<i4"),
+        ("ammo", "<i4"),
+        ("food", "<i4"),
+        ("starvation_loss", "<i4"),
+        # totals over the player's attacks this round; attack_success counts
+        # successful attacks, -1 if the player did not attack
+        ("attack_participating", "<i4"),
+        ("attack_success", "i1"),
+        ("attack_damage", "<i4"),
+        ("attack_loss", "<i4"),
+        ("truck_q", "<i2", (trucks,)),
+        ("truck_r", "<i2", (trucks,)),
+    ])
+
+
+ROW_DTYPE = row_dtype()
+
+
+def round_rows(engine, game: int, rnd: int, result: Dict, dtype: np.dtype = ROW_DTYPE) -> np.ndarray:
+    """One row per player for round `rnd` of `game`, from `run_round`'s `result`."""
+    rows = np.zeros(len(engine.players), dtype=dtype)
+    rows["game"] = game
+    rows["round"] = rnd
+    rows["attack_success"] = -1
+    rows["truck_q"] = NO_TRUCK
+    rows["truck_r"] = NO_TRUCK
+    slots = dtype["truck_q"].shape[0]
+    index = {}
+    starvation = result.get("starvation", {})
+    for i, (pid, p) in enumerate(engine.players.items()):
+        index[pid] = i
+        row = rows[i]
+        row["player"] = i
+        row["soldiers"] = p.soldiers
+        row["ammo"] = p.ammo
+        row["food"] = p.food
+        row["starvation_loss"] = starvation.get(pid, 0)
+        for j, t in enumerate(list(p.trucks.values())[:slots]):
+            row["truck_q"][j] = t.position[0]
+            row["truck_r"][j] = t.position[1]
+    for a in result.get("attack_results", ()):
+        row = rows[index[a["attacker"]]]
+        row["attack_participating"] += a["participating"]
+        row["attack_success"] = max(row["attack_success"], 0) + (1 if a["success"] else 0)
+        row["attack_damage"] += a["damage"]
+        row["attack_loss"] += a["attacker_loss"]
+    return rows
+
+
+def _npy_header(dtype: np.dtype, rows: int) -> bytes:
+    """Version 1.0 .npy header, padded to a fixed size for any row count."""
+    descr = np.lib.format.dtype_to_descr(dtype)
+    text = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (descr, rows)
+    widest = len("{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (descr, 2 ** 64))
+    size = -(-(10 + widest + 1) // 64) * 64
+    return b"\x93NUMPY\x01\x00" + (size - 10).to_bytes(2, "little") + (text.ljust(size - 11) + "\n").encode()
+
+
+class RoundExporter:
+    """Appends round rows to a .npy or .csv file, `chunk_rows` at a time."""
+
+    def __init__(self, path: str, trucks: int = TRUCKS, chunk_rows: int = 65536, fmt: Optional[str] = None):
+        self.path = path
+        self.fmt = fmt or ("csv" if path.endswith(".csv") else "npy")
+        if self.fmt not in ("npy", "csv"):
+            raise ValueError(f"unknown export format: {self.fmt}")
+        self.dtype = row_dtype(trucks)
+        self.rows = 0
+        self._buf = np.zeros(chunk_rows, dtype=self.dtype)
+        self._n = 0
+        if self.fmt == "npy":
+            self._out = open(path, "wb")
+            self._out.write(_npy_header(self.dtype, 0))
+        else:
+            self._out = open(path, "w", newline="")
+            self._csv = csv.writer(self._out)
+            self._csv.writerow(self._columns(trucks))
+
+    def _columns(self, trucks: int) -> List[str]:
+        names = [n for n in self.dtype.names if n not in ("truck_q", "truck_r")]
+        return names + [f"truck{i}_{c}" for i in range(trucks) for c in ("q", "r")]
+
+    def add(self, engine, game: int, rnd: int, result: Dict) -> None:
+        """Export the round `engine.run_round()` just returned `result` for."""
+        self.write(round_rows(engine, game, rnd, result, self.dtype))
+
+    def write(self, rows: np.ndarray) -> None:
+        """Append ready-made rows (e.g. collected by a worker process)."""
+        if rows.dtype != self.dtype:
+            rows = self._convert(rows)
+        start = 0
+        while start < len(rows):
+            take = min(len(rows) - start, len(self._buf) - self._n)
+            self._buf[self._n:self._n + take] = rows[start:start + take]
+            self._n += take
+            start += take
+            if self._n == len(self._buf):
+                self.flush()
+
+    def _convert(self, rows: np.ndarray) -> np.ndarray:
+        """Rows built with a different truck count, cut or padded to this file's."""
+        out = np.zeros(len(rows), dtype=self.dtype)
+        for name in self.dtype.names:
+            if name in ("truck_q", "truck_r"):
+                n = min(rows.dtype[name].shape[0], self.dtype[name].shape[0])
+                out[name] = NO_TRUCK
+                out[name][:, :n] = rows[name][:, :n]
+            else:
+                out[name] = rows[name]
+        return out
+
+    def flush(self) -> None:
+        chunk = self._buf[:self._n]
+        if self.fmt == "npy":
+            self._out.write(chunk.tobytes())
+        else:
+            flat = [n for n in self.dtype.names if n not in ("truck_q", "truck_r")]
+            cols = [chunk[n] for n in flat]
+            q, r = chunk["truck_q"], chunk["truck_r"]
+            pos = np.empty((len(chunk), 2 * q.shape[1]), dtype=q.dtype)
+            pos[:, 0::2] = q
+            pos[:, 1::2] = r
+            self._csv.writerows(list(row) + pr for row, pr in zip(zip(*(c.tolist() for c in cols)), pos.tolist()))
+        self.rows += self._n
+        self._n = 0
+
+    def close(self) -> None:
+        if self._out.closed:
+            return
+        self.flush()
+        if self.fmt == "npy":
+            self._out.seek(0)
+            self._out.write(_npy_header(self.dtype, self.rows))
+        self._out.close()
+
+    def __enter__(self) -> "RoundExporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_rounds(path: str, mmap: bool = True) -> np.ndarray:
+    """Rows written by a .npy `RoundExporter`, memory-mapped by default."""
+    return np.load(path, mmap_mode="r" if mmap else None)
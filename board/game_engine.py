@@ -1,20 +1,310 @@
-from typing import Dict, List, Tuple, Callable, Optional
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Set, Tuple, Callable, Optional, Union
 from .map import Map
-from .entities import PlayerState, Truck
-from . import movement, combat, rules
+from .coords import coord
+from .entities import Engineer, Frontline, PlayerState, Truck, Warehouse
+from .events import EventBus, Restored, delta_events
+from .journal import JournalWriter
+from .legal import LegalActions
+from .rng import RngService
+from .snapshot import GameSnapshot, restore_snapshot, take_snapshot
+from .undo import Delta
+from .zobrist import EngineHasher
+from . import engineering, movement, combat, instrument, rules, supply
+
+
+# push() action kind -> engine method it runs
+ACTIONS = {
+    "move": "queue_move",
+    "load": "load_truck",
+    "unload": "unload_truck",
+    "upgrade": "start_upgrade",
+    "attack": "queue_attack",
+    "movement": "process_movement_phase",
+    "resolve_attacks": "process_attack_phase",
+    "food": "process_food_phase",
+    "round": "run_round",
+}
+
+
+def _action(kind: str, timer: Optional[str] = None):
+    """Run an engine method as one tracked action.
+
+    The fields the method may write are recorded first (`_touch_<kind>`),
+    then used to update `hash` and, under `push`, kept for `pop`; other
+    actions go to the journal, if one is open, and are published as
+    events. Phases called from inside another action (run_round) are
+    covered by the outer record. With a `timer` name, each call's wall time
+    is recorded there while `instrument` is enabled.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def method(self, *args):
+            t0 = time.perf_counter_ns() if timer is not None and instrument.STATE.enabled else 0
+            try:
+                if self._active:
+                    return fn(self, *args)
+                delta = Delta()
+                getattr(self, "_touch_" + kind)(delta, *args)
+                keep, self._pushing = self._pushing, False
+                before = self.hash
+                self._active = True
+                try:
+                    result = fn(self, *args)
+                except BaseException:
+                    delta.revert()
+                    raise
+                finally:
+                    self._active = False
+                self.hash = self._hasher.update(before, delta)
+                if keep:
+                    self._history.append((delta, before))
+                else:
+                    if self.journal is not None:
+                        self.journal.record(self, kind, args)
+                    if self.events:
+                        for event in delta_events(self, kind, delta, result):
+                            self.events.publish(event)
+                return result
+            finally:
+                if t0:
+                    instrument.record_time(timer, time.perf_counter_ns() - t0)
+        return method
+    return wrap
 
 
 class GameEngine:
-    def __init__(self, board_map: Map, players: Dict[str, PlayerState], rng: Optional[Callable[[], float]] = None):
+    def __init__(self, board_map: Map, players: Dict[str, PlayerState],
+                 rng: Union[None, Callable[[], float], RngService] = None):
         self.map = board_map
         self.players = players
         self.movement_queue: List[Tuple[str, str, List[Tuple[int, int]]]] = []  # (player_id, truck_id, path)
         self.attack_queue: List[Dict] = []  # dicts with attacker_id, defender_id, attacking_soldiers
-        self.rng = rng
+        # combat rolls: a callable set here is used for every attack;
+        # otherwise each attacker draws from its own ("attack", id) stream
+        if isinstance(rng, RngService) or rng is None:
+            self.rngs = rng if rng is not None else RngService(0)
+            self.rng = None
+        else:
+            self.rngs = None
+            self.rng = rng
+        # neutral frontline depot, if the scenario placed one
+        self.frontline = getattr(board_map, "frontline", None)
         # track trucks that have already moved this round (prevent multiple moves)
         self.moved_this_round = set()
+        # road upgrades each player started this round (one per engineer)
+        self.upgrades_this_round: Dict[str, int] = {}
+        # hexes with an upgrade in progress, so rounds never scan the map
+        self._upgrading: Set[Tuple[int, int]] = set()
+        # (delta, hash before) of pushed actions, most recent last
+        self._history: List[Tuple[Delta, int]] = []
+        self._active = False
+        self._pushing = False
+        self._legal = LegalActions(self)
+        self.journal: Optional[JournalWriter] = None
+        # see board.events; actions run under push are not published
+        self.events = EventBus()
+        # index every unit on the map so hex lookups never scan players
+        for p in players.values():
+            for w in p.warehouses.values():
+                board_map.occupancy.place(w)
+            for t in p.trucks.values():
+                board_map.occupancy.place(t)
+        self.rehash()
+
+    # ----- snapshots -----
+    def snapshot(self) -> GameSnapshot:
+        """Immutable copy of the mutable game state, see `board.snapshot`."""
+        return take_snapshot(self)
+
+    def restore(self, snap: GameSnapshot) -> None:
+        """Put the game back into the state captured by `snapshot`."""
+        restore_snapshot(self, snap)
+        self._sync_upgrading()
+        if self.events:
+            self.events.publish(Restored())
+
+    # ----- hashing -----
+    def rehash(self) -> int:
+        """Recompute `hash` from scratch.
+
+        `hash` is a 64-bit Zobrist hash of the game state (see
+        `board.zobrist`) kept up to date by every engine action. Call this
+        after changing state behind the engine's back, or after adding
+        players, trucks or warehouses.
+        """
+        self._sync_upgrading()
+        self._hasher = EngineHasher(self)
+        self.hash = self._hasher.full_hash()
+        return self.hash
+
+    def object_tag(self, obj) -> Optional[Tuple]:
+        """What an engine-owned object is, as a tuple naming its kind and id.
+
+        ("player", id), ("truck", id), ("cargo", truck id), ("stock",
+        warehouse id), ("front",) for the frontline stock, or ("moved",),
+        ("upgrades",), ("attack",), ("queued",) for the per-round state;
+        None for hexes and anything the engine does not own.
+        """
+        return self._hasher.tag(obj)
+
+    def _sync_upgrading(self) -> None:
+        self._upgrading.clear()
+        self._upgrading.update(c for c, _, in_progress, _ in self.map.upgrade_state() if in_progress)
+
+    # ----- journal -----
+    def start_journal(self, target: Union[str, BinaryIO], keyframe_every: int = 10) -> JournalWriter:
+        """Record every following action to a binary journal, see `board.journal`.
+
+        `target` is a path or a binary file object. The engine must draw
+        its combat rolls from an `RngService` so the journal can replay them.
+        """
+        if self.rng is not None or self.rngs is None:
+            raise ValueError("journaling needs an engine seeded with an RngService")
+        out = open(target, "wb") if isinstance(target, str) else target
+        self.journal = JournalWriter(out, self.rngs, keyframe_every)
+        self.journal.keyframe(self)
+        return self.journal
+
+    @contextmanager
+    def offline(self):
+        """Run hypothetical play (searches, playouts) without journaling or publishing events."""
+        journal, events = self.journal, self.events
+        self.journal, self.events = None, EventBus()
+        try:
+            yield self
+        finally:
+            self.journal, self.events = journal, events
+
+    # ----- legal actions -----
+    def legal_actions(self, player_id: str) -> Iterator[Tuple]:
+        """Lazily yield the player's legal actions as `push` tuples, most promising first.
+
+        See `board.legal`; per-truck move lists are cached and only rebuilt
+        for trucks whose position, MP or cargo changed.
+        """
+        return self._legal.actions(player_id)
+
+    # ----- make/unmake -----
+    def push(self, action: Tuple) -> Any:
+        """Apply `action` so that `pop` can revert it; returns the method's result.
+
+        `action` is (kind, *args) with kind a key of `ACTIONS`, e.g.
+        ("move", "p1", "p1_t0", path) or ("round",). Only the fields the
+        action can write are recorded, so push/pop never copy the board.
+        """
+        kind, *args = action
+        method = ACTIONS.get(kind)
+        if method is None:
+            raise ValueError(f"unknown action: {kind}")
+        self._pushing = True
+        try:
+            return getattr(self, method)(*args)
+        finally:
+            self._pushing = False
+
+    def pop(self) -> None:
+        """Revert the most recent `push`."""
+        if not self._history:
+            raise IndexError("no action to pop")
+        delta, before = self._history.pop()
+        delta.revert()
+        self.hash = before
+
+    @property
+    def depth(self) -> int:
+        """Number of pushed actions that can still be popped."""
+        return len(self._history)
+
+    def _touch_truck(self, delta: Delta, truck: Truck) -> None:
+        delta.attr(truck, "position")
+        delta.attr(truck, "remaining_mp")
+        delta.on_revert(lambda: self.map.occupancy.place(truck))
+
+    def _touch_pools(self, delta: Delta) -> None:
+        for p in self.players.values():
+            for name in ("soldiers", "ammo", "food"):
+                delta.attr(p, name)
+
+    def _touch_hex(self, delta: Delta, q: int, r: int) -> None:
+        h = self.map.get_hex(q, r)
+        if h is None:
+            return
+        for name in ("road_upgraded", "upgrade_in_progress", "upgrade_turns_left"):
+            delta.attr(h, name)
+        version = self.map.version
+        delta.on_revert(lambda: self._hex_reverted(h, version))
+
+    def _hex_reverted(self, h, version: int) -> None:
+        if h.upgrade_in_progress:
+            self._upgrading.add((h.q, h.r))
+        else:
+            self._upgrading.discard((h.q, h.r))
+        # only a road that flipped since the action started changes movement
+        # costs; anything else just invalidates the upgrade state cache
+        changes = self.map.changes_since(version)
+        if changes is None or any(c == (h.q, h.r) for c, _ in changes):
+            self.map.mark_changed(h.q, h.r)
+        else:
+            self.map.mark_state_changed()
+
+    def _touch_move(self, delta: Delta, player_id: str, truck_id: str, path) -> None:
+        truck = self._truck(player_id, truck_id)
+        if truck is not None:
+            self._touch_truck(delta, truck)
+            delta.member(self.moved_this_round, truck_id)
+
+    def _touch_load(self, delta: Delta, player_id: str, truck_id: str, resource: str, amount: int) -> None:
+        truck = self._truck(player_id, truck_id)
+        if truck is not None:
+            delta.item(truck.cargo, resource)
+            for w in self.players[player_id].warehouses.values():
+                delta.item(w.stock, resource)
+
+    def _touch_unload(self, delta: Delta, player_id: str, truck_id: str, resource: str, amount: int) -> None:
+        truck = self._truck(player_id, truck_id)
+        player = self.players.get(player_id)
+        if truck is not None and hasattr(player, resource):
+            delta.item(truck.cargo, resource)
+            delta.attr(player, resource)
+
+    def _touch_upgrade(self, delta: Delta, player_id: str, q: int, r: int) -> None:
+        self._touch_hex(delta, q, r)
+        delta.item(self.upgrades_this_round, player_id)
+
+    def _touch_attack(self, delta: Delta, attacker_id: str, defender_id: str, attacking_soldiers: int) -> None:
+        delta.contents(self.attack_queue)
+
+    def _touch_movement(self, delta: Delta) -> None:
+        delta.contents(self.movement_queue)
+        for player_id, truck_id, _ in self.movement_queue:
+            truck = self._truck(player_id, truck_id)
+            if truck is not None:
+                self._touch_truck(delta, truck)
+
+    def _touch_resolve_attacks(self, delta: Delta) -> None:
+        delta.contents(self.attack_queue)
+        self._touch_pools(delta)
+
+    def _touch_food(self, delta: Delta) -> None:
+        self._touch_pools(delta)
+
+    def _touch_round(self, delta: Delta) -> None:
+        delta.contents(self.moved_this_round)
+        delta.contents(self.upgrades_this_round)
+        delta.contents(self.movement_queue)
+        delta.contents(self.attack_queue)
+        self._touch_pools(delta)
+        for p in self.players.values():
+            for t in p.trucks.values():
+                self._touch_truck(delta, t)
+        for q, r in self._upgrading:
+            self._touch_hex(delta, q, r)
 
     # ----- queueing API -----
+    @_action("move")
     def queue_move(self, player_id: str, truck_id: str, path: List[Tuple[int, int]]):
         # Immediately attempt to move the truck so the UI reflects the move at once.
         player = self.players.get(player_id)
@@ -32,10 +322,67 @@ class GameEngine:
             self.moved_this_round.add(truck_id)
         return ok
 
+    def _truck(self, player_id: str, truck_id: str) -> Optional[Truck]:
+        player = self.players.get(player_id)
+        if player is None:
+            return None
+        return player.trucks.get(truck_id)
+
+    @_action("load")
+    def load_truck(self, player_id: str, truck_id: str, resource: str, amount: int) -> bool:
+        """Load cargo from one of the player's warehouses next to the truck."""
+        truck = self._truck(player_id, truck_id)
+        if truck is None:
+            return False
+        for wh in self.map.occupancy.entities_adjacent(truck.position, Warehouse):
+            if wh.owner_id != player_id or wh.stock.get(resource, 0) < amount:
+                continue
+            try:
+                supply.load_from_warehouse(wh, truck, resource, amount)
+            except ValueError:
+                return False
+            return True
+        return False
+
+    @_action("unload")
+    def unload_truck(self, player_id: str, truck_id: str, resource: str, amount: int) -> bool:
+        """Unload cargo into the player's pool; the truck must be next to the frontline."""
+        truck = self._truck(player_id, truck_id)
+        if truck is None or amount <= 0 or truck.cargo.get(resource, 0) < amount:
+            return False
+        player = self.players[player_id]
+        if not hasattr(player, resource):
+            return False
+        if not self.map.occupancy.entities_adjacent(truck.position, Frontline):
+            return False
+        truck.cargo[resource] -= amount
+        setattr(player, resource, getattr(player, resource) + amount)
+        return True
+
+    @_action("upgrade")
+    def start_upgrade(self, player_id: str, q: int, r: int) -> bool:
+        """Have one of the player's engineers start upgrading the road at (q, r).
+
+        Each engineer can start one upgrade per round.
+        """
+        player = self.players.get(player_id)
+        if player is None or self.upgrades_this_round.get(player_id, 0) >= player.engineers:
+            return False
+        engineer = Engineer(id=f"{player_id}_eng", owner_id=player_id, position=coord(q, r))
+        try:
+            engineering.start_upgrade(self.map, engineer, q, r)
+        except ValueError:
+            return False
+        self.upgrades_this_round[player_id] = self.upgrades_this_round.get(player_id, 0) + 1
+        self._upgrading.add((q, r))
+        return True
+
+    @_action("attack")
     def queue_attack(self, attacker_id: str, defender_id: str, attacking_soldiers: int):
         self.attack_queue.append({"attacker": attacker_id, "defender": defender_id, "attacking": attacking_soldiers})
 
     # ----- phases -----
+    @_action("movement", "engine.process_movement_phase")
     def process_movement_phase(self):
         for player_id, truck_id, path in list(self.movement_queue):
             player = self.players[player_id]
@@ -45,6 +392,7 @@ class GameEngine:
             movement.move_truck(self.map, truck, path)
         self.movement_queue.clear()
 
+    @_action("resolve_attacks", "engine.process_attack_phase")
     def process_attack_phase(self):
         results = []
         for action in list(self.attack_queue):
@@ -57,7 +405,8 @@ class GameEngine:
             # determine available soldiers and ammo
             participating = min(attack_num, att.soldiers, att.ammo)
             # call combat resolver
-            res = combat.resolve_attack(participating, defp.soldiers, att.ammo, rng=self.rng)
+            rng = self.rng or self.rngs.stream("attack", attacker_id)
+            res = combat.resolve_attack(participating, defp.soldiers, att.ammo, rng=rng)
 
             # apply results
             att.ammo -= res["ammo_used"]
@@ -82,9 +431,13 @@ class GameEngine:
         self.attack_queue.clear()
         return results
 
-    def process_food_phase(self):
+    @_action("food", "engine.process_food_phase")
+    def process_food_phase(self) -> Dict[str, int]:
         # Each player consumes food equal to soldiers. If food insufficient, apply penalty.
-        for p in self.players.values():
+        # Returns soldiers lost to starvation per player.
+        losses = {}
+        for pid, p in self.players.items():
+            losses[pid] = 0
             if p.food >= p.soldiers:
                 p.food -= p.soldiers
             else:
@@ -92,24 +445,32 @@ class GameEngine:
                 p.food = 0
                 # apply starvation penalty: lose 10% of current soldiers, min 1 if soldiers>0
                 if p.soldiers > 0:
-                    loss = max(1, p.soldiers // 10)
+                    loss = min(p.soldiers, max(1, p.soldiers // 10))
                     p.soldiers -= loss
-                    if p.soldiers < 0:
-                        p.soldiers = 0
+                    losses[pid] = loss
+        return losses
 
     def check_victory(self) -> Optional[str]:
         # return player_id of winner if any, else None
+        t0 = time.perf_counter_ns() if instrument.STATE.enabled else 0
         alive = [pid for pid, p in self.players.items() if p.soldiers > 0]
-        if len(alive) == 1:
-            return alive[0]
-        return None
+        victor = alive[0] if len(alive) == 1 else None
+        if t0:
+            instrument.record_time("engine.check_victory", time.perf_counter_ns() - t0)
+        return victor
 
+    @_action("round", "engine.run_round")
     def run_round(self):
         # Run phases in order. Return attack summaries and optional victor for UI.
         # starting a new round: reset moved tracker so trucks can move this round
         self.moved_this_round.clear()
+        self.upgrades_this_round.clear()
+        self._upgrading.difference_update(engineering.advance_upgrades(self.map, self._upgrading))
+        for p in self.players.values():
+            for t in p.trucks.values():
+                t.remaining_mp = rules.MP_PER_TURN
         self.process_movement_phase()
         attack_results = self.process_attack_phase()
-        self.process_food_phase()
+        starvation = self.process_food_phase()
         victor = self.check_victory()
-        return {"attack_results": attack_results, "victor": victor}
+        return {"attack_results": attack_results, "starvation": starvation, "victor": victor}
@@ -0,0 +1,131 @@
+"""Hex geometry on axial coordinates, scalar and NumPy batch versions.
+
+Batch functions take coordinate arrays of shape (N, 2) holding (q, r) rows
+and work on the whole array at once, e.g. every hex within 3 of the front:
+
+    coords = coords_array(board_map)
+    near = coords[hex_distance_batch((0, 0), coords) <= 3]
+
+Pixel conversions use pointy-top hexes of radius `size`.
+"""
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from .coords import Coord
+
+# axial neighbor offsets, same order as board.map.DIRECTIONS
+DIRECTIONS: List[Coord] = [(+1, 0), (+1, -1), (0, -1), (-1, 0), (-1, +1), (0, +1)]
+DIRECTIONS_ARRAY = np.array(DIRECTIONS, dtype=np.int64)
+
+SQRT3 = math.sqrt(3)
+
+
+# ----- scalar -----
+def hex_distance(a: Coord, b: Coord) -> int:
+    dq = a[0] - b[0]
+    dr = a[1] - b[1]
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+def neighbors(coord: Coord) -> List[Coord]:
+    q, r = coord
+    return [(q + dq, r + dr) for dq, dr in DIRECTIONS]
+
+
+def axial_to_pixel(q: int, r: int, size: float, origin: Tuple[float, float] = (0, 0)) -> Tuple[float, float]:
+    return size * SQRT3 * (q + r / 2) + origin[0], size * 1.5 * r + origin[1]
+
+
+def pixel_to_axial(x: float, y: float, size: float, origin: Tuple[float, float] = (0, 0)) -> Coord:
+    """Axial coordinate of the hex containing pixel (x, y)."""
+    res = pixel_to_axial_batch(np.array([[x, y]], dtype=float), size, origin)[0]
+    return int(res[0]), int(res[1])
+
+
+# ----- batch -----
+def as_coords(coords) -> np.ndarray:
+    """Coerce a sequence of (q, r) pairs to an (N, 2) int64 array."""
+    arr = np.asarray(coords, dtype=np.int64)
+    return arr.reshape(-1, 2)
+
+
+def coords_array(board_map) -> np.ndarray:
+    """(N, 2) array of every hex coordinate on `board_map`."""
+    return as_coords([(h.q, h.r) for h in board_map.hexes()])
+
+
+def hex_distance_batch(origin: Coord, coords) -> np.ndarray:
+    """Distances from `origin` to every row of `coords`."""
+    c = as_coords(coords)
+    dq = c[:, 0] - origin[0]
+    dr = c[:, 1] - origin[1]
+    return (np.abs(dq) + np.abs(dr) + np.abs(dq + dr)) // 2
+
+
+def neighbors_batch(coords) -> np.ndarray:
+    """(N, 6, 2) array: the six neighbors of each coordinate, in DIRECTIONS order."""
+    c = as_coords(coords)
+    return c[:, None, :] + DIRECTIONS_ARRAY[None, :, :]
+
+
+def ring(center: Coord, k: int) -> np.ndarray:
+    """(6k, 2) array of hexes at exactly distance k from `center` (just center for k=0)."""
+    if k < 0:
+        raise ValueError("radius must be non-negative")
+    if k == 0:
+        return as_coords([center])
+    steps = np.arange(k)
+    sides = []
+    # walk the six sides, starting k steps out in direction 4
+    corner = np.array(center) + DIRECTIONS_ARRAY[4] * k
+    for i in range(6):
+        d = DIRECTIONS_ARRAY[i]
+        sides.append(corner + steps[:, None] * d)
+        corner = corner + d * k
+    return np.concatenate(sides)
+
+
+def spiral(center: Coord, k: int) -> np.ndarray:
+    """(1 + 3k(k+1), 2) array of hexes within distance k, ordered ring by ring."""
+    return np.concatenate([ring(center, i) for i in range(k + 1)])
+
+
+def axial_to_pixel_batch(coords, size: float, origin: Tuple[float, float] = (0, 0)) -> np.ndarray:
+    """(N, 2) float array of pixel centers."""
+    c = as_coords(coords).astype(float)
+    x = size * SQRT3 * (c[:, 0] + c[:, 1] / 2) + origin[0]
+    y = size * 1.5 * c[:, 1] + origin[1]
+    return np.stack([x, y], axis=1)
+
+
+def pixel_to_axial_batch(points, size: float, origin: Tuple[float, float] = (0, 0)) -> np.ndarray:
+    """(N, 2) int array of the hexes containing each pixel, via cube rounding."""
+    p = np.asarray(points, dtype=float).reshape(-1, 2)
+    x = p[:, 0] - origin[0]
+    y = p[:, 1] - origin[1]
+    fq = (SQRT3 / 3 * x - y / 3) / size
+    fr = (2 / 3 * y) / size
+    fs = -fq - fr
+    q = np.rint(fq)
+    r = np.rint(fr)
+    s = np.rint(fs)
+    dq = np.abs(q - fq)
+    dr = np.abs(r - fr)
+    ds = np.abs(s - fs)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    q = np.where(fix_q, -r - s, q)
+    r = np.where(fix_r, -q - s, r)
+    return np.stack([q, r], axis=1).astype(np.int64)
+
+
+def to_tuples(coords: np.ndarray) -> List[Coord]:
+    """Convert an (N, 2) coordinate array back to a list of (q, r) tuples."""
+    return [(int(q), int(r)) for q, r in as_coords(coords)]
+
+
+def within(coords, center: Coord, k: int) -> np.ndarray:
+    """Boolean mask of rows of `coords` within distance k of `center`."""
+    return hex_distance_batch(center, coords) <= k
@@ -0,0 +1,261 @@
+"""Hierarchical pathfinding (HPA*) for large hex maps.
+
+The axial grid is cut into square chunks of `cluster_size` x `cluster_size`
+axial coordinates. Hexes on either side of a chunk border form entrances;
+each entrance gets one pair of transition hexes (one per side). Queries
+first search the small abstract graph of transitions, then refine every
+abstract edge with a search confined to one chunk.
+
+Suboptimality bound: an optimal route crossing a border at any hex pair of
+an entrance can be rerouted through that entrance's transition pair by
+walking at most `entrance_width // 2` steps along the border on each side.
+The returned cost is therefore at most
+
+    optimal + crossings * 2 * (entrance_width // 2) * max_tile_cost
+
+where `crossings` is the number of chunk borders the optimal route crosses
+and `max_tile_cost` the most expensive tile on the map. With
+`entrance_width=1` every border pair is a transition and results are
+optimal.
+"""
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+
+from .map import Map
+from .pathfinding import Coord, FRONTLINE, find_path, hex_distance, neighbors
+from . import rules
+
+
+Cluster = Tuple[int, int]
+
+
+class HierarchicalPathfinder:
+    def __init__(self, board_map: Map, cluster_size: int = 10, entrance_width: int = 5):
+        if cluster_size < 1 or entrance_width < 1:
+            raise ValueError("cluster_size and entrance_width must be positive")
+        self.map = board_map
+        self.cluster_size = cluster_size
+        self.entrance_width = entrance_width
+        self._version = board_map.version
+        self._build()
+
+    # ----- helpers -----
+    def cluster_of(self, coord: Coord) -> Cluster:
+        return coord[0] // self.cluster_size, coord[1] // self.cluster_size
+
+    def _passable(self, coord: Coord) -> bool:
+        return coord != FRONTLINE and coord in self.map.cost_table()
+
+    @property
+    def max_tile_cost(self) -> int:
+        costs = self.map.cost_table()
+        return max((costs[(h.q, h.r)] for h in self.map.hexes()), default=0)
+
+    def error_bound(self, crossings: int) -> int:
+        """Upper bound on extra cost for a route crossing `crossings` chunk borders."""
+        return crossings * 2 * (self.entrance_width // 2) * self.max_tile_cost
+
+    # ----- abstract graph construction -----
+    def _build(self) -> None:
+        # border hex pairs grouped by ordered (cluster a, cluster b) with a < b
+        groups: Dict[Tuple[Cluster, Cluster], List[Tuple[Coord, Coord]]] = {}
+        for h in self.map.hexes():
+            a = (h.q, h.r)
+            if a == FRONTLINE:
+                continue
+            ca = self.cluster_of(a)
+            for b in neighbors(a):
+                cb = self.cluster_of(b)
+                if cb <= ca or not self._passable(b):
+                    continue
+                groups.setdefault((ca, cb), []).append((a, b))
+
+        self._transitions: Dict[Cluster, Set[Coord]] = {}
+        # transition -> transitions on the other side of its entrances
+        self._inter: Dict[Coord, Set[Coord]] = {}
+        for (ca, cb), pairs in groups.items():
+            for ta, tb in self._entrances(pairs):
+                self._transitions.setdefault(ca, set()).add(ta)
+                self._transitions.setdefault(cb, set()).add(tb)
+                self._inter.setdefault(ta, set()).add(tb)
+                self._inter.setdefault(tb, set()).add(ta)
+        # transition -> [(transition in same cluster, cost)], filled lazily per cluster
+        self._intra: Dict[Coord, List[Tuple[Coord, int]]] = {}
+        self._intra_ready: Set[Cluster] = set()
+
+    def _entrances(self, pairs: List[Tuple[Coord, Coord]]) -> List[Tuple[Coord, Coord]]:
+        """Pick transition pairs so every border pair is within entrance_width // 2 steps of one."""
+
+        def touching(p, o):
+            return (p[0] == o[0] or hex_distance(p[0], o[0]) == 1) and \
+                   (p[1] == o[1] or hex_distance(p[1], o[1]) == 1)
+
+        adj = {p: [o for o in pairs if o != p and touching(p, o)] for p in pairs}
+
+        def bfs(seed, allowed, depth):
+            seen = {seed: 0}
+            queue = [seed]
+            for p in queue:
+                if seen[p] == depth:
+                    continue
+                for o in adj[p]:
+                    if o not in seen and (allowed is None or o in allowed):
+                        seen[o] = seen[p] + 1
+                        queue.append(o)
+            return seen
+
+        radius = self.entrance_width // 2
+        remaining = set(pairs)
+        result = []
+        while remaining:
+            first = min(remaining)
+            reach = bfs(first, remaining, radius)
+            # start the entrance `radius` steps in, so it covers both directions
+            seed = max(reach, key=lambda p: (reach[p], p))
+            result.append(seed)
+            remaining.difference_update(bfs(seed, None, radius))
+        return result
+
+    def _local_search(self, source: Coord, cluster: Cluster, reverse: bool = False) -> Dict[Coord, int]:
+        """Dijkstra confined to `cluster`; reverse=True gives costs *to* source."""
+        costs = self.map.cost_table()
+        dist = {source: 0}
+        frontier = [(0, source)]
+        while frontier:
+            d, u = heapq.heappop(frontier)
+            if d > dist[u]:
+                continue
+            step_into_u = costs[u] if reverse else 0
+            for v in neighbors(u):
+                if v == FRONTLINE or v not in costs or self.cluster_of(v) != cluster:
+                    continue
+                nd = d + (step_into_u if reverse else costs[v])
+                if v not in dist or nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(frontier, (nd, v))
+        return dist
+
+    def _ensure_intra(self, cluster: Cluster) -> None:
+        if cluster in self._intra_ready:
+            return
+        nodes = self._transitions.get(cluster, set())
+        for t in nodes:
+            dist = self._local_search(t, cluster)
+            self._intra[t] = [(o, dist[o]) for o in nodes if o != t and o in dist]
+        self._intra_ready.add(cluster)
+
+    def _sync(self) -> None:
+        version = self.map.version
+        if version == self._version:
+            return
+        changes = self.map.changes_since(self._version)
+        self._version = version
+        if changes is None or any(added for _, added in changes):
+            # passability changed: entrances must be recomputed
+            self._build()
+            return
+        for coord, _ in changes:
+            # a cheaper tile only changes routes inside its own chunk; edges
+            # crossing into it read the tile cost at query time
+            self._intra_ready.discard(self.cluster_of(coord))
+
+    # ----- queries -----
+    def find_path(self, start: Coord, goal: Coord) -> Optional[Dict]:
+        """Same contract as `pathfinding.find_path`, within the documented bound."""
+        if start == goal:
+            return {"path": [start], "cost": 0}
+        if not self._passable(goal):
+            return None
+        if not self._passable(start):
+            return find_path(self.map, start, goal)
+        self._sync()
+
+        sc = self.cluster_of(start)
+        gc = self.cluster_of(goal)
+        from_start = self._local_search(start, sc)
+        to_goal = self._local_search(goal, gc, reverse=True)
+        goal_transitions = {t: to_goal[t] for t in self._transitions.get(gc, ()) if t in to_goal}
+
+        # abstract A*; the goal is reached through goal_transitions (or directly)
+        costs = self.map.cost_table()
+        best: Dict[Coord, int] = {}
+        came_from: Dict[Coord, Optional[Coord]] = {}
+        frontier: List[Tuple[int, int, Coord]] = []
+        min_cost = rules.UPGRADED_ROAD_COST
+        goal_cost = from_start[goal] if sc == gc and goal in from_start else None
+        goal_prev: Optional[Coord] = start if goal_cost is not None else None
+
+        def push(node, cost, prev):
+            if node not in best or cost < best[node]:
+                best[node] = cost
+                came_from[node] = prev
+                heapq.heappush(frontier, (cost + hex_distance(node, goal) * min_cost, cost, node))
+
+        push(start, 0, None)
+        while frontier:
+            f, cost, node = heapq.heappop(frontier)
+            if cost > best[node]:
+                continue
+            if goal_cost is not None and f >= goal_cost:
+                break
+            if node in goal_transitions:
+                total = cost + goal_transitions[node]
+                if goal_cost is None or total < goal_cost:
+                    goal_cost = total
+                    goal_prev = node
+            if node == start:
+                # the start hex joins the abstract graph through its own chunk
+                for t in self._transitions.get(sc, ()):
+                    if t in from_start:
+                        push(t, from_start[t], start)
+            else:
+                self._ensure_intra(self.cluster_of(node))
+                for other, c in self._intra.get(node, ()):
+                    push(other, cost + c, node)
+            for other in self._inter.get(node, ()):
+                push(other, cost + costs[other], node)
+
+        if goal_cost is None:
+            return None
+
+        # abstract route start -> ... -> goal, then refine each hop
+        waypoints = [goal]
+        cur = goal_prev
+        while cur is not None:
+            waypoints.append(cur)
+            cur = came_from[cur]
+        waypoints.reverse()
+
+        path = [start]
+        for a, b in zip(waypoints, waypoints[1:]):
+            if self.cluster_of(a) != self.cluster_of(b):
+                path.append(b)
+                continue
+            path.extend(self._refine(a, b)[1:])
+        return {"path": path, "cost": goal_cost}
+
+    def _refine(self, a: Coord, b: Coord) -> List[Coord]:
+        cluster = self.cluster_of(a)
+        costs = self.map.cost_table()
+        frontier = [(0, a)]
+        came_from: Dict[Coord, Optional[Coord]] = {a: None}
+        cost_so_far = {a: 0}
+        while frontier:
+            _, cur = heapq.heappop(frontier)
+            if cur == b:
+                break
+            for n in neighbors(cur):
+                if n == FRONTLINE or n not in costs or self.cluster_of(n) != cluster:
+                    continue
+                nc = cost_so_far[cur] + costs[n]
+                if n not in cost_so_far or nc < cost_so_far[n]:
+                    cost_so_far[n] = nc
+                    came_from[n] = cur
+                    heapq.heappush(frontier, (nc + hex_distance(n, b) * rules.UPGRADED_ROAD_COST, n))
+        path = []
+        cur = b
+        while cur is not None:
+            path.append(cur)
+            cur = came_from[cur]
+        path.reverse()
+        return path
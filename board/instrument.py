@@ -0,0 +1,142 @@
+"""Toggleable counters and timing histograms for the simulation hot paths.
+
+Instrumented code (`GameEngine.run_round` and its phases, `check_victory`,
+`movement.move_truck`, `pathfinding.find_path`) times itself inline: it
+checks `STATE.enabled` once per call, in its own frame, and does nothing
+else while it is off, so the hooks stay in production runs:
+
+    with instrument.profiling():
+        run_games(1000, workers=1)
+    print(instrument.report())
+
+Timings go into power-of-two nanosecond buckets; `stats()` returns
+everything as plain data, `to_json()` and `report()` format it, and
+`merge()` folds in stats collected by another process.
+"""
+import json
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class _State:
+    __slots__ = ("enabled",)
+
+    def __init__(self):
+        self.enabled = False
+
+
+STATE = _State()
+
+_counters: Dict[str, int] = {}
+# name -> [count, total ns, min ns, max ns, {bucket: count}], bucket = ns.bit_length()
+_timings: Dict[str, List] = {}
+
+
+def enable() -> None:
+    STATE.enabled = True
+
+
+def disable() -> None:
+    STATE.enabled = False
+
+
+def reset() -> None:
+    _counters.clear()
+    _timings.clear()
+
+
+@contextmanager
+def profiling(fresh: bool = True):
+    """Enable instrumentation for a block; `fresh` clears earlier data first."""
+    was = STATE.enabled
+    if fresh:
+        reset()
+    STATE.enabled = True
+    try:
+        yield
+    finally:
+        STATE.enabled = was
+
+
+def count(name: str, n: int = 1) -> None:
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def record_time(name: str, ns: int) -> None:
+    t = _timings.get(name)
+    if t is None:
+        t = _timings[name] = [0, 0, ns, ns, {}]
+    t[0] += 1
+    t[1] += ns
+    if ns < t[2]:
+        t[2] = ns
+    if ns > t[3]:
+        t[3] = ns
+    b = ns.bit_length()
+    t[4][b] = t[4].get(b, 0) + 1
+
+
+def stats() -> Dict:
+    """Raw counters and timings; the input format of `merge`."""
+    return {
+        "counters": dict(_counters),
+        "timings": {name: {"count": c, "total_ns": total, "min_ns": lo, "max_ns": hi,
+                           "buckets": {str(b): n for b, n in sorted(buckets.items())}}
+                    for name, (c, total, lo, hi, buckets) in _timings.items()},
+    }
+
+
+def merge(other: Dict) -> None:
+    """Add stats from `stats()` of another process (e.g. a sim worker)."""
+    for name, n in other.get("counters", {}).items():
+        count(name, n)
+    for name, s in other.get("timings", {}).items():
+        t = _timings.get(name)
+        if t is None:
+            t = _timings[name] = [0, 0, s["min_ns"], s["max_ns"], {}]
+        t[0] += s["count"]
+        t[1] += s["total_ns"]
+        t[2] = min(t[2], s["min_ns"])
+        t[3] = max(t[3], s["max_ns"])
+        for b, n in s["buckets"].items():
+            t[4][int(b)] = t[4].get(int(b), 0) + n
+
+
+def to_json(path: Optional[str] = None) -> str:
+    text = json.dumps(stats(), indent=2, sort_keys=True)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    return text
+
+
+def _percentile(buckets: Dict[int, int], total: int, q: float) -> int:
+    """Upper bound in ns of the bucket holding the q-quantile."""
+    seen = 0
+    for b in sorted(buckets):
+        seen += buckets[b]
+        if seen >= q * total:
+            return 1 << b
+    return 0
+
+
+def report() -> str:
+    """Text table of timings (slowest total first) and counters.
+
+    Percentiles are read off the histogram, so they are bucket upper bounds.
+    """
+    lines = []
+    if _timings:
+        lines.append(f"{'timing':<36}{'calls':>10}{'total ms':>12}{'mean us':>10}{'p50 us':>9}"
+                     f"{'p99 us':>9}{'max us':>10}")
+        for name, (c, total, lo, hi, buckets) in sorted(_timings.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:<36}{c:>10}{total / 1e6:>12.2f}{total / c / 1e3:>10.1f}"
+                         f"{_percentile(buckets, c, 0.5) / 1e3:>9.1f}{_percentile(buckets, c, 0.99) / 1e3:>9.1f}"
+                         f"{hi / 1e3:>10.1f}")
+    if _counters:
+        if lines:
+            lines.append("")
+        lines.append(f"{'counter':<36}{'value':>10}")
+        for name, n in sorted(_counters.items()):
+            lines.append(f"{name:<36}{n:>10}")
+    return "\n".join(lines) if lines else "no instrumentation data"
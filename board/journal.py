@@ -0,0 +1,344 @@
+"""Append-only binary journal of engine actions, with replay and seek.
+
+`GameEngine.start_journal` writes every action the engine runs outside of
+`push` (moves, loads, unloads, upgrade starts, attacks, phases, rounds) as
+a few struct-packed bytes. Player, truck and resource ids are written once
+as string records and referred to by index afterwards. Every
+`keyframe_every` rounds, and when the journal starts, a keyframe stores
+the engine snapshot and the positions of its RNG streams, packed the same
+way with the same string table.
+
+Layout (little endian):
+
+    header    b"BGJ2", u16 keyframe_every, u64 seed, u8 n, n key parts
+              (b"i" + i64 | b"s" + u16 length + utf-8)
+    record    u8 tag + payload, see the _TAG_* constants
+    keyframe  u8 tag, u32 round, u32 size, then struct-packed sections
+              for players, trucks, warehouses, the frontline, upgrades,
+              queued moves and attacks, moved trucks, started upgrades,
+              the hash and the RNG stream positions; ids are u16 indexes
+              into the string table, see `_pack_keyframe`
+
+Replaying needs the engine's starting map and players (e.g. a fresh
+`scenario.standard_game()`) and an engine seeded with an `RngService`;
+the journal then reproduces the game bit for bit. `Journal.replay(...,
+round=n)` restores the last keyframe at or before round n and runs only
+the actions after it.
+"""
+import struct
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from .coords import coord
+from .rng import RngService
+from .snapshot import GameSnapshot
+
+
+MAGIC = b"BGJ2"
+
+_TAG_STR = 0
+_TAG_MOVE = 1
+_TAG_LOAD = 2
+_TAG_UNLOAD = 3
+_TAG_UPGRADE = 4
+_TAG_ATTACK = 5
+_TAG_MOVEMENT = 6
+_TAG_RESOLVE = 7
+_TAG_FOOD = 8
+_TAG_ROUND = 9
+_TAG_KEYFRAME = 10
+
+# engine action kind -> tag, for actions without arguments
+_PHASES = {"movement": _TAG_MOVEMENT, "resolve_attacks": _TAG_RESOLVE, "food": _TAG_FOOD, "round": _TAG_ROUND}
+_PHASE_KINDS = {tag: kind for kind, tag in _PHASES.items()}
+
+_U16 = struct.Struct("<H")
+_I64 = struct.Struct("<q")
+_HEADER = struct.Struct("<4sHQB")
+_STR = struct.Struct("<BH")
+_MOVE = struct.Struct("<BHHH")
+_STEP = struct.Struct("<hh")
+_CARGO = struct.Struct("<BHHHi")
+_UPGRADE = struct.Struct("<BHhh")
+_ATTACK = struct.Struct("<BHHi")
+_KEYFRAME = struct.Struct("<BII")
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_ITEM = struct.Struct("<Hi")
+_KF_PLAYER = struct.Struct("<Hiiii")
+_KF_TRUCK = struct.Struct("<HHhhi")
+_KF_HEX = struct.Struct("<hhBi")
+_KF_QUEUED = struct.Struct("<HHH")
+_KF_ATTACK = struct.Struct("<HHi")
+
+Action = Tuple[str, tuple]
+Positions = Dict[tuple, int]
+
+
+def _pack_keyframe(snap: GameSnapshot, positions: Positions, sid: Callable[[str], int]) -> bytes:
+    """Snapshot and stream positions as bytes; `sid` interns strings."""
+    out: List[bytes] = []
+
+    def items(pairs) -> None:
+        out.append(_U8.pack(len(pairs)))
+        out.extend(_ITEM.pack(sid(k), v) for k, v in pairs)
+
+    out.append(_U8.pack(len(snap.players)))
+    out.extend(_KF_PLAYER.pack(sid(pid), *pools) for pid, *pools in snap.players)
+    out.append(_U16.pack(len(snap.trucks)))
+    for owner, tid, (q, r), mp, cargo in snap.trucks:
+        out.append(_KF_TRUCK.pack(sid(owner), sid(tid), q, r, mp))
+        items(cargo)
+    out.append(_U16.pack(len(snap.warehouses)))
+    for owner, wid, stock in snap.warehouses:
+        out.append(_U16.pack(sid(owner)) + _U16.pack(sid(wid)))
+        items(stock)
+    out.append(_U8.pack(snap.frontline is not None))
+    if snap.frontline is not None:
+        items(snap.frontline)
+    out.append(_U32.pack(len(snap.upgrades)))
+    out.extend(_KF_HEX.pack(q, r, road | in_progress << 1, turns)
+               for (q, r), road, in_progress, turns in snap.upgrades)
+    out.append(_U16.pack(len(snap.movement_queue)))
+    for pid, tid, path in snap.movement_queue:
+        out.append(_KF_QUEUED.pack(sid(pid), sid(tid), len(path)))
+        out.extend(_STEP.pack(q, r) for q, r in path)
+    out.append(_U16.pack(len(snap.attack_queue)))
+    for a in snap.attack_queue:
+        a = dict(a)
+        out.append(_KF_ATTACK.pack(sid(a["attacker"]), sid(a["defender"]), a["attacking"]))
+    out.append(_U16.pack(len(snap.moved)))
+    out.extend(_U16.pack(sid(tid)) for tid in sorted(snap.moved))
+    items(snap.upgrades_started)
+    out.append(_U64.pack(snap.hash))
+    out.append(_U16.pack(len(positions)))
+    for key, position in positions.items():
+        out.append(_U8.pack(len(key)))
+        out.extend(b"i" + _I64.pack(k) if isinstance(k, int) else b"s" + _U16.pack(sid(k)) for k in key)
+        out.append(_U64.pack(position))
+    return b"".join(out)
+
+
+def _unpack_keyframe(buf: memoryview, strings: List[str]) -> Tuple[GameSnapshot, Positions]:
+    pos = 0
+
+    def read(st: struct.Struct) -> tuple:
+        nonlocal pos
+        values = st.unpack_from(buf, pos)
+        pos += st.size
+        return values
+
+    def count(st: struct.Struct = _U16) -> int:
+        return read(st)[0]
+
+    def items() -> tuple:
+        out = []
+        for _ in range(count(_U8)):
+            k, v = read(_ITEM)
+            out.append((strings[k], v))
+        return tuple(out)
+
+    players = []
+    for _ in range(count(_U8)):
+        pid, *pools = read(_KF_PLAYER)
+        players.append((strings[pid], *pools))
+    trucks = []
+    for _ in range(count()):
+        owner, tid, q, r, mp = read(_KF_TRUCK)
+        trucks.append((strings[owner], strings[tid], coord(q, r), mp, items()))
+    warehouses = []
+    for _ in range(count()):
+        owner, wid = count(), count()
+        warehouses.append((strings[owner], strings[wid], items()))
+    frontline = items() if count(_U8) else None
+    upgrades = []
+    for _ in range(count(_U32)):
+        q, r, flags, turns = read(_KF_HEX)
+        upgrades.append(((q, r), bool(flags & 1), bool(flags & 2), turns))
+    queued = []
+    for _ in range(count()):
+        pid, tid, n = read(_KF_QUEUED)
+        queued.append((strings[pid], strings[tid], tuple(coord(*read(_STEP)) for _ in range(n))))
+    attacks = []
+    for _ in range(count()):
+        att, dfn, n = read(_KF_ATTACK)
+        attacks.append((("attacker", strings[att]), ("defender", strings[dfn]), ("attacking", n)))
+    moved = frozenset(strings[count()] for _ in range(count()))
+    started = items()
+    (h,) = read(_U64)
+    positions = {}
+    for _ in range(count()):
+        key = []
+        for _ in range(count(_U8)):
+            kind = bytes(buf[pos:pos + 1])
+            pos += 1
+            key.append(read(_I64)[0] if kind == b"i" else strings[count()])
+        positions[tuple(key)] = read(_U64)[0]
+    snap = GameSnapshot(players=tuple(players), trucks=tuple(trucks), warehouses=tuple(warehouses),
+                        frontline=frontline, upgrades=tuple(upgrades), movement_queue=tuple(queued),
+                        attack_queue=tuple(attacks), moved=moved, upgrades_started=started, hash=h)
+    return snap, positions
+
+
+class JournalWriter:
+    """Writes one engine's actions to a binary stream; see `GameEngine.start_journal`."""
+
+    def __init__(self, out: BinaryIO, rngs: RngService, keyframe_every: int = 10):
+        self.out = out
+        self.keyframe_every = keyframe_every
+        self.rounds = 0
+        self._strings: Dict[str, int] = {}
+        key = b"".join(b"i" + _I64.pack(k) if isinstance(k, int) else
+                       b"s" + _U16.pack(len(k.encode())) + k.encode() for k in rngs.key)
+        out.write(_HEADER.pack(MAGIC, keyframe_every, rngs.seed, len(rngs.key)) + key)
+
+    def _sid(self, s: str) -> int:
+        i = self._strings.get(s)
+        if i is None:
+            i = self._strings[s] = len(self._strings)
+            data = s.encode()
+            self.out.write(_STR.pack(_TAG_STR, len(data)) + data)
+        return i
+
+    def record(self, engine, kind: str, args: tuple) -> None:
+        out = self.out
+        if kind == "move":
+            pid, tid, path = args
+            steps = list(path)
+            out.write(_MOVE.pack(_TAG_MOVE, self._sid(pid), self._sid(tid), len(steps))
+                      + b"".join(_STEP.pack(q, r) for q, r in steps))
+        elif kind in ("load", "unload"):
+            pid, tid, res, amount = args
+            tag = _TAG_LOAD if kind == "load" else _TAG_UNLOAD
+            out.write(_CARGO.pack(tag, self._sid(pid), self._sid(tid), self._sid(res), amount))
+        elif kind == "upgrade":
+            pid, q, r = args
+            out.write(_UPGRADE.pack(_TAG_UPGRADE, self._sid(pid), q, r))
+        elif kind == "attack":
+            att, dfn, n = args
+            out.write(_ATTACK.pack(_TAG_ATTACK, self._sid(att), self._sid(dfn), n))
+        else:
+            out.write(bytes((_PHASES[kind],)))
+            if kind == "round":
+                self.rounds += 1
+                if self.keyframe_every and self.rounds % self.keyframe_every == 0:
+                    self.keyframe(engine)
+
+    def keyframe(self, engine) -> None:
+        data = _pack_keyframe(engine.snapshot(), engine.rngs.positions(), self._sid)
+        self.out.write(_KEYFRAME.pack(_TAG_KEYFRAME, self.rounds, len(data)) + data)
+
+    def close(self) -> None:
+        self.out.close()
+
+
+class Journal:
+    """A parsed journal: its actions, round boundaries and keyframes."""
+
+    def __init__(self, seed: int, key: tuple, keyframe_every: int):
+        self.seed = seed
+        self.key = key
+        self.keyframe_every = keyframe_every
+        self.actions: List[Action] = []
+        # index into `actions` just after each round, by round number - 1
+        self.round_ends: List[int] = []
+        # (round, index into `actions`, packed keyframe)
+        self.keyframes: List[Tuple[int, int, bytes]] = []
+        # the journal's string table, which keyframes refer to
+        self.strings: List[str] = []
+
+    @property
+    def rounds(self) -> int:
+        return len(self.round_ends)
+
+    @classmethod
+    def read(cls, source: Union[str, bytes, BinaryIO]) -> "Journal":
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                data = f.read()
+        elif isinstance(source, (bytes, bytearray)):
+            data = bytes(source)
+        else:
+            data = source.read()
+        buf = memoryview(data)
+        magic, every, seed, nkey = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("not a journal")
+        pos = _HEADER.size
+        key = []
+        for _ in range(nkey):
+            if buf[pos:pos + 1] == b"i":
+                key.append(_I64.unpack_from(buf, pos + 1)[0])
+                pos += 1 + _I64.size
+            else:
+                (n,) = _U16.unpack_from(buf, pos + 1)
+                key.append(bytes(buf[pos + 3:pos + 3 + n]).decode())
+                pos += 3 + n
+        j = cls(seed, tuple(key), every)
+        strings = j.strings
+        actions = j.actions
+        end = len(buf)
+        while pos < end:
+            tag = buf[pos]
+            if tag == _TAG_STR:
+                _, n = _STR.unpack_from(buf, pos)
+                pos += _STR.size
+                strings.append(bytes(buf[pos:pos + n]).decode())
+                pos += n
+            elif tag == _TAG_MOVE:
+                _, pid, tid, n = _MOVE.unpack_from(buf, pos)
+                pos += _MOVE.size
+                path = [_STEP.unpack_from(buf, pos + i * _STEP.size) for i in range(n)]
+                pos += n * _STEP.size
+                actions.append(("move", (strings[pid], strings[tid], path)))
+            elif tag in (_TAG_LOAD, _TAG_UNLOAD):
+                _, pid, tid, res, amount = _CARGO.unpack_from(buf, pos)
+                pos += _CARGO.size
+                kind = "load" if tag == _TAG_LOAD else "unload"
+                actions.append((kind, (strings[pid], strings[tid], strings[res], amount)))
+            elif tag == _TAG_UPGRADE:
+                _, pid, q, r = _UPGRADE.unpack_from(buf, pos)
+                pos += _UPGRADE.size
+                actions.append(("upgrade", (strings[pid], q, r)))
+            elif tag == _TAG_ATTACK:
+                _, att, dfn, n = _ATTACK.unpack_from(buf, pos)
+                pos += _ATTACK.size
+                actions.append(("attack", (strings[att], strings[dfn], n)))
+            elif tag == _TAG_KEYFRAME:
+                _, rnd, n = _KEYFRAME.unpack_from(buf, pos)
+                pos += _KEYFRAME.size
+                j.keyframes.append((rnd, len(actions), bytes(buf[pos:pos + n])))
+                pos += n
+            elif tag in _PHASE_KINDS:
+                pos += 1
+                actions.append((_PHASE_KINDS[tag], ()))
+                if tag == _TAG_ROUND:
+                    j.round_ends.append(len(actions))
+            else:
+                raise ValueError(f"bad journal record tag {tag} at offset {pos}")
+        return j
+
+    def replay(self, board_map, players, round: Optional[int] = None):
+        """Engine for the journaled game, after `round` rounds (default: all actions).
+
+        `board_map` and `players` must be the game's starting setup; they
+        become the returned engine's state.
+        """
+        from .game_engine import ACTIONS, GameEngine
+
+        engine = GameEngine(board_map, players, rng=RngService(self.seed).split(*self.key))
+        stop = len(self.actions)
+        if round is not None:
+            if not 0 <= round <= self.rounds:
+                raise ValueError(f"journal has {self.rounds} rounds, not {round}")
+            stop = self.round_ends[round - 1] if round else 0
+        start = 0
+        usable = [k for k in self.keyframes if k[1] <= stop]
+        if usable:
+            _, start, data = usable[-1]
+            snap, positions = _unpack_keyframe(memoryview(data), self.strings)
+            engine.restore(snap)
+            engine.rngs.seek(positions)
+        for kind, args in self.actions[start:stop]:
+            getattr(engine, ACTIONS[kind])(*args)
+        return engine
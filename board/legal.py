@@ -0,0 +1,153 @@
+"""Legal action generation for `GameEngine.legal_actions`.
+
+Actions are yielded as `GameEngine.push` tuples, most promising first:
+unloads at the frontline, the attack, loads at an own warehouse, truck
+moves, then road upgrades. Quantities are the largest legal amount; any
+smaller positive amount is legal as well.
+
+Truck moves are the only costly part (a bounded Dijkstra per truck), so
+each truck's move list is cached under (position, remaining MP, map
+version, loaded). After an action only the trucks whose key changed are
+recomputed; everything else is an O(1) check on the current state.
+"""
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .coords import Coord
+from .entities import Frontline, Truck, Warehouse
+from .hexgeom import hex_distance
+from .pathfinding import FRONTLINE, path_to, truck_reach
+
+
+Action = Tuple
+
+RESOURCES = ("food", "ammo", "soldiers")
+
+
+class LegalActions:
+    def __init__(self, engine):
+        self.engine = engine
+        # truck id -> (cache key, move actions in heuristic order)
+        self._moves: Dict[str, Tuple[Tuple, List[Action]]] = {}
+        # player id -> (map version, sort keys, unupgraded hexes in heuristic
+        # order); kept current from the map's change log
+        self._upgrades: Dict[str, Tuple[int, List[Tuple], List[Coord]]] = {}
+        # number of per-truck move lists computed, for tests and profiling
+        self.rebuilds = 0
+
+    def _home(self, player_id: str) -> Optional[Coord]:
+        """The player's first warehouse, None if it has none."""
+        wh = next(iter(self.engine.players[player_id].warehouses.values()), None)
+        return wh.position if wh is not None else None
+
+    def moves(self, player_id: str, truck: Truck) -> List[Action]:
+        """Every destination the truck can reach this turn, nearest its goal first.
+
+        Loaded trucks head for the frontline, empty ones for home; without a
+        warehouse, empty trucks' moves are ordered by cost alone.
+        """
+        board_map = self.engine.map
+        loaded = any(truck.cargo.values())
+        key = (truck.position, truck.remaining_mp, board_map.version, loaded)
+        cached = self._moves.get(truck.id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        self.rebuilds += 1
+        goal = FRONTLINE if loaded else self._home(player_id)
+        reach = truck_reach(board_map, truck)
+        occupancy = board_map.occupancy
+        dests = [c for c in reach["cost"]
+                 if c != truck.position and not occupancy.entities_at(c, Warehouse)]
+        if goal is None:
+            dests.sort(key=lambda c: (reach["cost"][c], c))
+        else:
+            dests.sort(key=lambda c: (hex_distance(c, goal), reach["cost"][c], c))
+        moves = [("move", player_id, truck.id, tuple(path_to(reach, c)[1:])) for c in dests]
+        self._moves[truck.id] = (key, moves)
+        return moves
+
+    def _upgrade_key(self, c: Coord, home: Optional[Coord]) -> Tuple:
+        if home is None:
+            # no warehouse, so no corridor to favour
+            return (c,)
+        return (hex_distance(c, home) + hex_distance(c, FRONTLINE), hex_distance(c, home), c)
+
+    def upgradable(self, player_id: str) -> Iterator[Coord]:
+        """Hexes an engineer could start on, those on the home-frontline corridor first.
+
+        The sorted list of unupgraded hexes is patched with the hexes the
+        map reports changed; upgrades in progress are skipped as they are
+        yielded.
+        """
+        board_map = self.engine.map
+        home = self._home(player_id)
+        cached = self._upgrades.get(player_id)
+        changes = None if cached is None else board_map.changes_since(cached[0])
+        if changes is None:
+            hexes = sorted((self._upgrade_key(h.id, home), h.id)
+                           for h in board_map.hexes() if not h.road_upgraded)
+            keys = [k for k, _ in hexes]
+            coords = [c for _, c in hexes]
+        else:
+            _, keys, coords = cached
+            if changes:
+                # copies, so generators still iterating the old lists are unaffected
+                keys, coords = list(keys), list(coords)
+            for c, _ in changes:
+                h = board_map.get_hex(*c)
+                k = self._upgrade_key(c, home)
+                i = bisect_left(keys, k)
+                present = i < len(keys) and keys[i] == k
+                if h is not None and not h.road_upgraded:
+                    if not present:
+                        keys.insert(i, k)
+                        coords.insert(i, c)
+                elif present:
+                    del keys[i]
+                    del coords[i]
+        self._upgrades[player_id] = (board_map.version, keys, coords)
+        for c in coords:
+            h = board_map.get_hex(*c)
+            if not h.upgrade_in_progress:
+                yield c
+
+    def actions(self, player_id: str) -> Iterator[Action]:
+        engine = self.engine
+        player = engine.players[player_id]
+        occupancy = engine.map.occupancy
+        trucks = list(player.trucks.values())
+
+        for t in trucks:
+            if occupancy.entities_adjacent(t.position, Frontline):
+                for res in RESOURCES:
+                    if t.cargo.get(res, 0) > 0:
+                        yield ("unload", player_id, t.id, res, t.cargo[res])
+
+        queued = sum(a["attacking"] for a in engine.attack_queue if a["attacker"] == player_id)
+        n = min(player.soldiers, player.ammo) - queued
+        if n > 0:
+            for opp in engine.players:
+                if opp != player_id:
+                    yield ("attack", player_id, opp, n)
+
+        for t in trucks:
+            free = t.capacity - sum(t.cargo.values())
+            if free <= 0:
+                continue
+            stock = {}
+            for wh in occupancy.entities_adjacent(t.position, Warehouse):
+                if wh.owner_id == player_id:
+                    for res in RESOURCES:
+                        stock[res] = max(stock.get(res, 0), wh.stock.get(res, 0))
+            for res in RESOURCES:
+                amount = min(free, stock.get(res, 0))
+                if amount > 0:
+                    yield ("load", player_id, t.id, res, amount)
+
+        for t in trucks:
+            if t.id not in engine.moved_this_round:
+                yield from self.moves(player_id, t)
+
+        if engine.upgrades_this_round.get(player_id, 0) < player.engineers:
+            for q, r in self.upgradable(player_id):
+                yield ("upgrade", player_id, q, r)
@@ -1,41 +1,408 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .coords import Coord, coord
+from .hexgeom import DIRECTIONS
+from .occupancy import OccupancyIndex
+from . import rules
 
 
 @dataclass
 class Hex:
-    id: str
     q: int
     r: int
     terrain: str = "plain"
     road_upgraded: bool = False
-    occupants: List[str] = field(default_factory=list)
     # engineering/upgrade state
     upgrade_in_progress: bool = False
     upgrade_turns_left: int = 0
 
+    @property
+    def id(self) -> Coord:
+        return coord(self.q, self.r)
+
+
+def tile_cost(terrain: str, road_upgraded: bool) -> int:
+    """MP cost to enter a hex with the given terrain and road state."""
+    if road_upgraded:
+        return rules.UPGRADED_ROAD_COST
+    return rules.TERRAIN_COSTS.get(terrain, rules.OFFROAD_COST)
+
+
+class _ChangeTracking:
+    """Map version counter with a bounded log of changed tiles.
+
+    `version` increases every time the cost landscape may have changed: a
+    tile added through `add_hex`, or a tile reported via `mark_changed`
+    (e.g. a road upgrade completing). Caches remember the version they were
+    built against and ask `changes_since` what to invalidate.
+
+    Changed tiles are also queued for the compiled cost table, so edits to a
+    tile's terrain or road state must be followed by `mark_changed` once the
+    table has been read.
+
+    `state_version` additionally counts upgrade-progress edits that leave
+    costs alone (`mark_state_changed`), so `upgrade_state` can be cached.
+    """
+
+    CHANGE_LOG_SIZE = 4096
+
+    def _init_changes(self) -> None:
+        self.version = 0
+        # entries are ((q, r), added) for versions _log_base+1 .. version
+        self._changes: List[Tuple[Tuple[int, int], bool]] = []
+        self._log_base = 0
+        # tiles whose compiled cost must be refreshed on the next cost_table();
+        # only tracked once the table has been compiled
+        self._costs_compiled = False
+        self._dirty_costs = set()
+        self.state_version = 0
+        self._upgrade_state = None
+        self._upgrade_state_version = -1
+
+    def _record_change(self, q: int, r: int, added: bool) -> None:
+        self.version += 1
+        self.state_version += 1
+        if self._costs_compiled:
+            self._dirty_costs.add((q, r))
+        self._changes.append(((q, r), added))
+        if len(self._changes) > self.CHANGE_LOG_SIZE:
+            drop = len(self._changes) - self.CHANGE_LOG_SIZE
+            del self._changes[:drop]
+            self._log_base += drop
+
+    def mark_changed(self, q: int, r: int) -> None:
+        """Record that the movement cost of an existing hex changed."""
+        self._record_change(q, r, False)
+
+    def mark_state_changed(self) -> None:
+        """Record an upgrade-progress edit that does not change movement costs."""
+        self.state_version += 1
+
+    def upgrade_state(self) -> Tuple[Tuple[Tuple[int, int], bool, bool, int], ...]:
+        """((q, r), road_upgraded, upgrade_in_progress, upgrade_turns_left) per hex off its defaults.
+
+        The tuple is rebuilt only after `state_version` moves, so callers
+        holding on to it (snapshots) share one object while nothing changes.
+        """
+        if self._upgrade_state_version != self.state_version:
+            self._upgrade_state = tuple(
+                ((h.q, h.r), h.road_upgraded, h.upgrade_in_progress, h.upgrade_turns_left)
+                for h in self.hexes()
+                if h.road_upgraded or h.upgrade_in_progress or h.upgrade_turns_left)
+            self._upgrade_state_version = self.state_version
+        return self._upgrade_state
+
+    def set_upgrade_state(self, state: Tuple[Tuple[Tuple[int, int], bool, bool, int], ...]) -> None:
+        """Reset every hex's upgrade fields to `state` (as returned by `upgrade_state`)."""
+        current = self.upgrade_state()
+        if state is current:
+            return
+        target = {c: rest for c, *rest in state}
+        for c in {c for c, *_ in current} | set(target):
+            road, in_progress, turns = target.get(c, (False, False, 0))
+            h = self.get_hex(*c)
+            if h is None:
+                continue
+            h.upgrade_in_progress = in_progress
+            h.upgrade_turns_left = turns
+            if h.road_upgraded != road:
+                h.road_upgraded = road
+                self.mark_changed(*c)
+        self.state_version += 1
+        self._upgrade_state = state
+        self._upgrade_state_version = self.state_version
+
+    def changes_since(self, version: int) -> Optional[List[Tuple[Tuple[int, int], bool]]]:
+        """Return ((q, r), added) for every change after `version`.
 
-class Map:
-    """Simple axial-coordinate hex map"""
+        Returns None if the log no longer reaches back that far; callers must
+        then treat everything as changed.
+        """
+        if version < self._log_base:
+            return None
+        return self._changes[version - self._log_base:]
+
+
+class Map(_ChangeTracking):
+    """Simple axial-coordinate hex map.
+
+    `occupancy` indexes the trucks, warehouses and frontline on each hex.
+    """
 
     def __init__(self):
         # store hexes by (q,r) tuple
         self._hexes: Dict[Tuple[int, int], Hex] = {}
+        self._costs: Dict[Tuple[int, int], int] = {}
+        self.occupancy = OccupancyIndex()
+        self._init_changes()
+
+    def __len__(self) -> int:
+        return len(self._hexes)
 
     def add_hex(self, q: int, r: int, terrain: str = "plain") -> Hex:
-        h = Hex(id=f"{q},{r}", q=q, r=r, terrain=terrain)
+        h = Hex(q=q, r=r, terrain=terrain)
         self._hexes[(q, r)] = h
+        self._record_change(q, r, True)
         return h
 
     def get_hex(self, q: int, r: int) -> Hex:
         return self._hexes.get((q, r))
 
+    def hexes(self) -> Iterator[Hex]:
+        return iter(self._hexes.values())
+
+    def cost_table(self) -> Dict[Tuple[int, int], int]:
+        """(q, r) -> MP cost to enter, for every hex on the map.
+
+        Compiled once and refreshed for tiles recorded by `add_hex` and
+        `mark_changed`. Missing keys are off the map. The frontline rule is
+        not part of the table.
+        """
+        costs = self._costs
+        if not self._costs_compiled:
+            costs = self._costs = {k: tile_cost(h.terrain, h.road_upgraded) for k, h in self._hexes.items()}
+            self._costs_compiled = True
+        elif self._dirty_costs:
+            for k in self._dirty_costs:
+                h = self._hexes.get(k)
+                if h is not None:
+                    costs[k] = tile_cost(h.terrain, h.road_upgraded)
+            self._dirty_costs.clear()
+        return costs
+
     def neighbors(self, q: int, r: int) -> List[Hex]:
         # axial hex neighbors
-        directions = [(+1, 0), (+1, -1), (0, -1), (-1, 0), (-1, +1), (0, +1)]
         res = []
-        for dq, dr in directions:
+        for dq, dr in DIRECTIONS:
             h = self._hexes.get((q + dq, r + dr))
             if h:
                 res.append(h)
         return res
+
+
+# ----- dense array backend -----
+
+class HexView:
+    """Lightweight Hex-compatible view onto one tile of an ArrayMap.
+
+    Reads and writes go straight to the map's arrays, so views are cheap to
+    create and never go stale.
+    """
+
+    __slots__ = ("_map", "_i", "q", "r")
+
+    def __init__(self, board_map: "ArrayMap", index: int, q: int, r: int):
+        self._map = board_map
+        self._i = index
+        self.q = q
+        self.r = r
+
+    @property
+    def id(self) -> Coord:
+        return coord(self.q, self.r)
+
+    @property
+    def terrain(self) -> str:
+        return self._map._terrain_names[self._map._terrain[self._i]]
+
+    @terrain.setter
+    def terrain(self, value: str) -> None:
+        self._map._terrain[self._i] = self._map._terrain_code(value)
+
+    @property
+    def road_upgraded(self) -> bool:
+        return bool(self._map._road_upgraded[self._i])
+
+    @road_upgraded.setter
+    def road_upgraded(self, value: bool) -> None:
+        self._map._road_upgraded[self._i] = 1 if value else 0
+
+    @property
+    def upgrade_in_progress(self) -> bool:
+        return bool(self._map._upgrade_in_progress[self._i])
+
+    @upgrade_in_progress.setter
+    def upgrade_in_progress(self, value: bool) -> None:
+        self._map._upgrade_in_progress[self._i] = 1 if value else 0
+
+    @property
+    def upgrade_turns_left(self) -> int:
+        return self._map._upgrade_turns_left[self._i]
+
+    @upgrade_turns_left.setter
+    def upgrade_turns_left(self, value: int) -> None:
+        self._map._upgrade_turns_left[self._i] = value
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, HexView):
+            return self._map is other._map and self._i == other._i
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._map), self._i))
+
+    def __repr__(self) -> str:
+        return (f"HexView(id={self.id!r}, terrain={self.terrain!r}, road_upgraded={self.road_upgraded}, "
+                f"upgrade_in_progress={self.upgrade_in_progress}, upgrade_turns_left={self.upgrade_turns_left})")
+
+
+class _ArrayCosts:
+    """Read-only mapping view of an ArrayMap's compiled cost array."""
+
+    __slots__ = ("_map",)
+
+    def __init__(self, board_map: "ArrayMap"):
+        self._map = board_map
+
+    def get(self, coord: Tuple[int, int], default=None):
+        m = self._map
+        q, r = coord
+        if q < m.min_q or q > m.max_q or r < m.min_r or r > m.max_r:
+            return default
+        c = m._cost[(r - m.min_r) * m.width + (q - m.min_q)]
+        return c if c else default
+
+    def __getitem__(self, coord: Tuple[int, int]) -> int:
+        c = self.get(coord)
+        if c is None:
+            raise KeyError(coord)
+        return c
+
+    def __contains__(self, coord) -> bool:
+        return self.get(coord) is not None
+
+
+class ArrayMap(_ChangeTracking):
+    """Axial hex map backed by flat typed arrays.
+
+    Tiles live in a dense rectangle of axial coordinates
+    [min_q, max_q] x [min_r, max_r]; tile (q, r) is stored at offset
+    (r - min_r) * width + (q - min_q). Each tile costs a handful of bytes
+    instead of a Hex object and a dict entry, which
+    matters for maps of 10^5 tiles and up.
+
+    `get_hex`, `neighbors` and `hexes` return `HexView` objects that expose
+    the same attributes as `Hex`.
+    """
+
+    def __init__(self, min_q: int, max_q: int, min_r: int, max_r: int):
+        if max_q < min_q or max_r < min_r:
+            raise ValueError("empty coordinate range")
+        self.min_q = min_q
+        self.max_q = max_q
+        self.min_r = min_r
+        self.max_r = max_r
+        self.width = max_q - min_q + 1
+        size = self.width * (max_r - min_r + 1)
+        self._present = array("B", bytes(size))
+        self._terrain = array("B", bytes(size))
+        self._road_upgraded = array("B", bytes(size))
+        self._upgrade_in_progress = array("B", bytes(size))
+        self._upgrade_turns_left = array("h", bytes(2 * size))
+        # compiled MP cost per tile, 0 for tiles not on the map
+        self._cost = array("B", bytes(size))
+        self._terrain_names: List[str] = ["plain"]
+        self._count = 0
+        self.occupancy = OccupancyIndex()
+        self._init_changes()
+
+    @classmethod
+    def from_map(cls, board_map: Map) -> "ArrayMap":
+        """Build an ArrayMap holding the same tiles and state as `board_map`."""
+        qs = [h.q for h in board_map.hexes()]
+        rs = [h.r for h in board_map.hexes()]
+        if not qs:
+            raise ValueError("map has no hexes")
+        res = cls(min(qs), max(qs), min(rs), max(rs))
+        for h in board_map.hexes():
+            v = res.add_hex(h.q, h.r, h.terrain)
+            v.road_upgraded = h.road_upgraded
+            v.upgrade_in_progress = h.upgrade_in_progress
+            v.upgrade_turns_left = h.upgrade_turns_left
+        res.occupancy = board_map.occupancy.copy()
+        return res
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _index(self, q: int, r: int) -> Optional[int]:
+        if q < self.min_q or q > self.max_q or r < self.min_r or r > self.max_r:
+            return None
+        return (r - self.min_r) * self.width + (q - self.min_q)
+
+    def _terrain_code(self, terrain: str) -> int:
+        try:
+            return self._terrain_names.index(terrain)
+        except ValueError:
+            if len(self._terrain_names) >= 256:
+                raise ValueError("too many terrain types")
+            self._terrain_names.append(terrain)
+            return len(self._terrain_names) - 1
+
+    def add_hex(self, q: int, r: int, terrain: str = "plain") -> HexView:
+        i = self._index(q, r)
+        if i is None:
+            raise ValueError(f"hex {q},{r} outside map bounds")
+        if not self._present[i]:
+            self._present[i] = 1
+            self._count += 1
+        # (re)adding a tile resets it, like Map.add_hex replacing the Hex
+        self._terrain[i] = self._terrain_code(terrain)
+        self._road_upgraded[i] = 0
+        self._upgrade_in_progress[i] = 0
+        self._upgrade_turns_left[i] = 0
+        self._record_change(q, r, True)
+        return HexView(self, i, q, r)
+
+    def _compile_cost(self, i: int) -> None:
+        if self._present[i]:
+            self._cost[i] = tile_cost(self._terrain_names[self._terrain[i]], self._road_upgraded[i])
+        else:
+            self._cost[i] = 0
+
+    def cost_table(self) -> _ArrayCosts:
+        """Mapping (q, r) -> MP cost to enter, see `Map.cost_table`."""
+        if not self._costs_compiled:
+            for i in range(len(self._present)):
+                self._compile_cost(i)
+            self._costs_compiled = True
+        elif self._dirty_costs:
+            for q, r in self._dirty_costs:
+                i = self._index(q, r)
+                if i is not None:
+                    self._compile_cost(i)
+            self._dirty_costs.clear()
+        return _ArrayCosts(self)
+
+    def get_hex(self, q: int, r: int) -> Optional[HexView]:
+        dq = q - self.min_q
+        dr = r - self.min_r
+        if dq < 0 or dq >= self.width or dr < 0 or r > self.max_r:
+            return None
+        i = dr * self.width + dq
+        if not self._present[i]:
+            return None
+        return HexView(self, i, q, r)
+
+    def hexes(self) -> Iterator[HexView]:
+        present = self._present
+        width = self.width
+        for i in range(len(present)):
+            if present[i]:
+                yield HexView(self, i, self.min_q + i % width, self.min_r + i // width)
+
+    def neighbors(self, q: int, r: int) -> List[HexView]:
+        min_q, max_q, min_r, max_r = self.min_q, self.max_q, self.min_r, self.max_r
+        width = self.width
+        present = self._present
+        res = []
+        for dq, dr in DIRECTIONS:
+            nq = q + dq
+            nr = r + dr
+            if min_q <= nq <= max_q and min_r <= nr <= max_r:
+                i = (nr - min_r) * width + (nq - min_q)
+                if present[i]:
+                    res.append(HexView(self, i, nq, nr))
+        return res
@@ -0,0 +1,299 @@
+"""Monte Carlo Tree Search player.
+
+Each decision grows a UCT tree over single engine actions, as used by
+`GameEngine.push`: truck moves toward the frontline or home, loads and
+unloads, road upgrades, attacks, and ("end",) to finish the turn. Both
+players are searched in turn order; after the last player's ("end",) the
+tree applies ("round",). Tree steps are pushed and popped, playouts run
+the scripted `SupplyPolicy` from a snapshot that is restored afterwards,
+so the engine is left exactly as it was found.
+
+A search stops after `iterations` playouts or `time_limit` seconds,
+whichever comes first. With `workers > 1` each worker process grows its
+own tree from the same position (root parallelism) and the visit counts
+of the root actions are summed before choosing.
+
+As a sim policy, an `MCTSPlayer` keeps choosing and applying actions until
+the search picks ("end",):
+
+    python -m board.sim --games 10 --p1 mcts --p2 supply
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .entities import Frontline, Warehouse
+from .game_engine import ACTIONS, GameEngine
+from .pathfinding import FRONTLINE
+from .sim import SupplyPolicy, _opponent
+
+
+Action = Tuple
+# root action -> (visits, total reward of the searching player)
+RootStats = Dict[Action, Tuple[int, float]]
+
+END = ("end",)
+
+
+# ----- candidate actions -----
+def candidate_actions(engine: GameEngine, player_id: str, policy: SupplyPolicy) -> List[Action]:
+    """A small set of sensible actions for `player_id`; always includes END.
+
+    `policy` supplies the cached distance fields used to route trucks.
+    """
+    player = engine.players[player_id]
+    occupancy = engine.map.occupancy
+    acts: List[Action] = [END]
+
+    n = min(player.soldiers, player.ammo)
+    if n > 0 and not any(a["attacker"] == player_id for a in engine.attack_queue):
+        opp = _opponent(engine, player_id)
+        acts.append(("attack", player_id, opp, n))
+        if n >= 4:
+            acts.append(("attack", player_id, opp, n // 2))
+
+    wh = next(iter(player.warehouses.values()), None)
+    home = wh.position if wh is not None else None
+    for tid, truck in player.trucks.items():
+        if tid not in engine.moved_this_round:
+            seen = set()
+            for target in (FRONTLINE, home):
+                if target is None:
+                    continue
+                steps = tuple(policy.step_toward(engine, truck, target))
+                if steps and steps not in seen:
+                    seen.add(steps)
+                    acts.append(("move", player_id, tid, steps))
+        free = truck.capacity - sum(truck.cargo.values())
+        if free > 0:
+            for wh in occupancy.entities_adjacent(truck.position, Warehouse):
+                if wh.owner_id != player_id:
+                    continue
+                for res in ("food", "ammo", "soldiers"):
+                    amount = min(free, wh.stock.get(res, 0))
+                    if amount > 0:
+                        acts.append(("load", player_id, tid, res, amount))
+                break
+        if occupancy.entities_adjacent(truck.position, Frontline):
+            for res in ("food", "ammo", "soldiers"):
+                if truck.cargo.get(res, 0) > 0:
+                    acts.append(("unload", player_id, tid, res, truck.cargo[res]))
+
+    if home is not None and engine.upgrades_this_round.get(player_id, 0) < player.engineers:
+        route = policy._field(engine, FRONTLINE).path_from(home)
+        for c in (route["path"][1:] if route else ()):
+            h = engine.map.get_hex(*c)
+            if h is not None and not h.road_upgraded and not h.upgrade_in_progress:
+                acts.append(("upgrade", player_id, c[0], c[1]))
+                break
+    return acts
+
+
+# ----- tree -----
+class _Node:
+    __slots__ = ("action", "parent", "player", "to_move", "children", "untried", "visits", "value")
+
+    def __init__(self, action: Optional[Action], parent: Optional["_Node"], player: Optional[str],
+                 to_move: Optional[str]):
+        self.action = action
+        self.parent = parent
+        # player who chose `action`; rewards are kept from their side
+        self.player = player
+        # player to act here, None once the game is over
+        self.to_move = to_move
+        self.children: List[_Node] = []
+        self.untried: Optional[List[Action]] = None
+        self.visits = 0
+        self.value = 0.0
+
+    def best_child(self, c: float) -> "_Node":
+        log_n = math.log(self.visits)
+        return max(self.children,
+                   key=lambda ch: ch.value / ch.visits + c * math.sqrt(log_n / ch.visits))
+
+
+def _game_over(engine: GameEngine) -> bool:
+    return sum(1 for p in engine.players.values() if p.soldiers > 0) <= 1
+
+
+def evaluate(engine: GameEngine) -> Dict[str, float]:
+    """Reward in [0, 1] per player: 1 for the winner, else a share of the soldiers."""
+    total = sum(p.soldiers for p in engine.players.values())
+    if total == 0:
+        return {pid: 0.5 for pid in engine.players}
+    return {pid: p.soldiers / total for pid, p in engine.players.items()}
+
+
+class MCTSPlayer:
+    """UCT search over engine actions, usable as a `board.sim` policy.
+
+    Stops after `iterations` playouts or `time_limit` seconds per decision
+    (at least one must be given); playouts last up to `playout_rounds`
+    rounds. `workers > 1` runs root-parallel searches in a process pool,
+    splitting `iterations` between them; call `close()` to stop the pool.
+    """
+
+    def __init__(self, iterations: Optional[int] = 200, time_limit: Optional[float] = None,
+                 workers: int = 1, exploration: float = 1.4, playout_rounds: int = 8,
+                 seed: Optional[int] = None):
+        if iterations is None and time_limit is None:
+            raise ValueError("need an iteration or time budget")
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.workers = workers
+        self.exploration = exploration
+        self.playout_rounds = playout_rounds
+        self.rng = random.Random(seed)
+        # unseeded players draw their seed from the game's rng on first use
+        self._seeded = seed is not None
+        self._policy = SupplyPolicy()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "MCTSPlayer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _params(self) -> Dict:
+        return {"time_limit": self.time_limit, "exploration": self.exploration,
+                "playout_rounds": self.playout_rounds}
+
+    # ----- turn order -----
+    @staticmethod
+    def _next(engine: GameEngine, player_id: str, action: Action) -> str:
+        """Player to act after `player_id` plays `action`."""
+        if action != END:
+            return player_id
+        order = list(engine.players)
+        return order[(order.index(player_id) + 1) % len(order)]
+
+    @staticmethod
+    def _apply(engine: GameEngine, node: _Node) -> None:
+        """Push `node.action`, or the round the last player's END closes."""
+        if node.action != END:
+            engine.push(node.action)
+        elif node.player == list(engine.players)[-1]:
+            engine.push(("round",))
+
+    # ----- search -----
+    def search(self, engine: GameEngine, player_id: str) -> RootStats:
+        """Visits and total reward of each root action for `player_id`."""
+        if self.workers > 1:
+            return self._search_parallel(engine, player_id)
+        return self._search(engine, player_id, self.iterations)
+
+    def _search(self, engine: GameEngine, player_id: str, iterations: Optional[int]) -> RootStats:
+        root = _Node(None, None, None, player_id)
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        game_rng, engine.rng = engine.rng, self.rng.random
+        try:
+            with engine.offline():
+                done = 0
+                while True:
+                    self._iterate(engine, root)
+                    done += 1
+                    if iterations is not None and done >= iterations:
+                        break
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        break
+        finally:
+            engine.rng = game_rng
+        return {ch.action: (ch.visits, ch.value) for ch in root.children}
+
+    def _iterate(self, engine: GameEngine, root: _Node) -> None:
+        start = engine.depth
+        node = root
+        # selection
+        while node.to_move is not None:
+            if node.untried is None:
+                node.untried = candidate_actions(engine, node.to_move, self._policy)
+                self.rng.shuffle(node.untried)
+            if node.untried:
+                break
+            node = node.best_child(self.exploration)
+            self._apply(engine, node)
+        # expansion
+        if node.to_move is not None:
+            action = node.untried.pop()
+            to_move = self._next(engine, node.to_move, action)
+            child = _Node(action, node, node.to_move, to_move)
+            node.children.append(child)
+            node = child
+            self._apply(engine, node)
+            if _game_over(engine):
+                node.to_move = None
+        # playout
+        if node.to_move is None:
+            reward = evaluate(engine)
+        else:
+            snap = engine.snapshot()
+            reward = self._playout(engine, node.to_move)
+            engine.restore(snap)
+        while engine.depth > start:
+            engine.pop()
+        # backpropagation
+        while node is not None:
+            node.visits += 1
+            if node.player is not None:
+                node.value += reward[node.player]
+            node = node.parent
+
+    def _playout(self, engine: GameEngine, to_move: str) -> Dict[str, float]:
+        order = list(engine.players)
+        first = order.index(to_move)
+        for rnd in range(self.playout_rounds):
+            for pid in order[first if rnd == 0 else 0:]:
+                self._policy(engine, pid, self.rng)
+            engine.run_round()
+            if _game_over(engine):
+                break
+        return evaluate(engine)
+
+    def _search_parallel(self, engine: GameEngine, player_id: str) -> RootStats:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        per_worker = None if self.iterations is None else -(-self.iterations // self.workers)
+        snap = engine.snapshot()
+        futures = [self._pool.submit(_search_worker, engine.map, engine.players, snap, player_id,
+                                     per_worker, self._params(), self.rng.getrandbits(64))
+                   for _ in range(self.workers)]
+        merged: RootStats = {}
+        for fut in futures:
+            for action, (visits, value) in fut.result().items():
+                v, total = merged.get(action, (0, 0.0))
+                merged[action] = (v + visits, total + value)
+        return merged
+
+    def choose(self, engine: GameEngine, player_id: str) -> Action:
+        """Most visited root action for `player_id`."""
+        stats = self.search(engine, player_id)
+        if not stats:
+            return END
+        return max(stats.items(), key=lambda kv: (kv[1][0], kv[1][1]))[0]
+
+    def __call__(self, engine: GameEngine, player_id: str, rng: random.Random) -> None:
+        if not self._seeded:
+            self.rng.seed(rng.getrandbits(64))
+            self._seeded = True
+        while True:
+            action = self.choose(engine, player_id)
+            if action == END:
+                return
+            kind, *args = action
+            getattr(engine, ACTIONS[kind])(*args)
+
+
+def _search_worker(board_map, players, snap, player_id: str, iterations: Optional[int],
+                   params: Dict, seed: int) -> RootStats:
+    engine = GameEngine(board_map, players)
+    engine.restore(snap)
+    searcher = MCTSPlayer(iterations=iterations, seed=seed, **params)
+    return searcher._search(engine, player_id, iterations)
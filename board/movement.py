@@ -1,61 +1,57 @@
-from typing import List, Tuple
+import time
+from typing import List, Optional, Tuple
 from .map import Map
-from .entities import Truck
-from . import rules
+from .entities import Truck, Warehouse
+from .coords import coord
+from .pathfinding import FRONTLINE
+from . import instrument, rules
 
 
-def coord_to_tuple(coord: str) -> Tuple[int, int]:
-    q, r = coord.split(",")
-    return int(q), int(r)
-
-
-def path_cost(board_map: Map, path: List[Tuple[int, int]]) -> int:
+def path_cost(board_map: Map, path: List[Tuple[int, int]]) -> Optional[int]:
     """Calculate total movement cost for a path given the map.
 
     path is a list of (q, r) tuples representing successive hexes to enter.
-    The cost to enter each hex is determined by road_upgraded flag (1) or unupgraded (2),
-    or a default terrain cost of 3 for non-road terrain.
+    Each hex costs its entry in the map's compiled cost table (upgraded road,
+    unupgraded road or off-road terrain). Returns None if the path leaves the map.
     """
+    costs = board_map.cost_table()
     cost = 0
-    for q, r in path:
-        h = board_map.get_hex(q, r)
-        if h is None:
-            # treat unknown hex as high cost (impassable)
-            cost += 9999
-            continue
-        # frontline is impassable
-        if (q, r) == (0, 0):
-            cost += 9999
-            continue
-        # interpret terrain/road
-        if h.road_upgraded:
-            cost += rules.UPGRADED_ROAD_COST
-        else:
-            # assume plain/road distinction not explicitly modeled; use unupgraded cost
-            cost += rules.UNUPGRADED_ROAD_COST
+    for coord in path:
+        c = costs.get(coord)
+        if c is None:
+            return None
+        cost += c
     return cost
 
 
 def move_truck(board_map: Map, truck: Truck, path: List[Tuple[int, int]]) -> bool:
     """Attempt to move truck along path. Returns True on success, False if insufficient MP or invalid path."""
-    # initialize MP if zero
-    if truck.remaining_mp <= 0:
-        truck.remaining_mp = rules.MP_PER_TURN
-
-    total = path_cost(board_map, path)
-    if total > truck.remaining_mp:
-        return False
-
-    # perform move: set position to last hex and deduct MP
-    if path:
-        last_q, last_r = path[-1]
-        h = board_map.get_hex(last_q, last_r)
-        # disallow entering frontline
-        if (last_q, last_r) == (0, 0):
+    t0 = time.perf_counter_ns() if instrument.STATE.enabled else 0
+    try:
+        # initialize MP if zero
+        if truck.remaining_mp <= 0:
+            truck.remaining_mp = rules.MP_PER_TURN
+
+        # the frontline is impassable anywhere along the path
+        if FRONTLINE in path:
             return False
-        if h and 'warehouse' in getattr(h, 'occupants', []):
-            # trucks may not enter warehouse hexes
+        total = path_cost(board_map, path)
+        if total is None or total > truck.remaining_mp:
             return False
-        truck.position = f"{last_q},{last_r}"
-    truck.remaining_mp -= total
-    return True
+
+        # perform move: set position to last hex and deduct MP
+        if path:
+            last_q, last_r = path[-1]
+            if board_map.occupancy.entities_at((last_q, last_r), Warehouse):
+                # trucks may not enter warehouse hexes
+                return False
+            truck.position = coord(last_q, last_r)
+            board_map.occupancy.place(truck)
+        truck.remaining_mp -= total
+        if instrument.STATE.enabled:
+            instrument.count("move_truck.moved")
+            instrument.count("move_truck.steps", len(path))
+        return True
+    finally:
+        if t0:
+            instrument.record_time("movement.move_truck", time.perf_counter_ns() - t0)
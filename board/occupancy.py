@@ -0,0 +1,76 @@
+"""Spatial index of the entities standing on each hex.
+
+Entities are anything with an `id` and a `position` (trucks, warehouses,
+the frontline, engineers). The index answers "what is on this hex" and
+"what is next to this hex" with dict lookups instead of scanning every
+player's units.
+"""
+from typing import Dict, Iterator, List, Optional, Type
+
+from .coords import Coord
+from .hexgeom import neighbors
+
+
+class OccupancyIndex:
+    def __init__(self):
+        # coord -> {entity id: entity}, insertion ordered
+        self._at: Dict[Coord, Dict[str, object]] = {}
+        self._where: Dict[str, Coord] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._where
+
+    def copy(self) -> "OccupancyIndex":
+        res = OccupancyIndex()
+        res._at = {c: dict(entities) for c, entities in self._at.items()}
+        res._where = dict(self._where)
+        return res
+
+    def place(self, entity, coord: Optional[Coord] = None) -> None:
+        """Put `entity` on `coord` (default: its `position`), moving it if already indexed."""
+        if coord is None:
+            coord = entity.position
+        old = self._where.get(entity.id)
+        if old is not None:
+            if old == coord:
+                self._at[old][entity.id] = entity
+                return
+            self._discard(entity.id, old)
+        self._where[entity.id] = coord
+        self._at.setdefault(coord, {})[entity.id] = entity
+
+    def remove(self, entity_id: str) -> None:
+        coord = self._where.pop(entity_id, None)
+        if coord is not None:
+            self._discard(entity_id, coord)
+
+    def _discard(self, entity_id: str, coord: Coord) -> None:
+        here = self._at[coord]
+        del here[entity_id]
+        if not here:
+            del self._at[coord]
+
+    def position_of(self, entity_id: str) -> Optional[Coord]:
+        return self._where.get(entity_id)
+
+    def entities_at(self, coord: Coord, kind: Optional[Type] = None) -> List:
+        """Entities on `coord`, optionally only instances of `kind`."""
+        here = self._at.get(coord)
+        if not here:
+            return []
+        if kind is None:
+            return list(here.values())
+        return [e for e in here.values() if isinstance(e, kind)]
+
+    def entities_adjacent(self, coord: Coord, kind: Optional[Type] = None) -> List:
+        """Entities on the six hexes around `coord`, optionally only instances of `kind`."""
+        res = []
+        for n in neighbors(coord):
+            res.extend(self.entities_at(n, kind))
+        return res
+
+    def occupied(self) -> Iterator[Coord]:
+        return iter(self._at)
@@ -1,76 +1,445 @@
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
 import heapq
+import time
 from .map import Map
-from . import rules
+from .entities import Truck
+from .coords import Coord
+from .hexgeom import hex_distance, neighbors
+from . import instrument, rules
 
 
-Coord = Tuple[int, int]
-
 # frontline coordinate (central tile)
 FRONTLINE: Coord = (0, 0)
 
 
-def hex_distance(a: Coord, b: Coord) -> int:
-    aq, ar = a
-    bq, br = b
-    dx = aq - bq
-    dy = ar - br
-    return (abs(dx) + abs(dy) + abs(dx + dy)) // 2
+def cost_for_tile(board_map: Map, coord: Coord) -> Optional[int]:
+    """MP cost to enter `coord` from the map's cost table, None if off the map."""
+    return board_map.cost_table().get(coord)
 
 
-def neighbors(coord: Coord) -> List[Coord]:
-    q, r = coord
-    directions = [(+1, 0), (+1, -1), (0, -1), (-1, 0), (-1, +1), (0, +1)]
-    return [(q + dq, r + dr) for dq, dr in directions]
+def find_path(board_map: Map, start: Coord, goal: Coord) -> Optional[Dict]:
+    """A* search on axial hex grid. Returns dict with 'path' (list of coords from start->goal) and 'cost'.
+    Returns None if no path found."""
+    t0 = time.perf_counter_ns() if instrument.STATE.enabled else 0
+    try:
+        frontier = []
+        heapq.heappush(frontier, (0, start))
+        pushes = 1
+        expanded = 0
+        came_from: Dict[Coord, Optional[Coord]] = {start: None}
+        cost_so_far: Dict[Coord, int] = {start: 0}
+        costs = board_map.cost_table()
 
+        while frontier:
+            _, current = heapq.heappop(frontier)
+            if current == goal:
+                break
+            expanded += 1
 
-def cost_for_tile(board_map: Map, coord: Coord) -> int:
-    h = board_map.get_hex(coord[0], coord[1])
-    if h is None:
-        return 9999
-    return rules.UPGRADED_ROAD_COST if h.road_upgraded else rules.UNUPGRADED_ROAD_COST
+            for n in neighbors(current):
+                # do not allow entering the frontline tile
+                if n == FRONTLINE:
+                    continue
+                # tiles outside the defined map have no cost entry
+                c = costs.get(n)
+                if c is None:
+                    continue
+                new_cost = cost_so_far[current] + c
+                if n not in cost_so_far or new_cost < cost_so_far[n]:
+                    cost_so_far[n] = new_cost
+                    priority = new_cost + hex_distance(n, goal)
+                    heapq.heappush(frontier, (priority, n))
+                    pushes += 1
+                    came_from[n] = current
 
+        if instrument.STATE.enabled:
+            instrument.count("find_path.heap_pushes", pushes)
+            instrument.count("find_path.nodes_expanded", expanded)
+        if goal not in came_from:
+            return None
 
-def find_path(board_map: Map, start: Coord, goal: Coord) -> Optional[Dict]:
-    """A* search on axial hex grid. Returns dict with 'path' (list of coords from start->goal) and 'cost'.
-    Returns None if no path found."""
-    frontier = []
-    heapq.heappush(frontier, (0, start))
+        # reconstruct path (with cycle detection)
+        path: List[Coord] = []
+        cur = goal
+        seen = set()
+        while cur is not None:
+            if cur in seen:
+                # cycle detected - abort
+                return None
+            seen.add(cur)
+            path.append(cur)
+            cur = came_from.get(cur)
+        path.reverse()
+        return {"path": path, "cost": cost_so_far[goal]}
+    finally:
+        if t0:
+            instrument.record_time("pathfinding.find_path", time.perf_counter_ns() - t0)
+
+
+def reachable(board_map: Map, start: Coord, max_cost: int) -> Dict:
+    """Bounded Dijkstra flood fill from `start`.
+
+    Returns dict with 'cost' (coord -> cheapest cost from start) and 'came_from'
+    (coord -> predecessor, None for start) for every hex reachable within
+    `max_cost`. Uses the same frontline and out-of-map rules as `find_path`.
+    """
+    frontier = [(0, start)]
     came_from: Dict[Coord, Optional[Coord]] = {start: None}
     cost_so_far: Dict[Coord, int] = {start: 0}
+    costs = board_map.cost_table()
 
     while frontier:
-        _, current = heapq.heappop(frontier)
-        if current == goal:
-            break
-
+        cost, current = heapq.heappop(frontier)
+        if cost > cost_so_far[current]:
+            # stale heap entry
+            continue
         for n in neighbors(current):
-            # do not allow entering the frontline tile
             if n == FRONTLINE:
                 continue
-            # skip tiles outside the defined map
-            if board_map.get_hex(n[0], n[1]) is None:
+            c = costs.get(n)
+            if c is None:
+                continue
+            new_cost = cost + c
+            if new_cost > max_cost:
                 continue
-            new_cost = cost_so_far[current] + cost_for_tile(board_map, n)
             if n not in cost_so_far or new_cost < cost_so_far[n]:
                 cost_so_far[n] = new_cost
-                priority = new_cost + hex_distance(n, goal)
-                heapq.heappush(frontier, (priority, n))
                 came_from[n] = current
+                heapq.heappush(frontier, (new_cost, n))
+
+    return {"cost": cost_so_far, "came_from": came_from}
 
+
+def path_to(reach: Dict, goal: Coord) -> Optional[List[Coord]]:
+    """Extract the path start->goal from a `reachable` result, or None if goal is out of range."""
+    came_from = reach["came_from"]
     if goal not in came_from:
         return None
-
-    # reconstruct path (with cycle detection)
     path: List[Coord] = []
-    cur = goal
-    seen = set()
+    cur: Optional[Coord] = goal
     while cur is not None:
-        if cur in seen:
-            # cycle detected - abort
-            return None
-        seen.add(cur)
         path.append(cur)
-        cur = came_from.get(cur)
+        cur = came_from[cur]
     path.reverse()
-    return {"path": path, "cost": cost_so_far[goal]}
+    return path
+
+
+def truck_reach(board_map: Map, truck: Truck) -> Dict:
+    """Hexes `truck` can reach this turn with its remaining MP.
+
+    Mirrors `movement.move_truck`: a truck with no MP left starts the move
+    with a full MP_PER_TURN.
+    """
+    mp = truck.remaining_mp if truck.remaining_mp > 0 else rules.MP_PER_TURN
+    return reachable(board_map, truck.position, mp)
+
+
+class PathCache:
+    """Memoizing front end for `find_path`, keyed by (start, goal).
+
+    Entries stay valid until the map's cost landscape changes (see
+    `Map.version`). On a change only entries that could be affected are
+    dropped: routes through the changed hex, and routes whose cost could be
+    undercut by a detour through it (checked with a hex-distance lower
+    bound). Unreachable results are dropped when a hex is added.
+    Least recently used entries are evicted beyond `maxsize`.
+
+    Returned dicts are shared with the cache and must be treated as read-only.
+    """
+
+    def __init__(self, board_map: Map, maxsize: int = 4096):
+        self.map = board_map
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[Coord, Coord], Optional[Dict]]" = OrderedDict()
+        self._version = board_map.version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def find_path(self, start: Coord, goal: Coord) -> Optional[Dict]:
+        self._sync()
+        key = (start, goal)
+        entries = self._entries
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+        self.misses += 1
+        res = find_path(self.map, start, goal)
+        entries[key] = res
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return res
+
+    def _sync(self) -> None:
+        version = self.map.version
+        if version == self._version:
+            return
+        changes = self.map.changes_since(self._version)
+        if changes is None:
+            self._entries.clear()
+        else:
+            for coord, added in changes:
+                self._invalidate(coord, added)
+        self._version = version
+
+    def _invalidate(self, coord: Coord, added: bool) -> None:
+        if coord == FRONTLINE:
+            # never entered by any route
+            return
+        tile_cost = self.map.cost_table().get(coord)
+        if tile_cost is None:
+            return
+        min_cost = rules.UPGRADED_ROAD_COST
+        stale = []
+        for key, res in self._entries.items():
+            if res is None:
+                if added:
+                    stale.append(key)
+                continue
+            if coord in res["path"]:
+                stale.append(key)
+                continue
+            start, goal = key
+            # cheapest conceivable route start -> coord -> goal
+            bound = (max(hex_distance(start, coord) - 1, 0) * min_cost + tile_cost
+                     + hex_distance(coord, goal) * min_cost)
+            if bound < res["cost"]:
+                stale.append(key)
+        for key in stale:
+            del self._entries[key]
+
+
+class DistanceField:
+    """Cost-to-target field built by one reverse Dijkstra pass.
+
+    `cost_from(x)` is the cheapest cost for a truck at x to reach any of
+    `targets` (the start hex is free, each entered hex costs its tile cost;
+    the frontline is never entered). The field follows map changes
+    incrementally: when a hex gets cheaper (a road upgrade completes) or a
+    new hex appears, only the region whose cost drops is re-relaxed. A cost
+    increase falls back to a full recomputation.
+    """
+
+    def __init__(self, board_map: Map, targets: List[Coord]):
+        self.map = board_map
+        # targets outside the map are kept so they count once their hex is added
+        self._requested = set(targets)
+        costs = board_map.cost_table()
+        self.targets = [t for t in targets if t in costs]
+        self.dist: Dict[Coord, int] = {}
+        # tile costs the current field was built with, to tell drops from rises
+        self._cost: Dict[Coord, int] = {}
+        self._version = board_map.version
+        self._compute()
+
+    @classmethod
+    def to_frontline(cls, board_map: Map) -> "DistanceField":
+        """Field of costs to reach a hex adjacent to the frontline."""
+        return cls(board_map, neighbors(FRONTLINE))
+
+    @classmethod
+    def to_hex(cls, board_map: Map, coord: Coord) -> "DistanceField":
+        """Field of costs to reach a hex adjacent to `coord` (e.g. a warehouse)."""
+        return cls(board_map, neighbors(coord))
+
+    def _tile_cost(self, coord: Coord) -> int:
+        c = self._cost.get(coord)
+        if c is None:
+            c = self._cost[coord] = self.map.cost_table()[coord]
+        return c
+
+    def _compute(self) -> None:
+        self.dist = {}
+        self._cost = {}
+        frontier = []
+        for t in self.targets:
+            self.dist[t] = 0
+            frontier.append((0, t))
+        heapq.heapify(frontier)
+        self._propagate(frontier)
+
+    def _propagate(self, frontier: List[Tuple[int, Coord]]) -> None:
+        dist = self.dist
+        costs = self.map.cost_table()
+        while frontier:
+            d, u = heapq.heappop(frontier)
+            if d > dist[u]:
+                continue
+            if u == FRONTLINE:
+                # trucks cannot enter the frontline, so no route continues through it
+                continue
+            cand = d + self._tile_cost(u)
+            for v in neighbors(u):
+                if v in dist and dist[v] <= cand:
+                    continue
+                if v not in costs:
+                    continue
+                dist[v] = cand
+                heapq.heappush(frontier, (cand, v))
+
+    def _sync(self) -> None:
+        version = self.map.version
+        if version == self._version:
+            return
+        changes = self.map.changes_since(self._version)
+        self._version = version
+        if changes is None:
+            self._compute()
+            return
+        frontier: List[Tuple[int, Coord]] = []
+        costs = self.map.cost_table()
+        for coord, added in changes:
+            old = self._cost.pop(coord, None)
+            if coord not in costs:
+                continue
+            new = self._tile_cost(coord)
+            if old is not None and new > old:
+                self._compute()
+                return
+            if added and coord not in self.dist:
+                if coord in self._requested:
+                    self.targets.append(coord)
+                    self.dist[coord] = 0
+                else:
+                    # best way out of the new hex through already settled neighbors
+                    best = None
+                    for u in neighbors(coord):
+                        if u in self.dist and u != FRONTLINE:
+                            c = self.dist[u] + self._tile_cost(u)
+                            if best is None or c < best:
+                                best = c
+                    if best is None:
+                        continue
+                    self.dist[coord] = best
+            if coord in self.dist:
+                frontier.append((self.dist[coord], coord))
+        heapq.heapify(frontier)
+        self._propagate(frontier)
+
+    def cost_from(self, coord: Coord) -> Optional[int]:
+        """Cheapest cost from `coord` to the nearest target, or None if unreachable."""
+        self._sync()
+        return self.dist.get(coord)
+
+    def path_from(self, coord: Coord) -> Optional[Dict]:
+        """Route from `coord` to the nearest target by descending the field.
+
+        Returns a dict with 'path' and 'cost' like `find_path`, or None.
+        """
+        self._sync()
+        dist = self.dist
+        if coord not in dist:
+            return None
+        path = [coord]
+        cur = coord
+        while dist[cur] > 0:
+            for n in neighbors(cur):
+                if n == FRONTLINE or n not in dist:
+                    continue
+                if dist[n] + self._tile_cost(n) == dist[cur]:
+                    cur = n
+                    break
+            else:
+                # field is inconsistent with the map; should not happen
+                return None
+            path.append(cur)
+        return {"path": path, "cost": dist[coord]}
+
+
+def _paths_to_goal(board_map: Map, goal: Coord, starts: Sequence[Coord]) -> Dict[Coord, Optional[Dict]]:
+    """One reverse Dijkstra from `goal`, stopped once every start is settled."""
+    results: Dict[Coord, Optional[Dict]] = {}
+    pending = set()
+    costs = board_map.cost_table()
+    for s in starts:
+        if s == goal:
+            results[s] = {"path": [s], "cost": 0}
+        elif s not in costs:
+            # off-map starts still expand into the map; leave them to A*
+            results[s] = find_path(board_map, s, goal)
+        else:
+            pending.add(s)
+    if not pending or goal == FRONTLINE or goal not in costs:
+        for s in pending:
+            results[s] = None
+        return results
+
+    dist = {goal: 0}
+    frontier = [(0, goal)]
+    left = set(pending)
+    while frontier and left:
+        d, u = heapq.heappop(frontier)
+        if d > dist[u]:
+            continue
+        left.discard(u)
+        if u == FRONTLINE:
+            continue
+        cand = d + costs[u]
+        for v in neighbors(u):
+            if v in dist and dist[v] <= cand:
+                continue
+            if v not in costs:
+                continue
+            dist[v] = cand
+            heapq.heappush(frontier, (cand, v))
+
+    for s in pending:
+        if s in left:
+            results[s] = None
+            continue
+        # walk down the (exact along optimal routes) reverse distances
+        path = [s]
+        cur = s
+        while cur != goal:
+            for n in neighbors(cur):
+                if n != FRONTLINE and n in dist and dist[n] + costs[n] == dist[cur]:
+                    cur = n
+                    break
+            path.append(cur)
+        results[s] = {"path": path, "cost": dist[s]}
+    return results
+
+
+def _solve_goal_groups(board_map: Map, groups: List[Tuple[Coord, List[Coord]]]) -> List[Dict[Coord, Optional[Dict]]]:
+    return [_paths_to_goal(board_map, goal, starts) for goal, starts in groups]
+
+
+def find_paths(board_map: Map, requests: Sequence[Tuple[Coord, Coord]],
+               workers: Optional[int] = None) -> List[Optional[Dict]]:
+    """Plan many routes at once; returns one `find_path`-style result per (start, goal).
+
+    Costs match `find_path` (paths may differ between equally cheap routes).
+    Requests sharing a goal share one reverse search over the map's compiled
+    cost table. With `workers` > 1 the distinct goals are
+    spread over a process pool.
+    """
+    by_goal: Dict[Coord, List[Coord]] = {}
+    for start, goal in requests:
+        starts = by_goal.setdefault(goal, [])
+        if start not in starts:
+            starts.append(start)
+    groups = list(by_goal.items())
+
+    if workers and workers > 1 and len(groups) > 1:
+        chunks = [groups[i::workers] for i in range(workers)]
+        chunks = [c for c in chunks if c]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            solved = []
+            for chunk, res in zip(chunks, pool.map(_solve_goal_groups, [board_map] * len(chunks), chunks)):
+                solved.extend(zip(chunk, res))
+    else:
+        solved = list(zip(groups, _solve_goal_groups(board_map, groups)))
+
+    by_key = {}
+    for (goal, _), res in solved:
+        for start, r in res.items():
+            by_key[(start, goal)] = r
+    return [by_key[(start, goal)] for start, goal in requests]
@@ -1,6 +1,16 @@
 MP_PER_TURN = 6
 UNUPGRADED_ROAD_COST = 2
 UPGRADED_ROAD_COST = 1
+OFFROAD_COST = 3
+
+# MP cost to enter a hex by terrain when its road is not upgraded;
+# terrains not listed are treated as off-road
+TERRAIN_COSTS = {
+    "plain": UNUPGRADED_ROAD_COST,
+    "road": UNUPGRADED_ROAD_COST,
+    "offroad": OFFROAD_COST,
+    "grass": OFFROAD_COST,
+}
 
 INITIAL_SOLDIERS = 20
 INITIAL_AMMO = 20
@@ -8,3 +18,5 @@ INITIAL_FOOD = 20
 INITIAL_ENGINEERS = 2
 TRUCK_COUNT = 5
 TRUCK_CAPACITY = 10
+# max trucks that may stop on one hex at the same time (spec: tunable, e.g. 3)
+TRUCK_STACK_LIMIT = 3
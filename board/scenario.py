@@ -0,0 +1,59 @@
+"""Standard two-player setup, shared by the headless runners.
+
+Same layout as the pygame demo: a 13 x 15 hex rectangle centred on the
+frontline at (0, 0), one warehouse per player centred on the top and
+bottom rows, and each player's trucks on the row just inside their
+warehouse.
+"""
+from typing import Dict, Tuple
+
+from .coords import coord
+from .entities import Frontline, PlayerState, Truck, Warehouse
+from .map import Map
+from . import rules
+
+
+COLS = 13
+ROWS = 15
+
+
+def standard_map(cols: int = COLS, rows: int = ROWS) -> Map:
+    m = Map()
+    for row in range(rows):
+        for col in range(cols):
+            q = col - cols // 2 - ((row - rows // 2) // 2)
+            r = row - rows // 2
+            m.add_hex(q, r)
+    return m
+
+
+def _row_center(m: Map, r: int, count: int):
+    qs = sorted(h.q for h in m.hexes() if h.r == r)
+    start = max(0, len(qs) // 2 - count // 2)
+    return [coord(q, r) for q in qs[start:start + count]]
+
+
+def standard_game(cols: int = COLS, rows: int = ROWS) -> Tuple[Map, Dict[str, PlayerState]]:
+    """Map and players for a fresh standard game, with all units indexed on the map."""
+    m = standard_map(cols, rows)
+    top = -(rows // 2)
+    bottom = rows - 1 + top
+    players = {}
+    for pid, wh_row, truck_row in (("p1", top, top + 1), ("p2", bottom, bottom - 1)):
+        p = PlayerState(id=pid, soldiers=rules.INITIAL_SOLDIERS, ammo=rules.INITIAL_AMMO,
+                        food=rules.INITIAL_FOOD, engineers=rules.INITIAL_ENGINEERS)
+        wh = Warehouse(id=f"{pid}_wh", owner_id=pid, position=_row_center(m, wh_row, 1)[0],
+                       stock={"soldiers": rules.INITIAL_SOLDIERS, "ammo": rules.INITIAL_AMMO,
+                              "food": rules.INITIAL_FOOD})
+        p.warehouses[wh.id] = wh
+        m.occupancy.place(wh)
+        for i, pos in enumerate(_row_center(m, truck_row, rules.TRUCK_COUNT)):
+            t = Truck(id=f"{pid}_t{i}", owner_id=pid, position=pos, capacity=rules.TRUCK_CAPACITY,
+                      remaining_mp=rules.MP_PER_TURN)
+            p.trucks[t.id] = t
+            m.occupancy.place(t)
+        players[pid] = p
+    fl = Frontline(id="frontline", owner_id="neutral", position=coord(0, 0))
+    m.occupancy.place(fl)
+    m.frontline = fl
+    return m, players
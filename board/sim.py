@@ -0,0 +1,337 @@
+"""Headless batch simulation of complete games.
+
+Plays N standard games to victory (or a round limit) with scripted
+policies, spread over a process pool, and streams one `GameResult` per
+game as worker chunks finish:
+
+    python -m board.sim --games 100000 --workers 16 --p1 supply --p2 aggressive
+
+A policy is called once per player per round as `policy(engine, player_id,
+rng)` and acts through the engine API (queue_move, load_truck,
+unload_truck, queue_attack). Policies are named in `POLICIES` or given as a
+picklable zero-argument factory; each game gets fresh policy instances.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .coords import Coord
+from .entities import Truck, Warehouse
+from .export import RoundExporter, round_rows
+from .game_engine import GameEngine
+from .pathfinding import DistanceField, FRONTLINE
+from .rng import RngService
+from . import instrument, rules, scenario
+
+
+Policy = Callable[[GameEngine, str, random.Random], None]
+PolicySpec = Union[str, Callable[[], Policy]]
+
+MAX_ROUNDS = 200
+# a game ends as a stalemate once the same end-of-round state occurs this often
+REPEAT_LIMIT = 3
+
+
+@dataclass
+class GameResult:
+    game: int
+    seed: int
+    rounds: int
+    winner: Optional[str]
+    # player id -> {"soldiers", "ammo", "food"} at the end of the game
+    final: Dict[str, Dict[str, int]]
+    stalemate: bool = False
+
+
+# ----- policies -----
+def _opponent(engine: GameEngine, player_id: str) -> str:
+    return next(pid for pid in engine.players if pid != player_id)
+
+
+def passive(engine: GameEngine, player_id: str, rng: random.Random) -> None:
+    """Never acts."""
+
+
+def aggressive(engine: GameEngine, player_id: str, rng: random.Random) -> None:
+    """Attacks with every soldier that has ammo, every round."""
+    p = engine.players[player_id]
+    n = min(p.soldiers, p.ammo)
+    if n > 0:
+        engine.queue_attack(player_id, _opponent(engine, player_id), n)
+
+
+class SupplyPolicy:
+    """Attacks like `aggressive` and shuttles food and ammo from the warehouse to the front."""
+
+    def __init__(self):
+        self._fields: Dict[Coord, DistanceField] = {}
+
+    def _field(self, engine: GameEngine, target: Coord) -> DistanceField:
+        f = self._fields.get(target)
+        if f is None:
+            f = self._fields[target] = DistanceField.to_hex(engine.map, target)
+        return f
+
+    def _load(self, engine: GameEngine, player_id: str, truck: Truck) -> None:
+        stock = {res: sum(w.stock.get(res, 0) for w in engine.players[player_id].warehouses.values())
+                 for res in ("food", "ammo")}
+        for i, res in enumerate(("food", "ammo")):
+            free = truck.capacity - sum(truck.cargo.values())
+            # split the first load so both resources travel together
+            amount = min(free // 2 if i == 0 else free, stock[res])
+            if amount > 0:
+                engine.load_truck(player_id, truck.id, res, amount)
+
+    def _unload(self, engine: GameEngine, player_id: str, truck: Truck) -> None:
+        for res in ("food", "ammo", "soldiers"):
+            if truck.cargo.get(res, 0) > 0:
+                engine.unload_truck(player_id, truck.id, res, truck.cargo[res])
+
+    def step_toward(self, engine: GameEngine, truck: Truck, target: Coord) -> List[Coord]:
+        """Longest prefix of the cheapest route next to `target` that fits in the truck's MP."""
+        res = self._field(engine, target).path_from(truck.position)
+        if res is None or len(res["path"]) < 2:
+            return []
+        costs = engine.map.cost_table()
+        mp = truck.remaining_mp if truck.remaining_mp > 0 else rules.MP_PER_TURN
+        steps = []
+        spent = 0
+        for c in res["path"][1:]:
+            spent += costs[c]
+            if spent > mp:
+                break
+            steps.append(c)
+        # trucks may pass warehouses but not stop on them
+        while steps and engine.map.occupancy.entities_at(steps[-1], Warehouse):
+            steps.pop()
+        return steps
+
+    def _move(self, engine: GameEngine, player_id: str, truck: Truck, target: Coord) -> None:
+        steps = self.step_toward(engine, truck, target)
+        if steps:
+            engine.queue_move(player_id, truck.id, steps)
+
+    def __call__(self, engine: GameEngine, player_id: str, rng: random.Random) -> None:
+        player = engine.players[player_id]
+        wh = next(iter(player.warehouses.values()), None)
+        home = wh.position if wh is not None else None
+        for truck in player.trucks.values():
+            if not any(truck.cargo.values()):
+                self._load(engine, player_id, truck)
+            self._unload(engine, player_id, truck)
+            target = FRONTLINE if any(truck.cargo.values()) else home
+            # without a warehouse, empty trucks have nowhere to go
+            if target is not None:
+                self._move(engine, player_id, truck, target)
+            self._unload(engine, player_id, truck)
+            if not any(truck.cargo.values()):
+                self._load(engine, player_id, truck)
+        aggressive(engine, player_id, rng)
+
+
+def _mcts() -> Policy:
+    from .mcts import MCTSPlayer
+    return MCTSPlayer()
+
+
+POLICIES: Dict[str, Callable[[], Policy]] = {
+    "passive": lambda: passive,
+    "aggressive": lambda: aggressive,
+    "supply": SupplyPolicy,
+    # tree search, see board.mcts; slow, meant for small batches
+    "mcts": _mcts,
+}
+
+
+def _make_policy(spec: PolicySpec) -> Policy:
+    if isinstance(spec, str):
+        try:
+            return POLICIES[spec]()
+        except KeyError:
+            raise ValueError(f"unknown policy: {spec}") from None
+    return spec()
+
+
+# ----- running games -----
+def game_seed(seed: int, game: int) -> int:
+    """Independent per-game seed derived from the batch seed and game index."""
+    return int(np.random.SeedSequence([seed, game]).generate_state(1)[0])
+
+
+def play_out(engine: GameEngine, agents: Dict[str, Policy], rngs: Dict[str, random.Random],
+             max_rounds: int = MAX_ROUNDS,
+             on_round: Optional[Callable[[GameEngine, int, Dict], None]] = None) -> Tuple[Optional[str], int, bool]:
+    """Play rounds from the engine's current state until the game ends.
+
+    Each agent is called with its own entry of `rngs`; `on_round(engine,
+    round, result)` sees every `run_round` result. Returns (winner, rounds
+    played, stalemate) under the stopping rules of `play_game`.
+    """
+    winner = None
+    rounds = 0
+    seen: Dict[int, int] = {}
+    while rounds < max_rounds:
+        for pid, agent in agents.items():
+            agent(engine, pid, rngs[pid])
+        result = engine.run_round()
+        rounds += 1
+        if on_round is not None:
+            on_round(engine, rounds, result)
+        winner = result["victor"]
+        if winner is not None or not any(p.soldiers for p in engine.players.values()):
+            break
+        seen[engine.hash] = seen.get(engine.hash, 0) + 1
+        if seen[engine.hash] >= REPEAT_LIMIT:
+            return None, rounds, True
+    return winner, rounds, False
+
+
+def play_game(game: int, seed: int, policies: Sequence[PolicySpec] = ("supply", "supply"),
+              max_rounds: int = MAX_ROUNDS, rows: Optional[List[np.ndarray]] = None) -> GameResult:
+    """Play one standard game; `seed` fully determines the outcome.
+
+    With a `rows` list, each round's `board.export` rows are appended to it.
+    The game stops at a victory, when both sides are wiped out, after
+    `max_rounds`, or as a stalemate when the state hash repeats
+    REPEAT_LIMIT times.
+    """
+    service = RngService(seed)
+    board_map, players = scenario.standard_game()
+    engine = GameEngine(board_map, players, rng=service)
+    agents = {pid: _make_policy(spec) for pid, spec in zip(players, policies)}
+    rngs = {pid: service.random("policy", pid) for pid in players}
+
+    def collect(e: GameEngine, rnd: int, result: Dict) -> None:
+        rows.append(round_rows(e, game, rnd, result))
+
+    winner, rounds, stalemate = play_out(engine, agents, rngs, max_rounds,
+                                         collect if rows is not None else None)
+    final = {pid: {"soldiers": p.soldiers, "ammo": p.ammo, "food": p.food} for pid, p in players.items()}
+    return GameResult(game=game, seed=seed, rounds=rounds, winner=winner, final=final, stalemate=stalemate)
+
+
+def _play_chunk(first: int, last: int, seed: int, policies: Sequence[PolicySpec], max_rounds: int,
+                export: bool = False, profile: bool = False
+                ) -> Tuple[List[GameResult], Optional[np.ndarray], Optional[Dict]]:
+    if profile:
+        # in a worker process: profile this chunk alone and send the numbers back
+        with instrument.profiling():
+            results, rows, _ = _play_chunk(first, last, seed, policies, max_rounds, export)
+            return results, rows, instrument.stats()
+    rows: Optional[List[np.ndarray]] = [] if export else None
+    results = [play_game(g, game_seed(seed, g), policies, max_rounds, rows) for g in range(first, last)]
+    return results, (np.concatenate(rows) if rows else None), None
+
+
+def run_games(games: int, policies: Sequence[PolicySpec] = ("supply", "supply"), seed: int = 0,
+              workers: Optional[int] = None, max_rounds: int = MAX_ROUNDS,
+              chunk_size: Optional[int] = None,
+              exporter: Optional[RoundExporter] = None) -> Iterator[GameResult]:
+    """Yield a GameResult for each of `games` games, in completion order.
+
+    Games are dealt to `workers` processes (default: one per CPU) in chunks
+    of `chunk_size`, with at most two chunks queued per worker so memory
+    stays flat for any number of games. Results depend only on `seed` and
+    the game index, not on the worker count. Per-round rows go to
+    `exporter`, if given, as each chunk completes. While `board.instrument`
+    is enabled, workers profile their chunks and the numbers are merged
+    into this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    export = exporter is not None
+    profile = instrument.STATE.enabled
+    if workers <= 1:
+        for g in range(games):
+            results, rows, _ = _play_chunk(g, g + 1, seed, policies, max_rounds, export)
+            if rows is not None:
+                exporter.write(rows)
+            yield from results
+        return
+    chunk = chunk_size or max(1, min(64, games // (workers * 4)))
+    starts = iter(range(0, games, chunk))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+
+        def submit() -> None:
+            first = next(starts, None)
+            if first is not None:
+                pending.add(pool.submit(_play_chunk, first, min(first + chunk, games), seed,
+                                        policies, max_rounds, export, profile))
+
+        for _ in range(workers * 2):
+            submit()
+        while pending:
+            done, rest = wait(pending, return_when=FIRST_COMPLETED)
+            pending.intersection_update(rest)
+            for fut in done:
+                submit()
+                results, rows, prof = fut.result()
+                if rows is not None:
+                    exporter.write(rows)
+                if prof is not None:
+                    instrument.merge(prof)
+                yield from results
+
+
+# ----- CLI -----
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run headless batches of standard games.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--p1", default="supply", choices=sorted(POLICIES))
+    parser.add_argument("--p2", default="supply", choices=sorted(POLICIES))
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--jsonl", help="write one JSON line per game to this file")
+    parser.add_argument("--export", help="write per-round, per-player rows to this .npy or .csv file")
+    parser.add_argument("--profile", action="store_true", help="print per-phase timings and counters")
+    args = parser.parse_args(argv)
+
+    out = open(args.jsonl, "w") if args.jsonl else None
+    exporter = RoundExporter(args.export) if args.export else None
+    wins: Dict[Optional[str], int] = {}
+    stalemates = 0
+    total_rounds = 0
+    n = 0
+    t0 = time.perf_counter()
+    if args.profile:
+        instrument.reset()
+        instrument.enable()
+    try:
+        for res in run_games(args.games, (args.p1, args.p2), args.seed, args.workers, args.max_rounds,
+                             exporter=exporter):
+            n += 1
+            total_rounds += res.rounds
+            wins[res.winner] = wins.get(res.winner, 0) + 1
+            stalemates += res.stalemate
+            if out:
+                out.write(json.dumps(asdict(res)) + "\n")
+            if n % 1000 == 0:
+                print(f"{n}/{args.games} games", file=sys.stderr)
+    finally:
+        if out:
+            out.close()
+        if exporter:
+            exporter.close()
+        instrument.disable()
+    elapsed = time.perf_counter() - t0
+    print(f"games: {n}  ({elapsed:.1f}s, {n / elapsed if elapsed else 0:.0f} games/s)")
+    for pid in ("p1", "p2"):
+        print(f"{pid} wins: {wins.get(pid, 0)}")
+    print(f"draws: {wins.get(None, 0)} ({stalemates} stalemates)")
+    print(f"mean rounds: {total_rounds / n if n else 0:.1f}")
+    if args.profile:
+        print()
+        print(instrument.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compact immutable snapshots of a running game.
+
+A `GameSnapshot` holds everything that changes during play as nested
+tuples: player pools, truck positions/MP/cargo, warehouse and frontline
+stock, hex upgrade progress and the engine's queues. The map's tiles and
+terrain are not copied; snapshots refer to the engine's map and only
+record upgrade state, which `Map.upgrade_state` caches so consecutive
+snapshots of an unchanged map share one tuple.
+
+Restoring writes the recorded values back into the existing entity
+objects, so references held elsewhere (the occupancy index, the GUI)
+stay valid. A snapshot may only be restored into the engine it was taken
+from, or one with the same players, trucks and warehouses.
+"""
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+
+from .coords import Coord
+
+
+Items = Tuple[Tuple[str, int], ...]
+
+
+@dataclass(frozen=True)
+class GameSnapshot:
+    # (player id, soldiers, ammo, food, engineers)
+    players: Tuple[Tuple[str, int, int, int, int], ...]
+    # (owner id, truck id, position, remaining_mp, cargo items)
+    trucks: Tuple[Tuple[str, str, Coord, int, Items], ...]
+    # (owner id, warehouse id, stock items)
+    warehouses: Tuple[Tuple[str, str, Items], ...]
+    frontline: Optional[Items]
+    upgrades: tuple
+    movement_queue: tuple
+    attack_queue: tuple
+    moved: FrozenSet[str]
+    upgrades_started: Items
+    # engine.hash of this state, see board.zobrist
+    hash: int
+
+
+def take_snapshot(engine) -> GameSnapshot:
+    players = []
+    trucks = []
+    warehouses = []
+    for pid, p in engine.players.items():
+        players.append((pid, p.soldiers, p.ammo, p.food, p.engineers))
+        for tid, t in p.trucks.items():
+            trucks.append((pid, tid, t.position, t.remaining_mp, tuple(t.cargo.items())))
+        for wid, w in p.warehouses.items():
+            warehouses.append((pid, wid, tuple(w.stock.items())))
+    fl = engine.frontline
+    return GameSnapshot(
+        players=tuple(players),
+        trucks=tuple(trucks),
+        warehouses=tuple(warehouses),
+        frontline=tuple(fl.stock.items()) if fl is not None else None,
+        upgrades=engine.map.upgrade_state(),
+        movement_queue=tuple((pid, tid, tuple(path)) for pid, tid, path in engine.movement_queue),
+        attack_queue=tuple(tuple(a.items()) for a in engine.attack_queue),
+        moved=frozenset(engine.moved_this_round),
+        upgrades_started=tuple(engine.upgrades_this_round.items()),
+        hash=engine.hash,
+    )
+
+
+def restore_snapshot(engine, snap: GameSnapshot) -> None:
+    players = engine.players
+    for pid, soldiers, ammo, food, engineers in snap.players:
+        p = players[pid]
+        p.soldiers = soldiers
+        p.ammo = ammo
+        p.food = food
+        p.engineers = engineers
+    occupancy = engine.map.occupancy
+    for pid, tid, position, mp, cargo in snap.trucks:
+        t = players[pid].trucks[tid]
+        if t.position != position:
+            t.position = position
+            occupancy.place(t)
+        t.remaining_mp = mp
+        t.cargo.clear()
+        t.cargo.update(cargo)
+    for pid, wid, stock in snap.warehouses:
+        w = players[pid].warehouses[wid]
+        w.stock.clear()
+        w.stock.update(stock)
+    if snap.frontline is not None:
+        engine.frontline.stock.clear()
+        engine.frontline.stock.update(snap.frontline)
+    engine.map.set_upgrade_state(snap.upgrades)
+    engine.movement_queue[:] = [(pid, tid, list(path)) for pid, tid, path in snap.movement_queue]
+    engine.attack_queue[:] = [dict(a) for a in snap.attack_queue]
+    engine.moved_this_round.clear()
+    engine.moved_this_round.update(snap.moved)
+    engine.upgrades_this_round.clear()
+    engine.upgrades_this_round.update(snap.upgrades_started)
+    engine.hash = snap.hash
@@ -0,0 +1,63 @@
+"""Reversible records of the fields an action changes.
+
+A `Delta` is filled *before* an action runs with the current value of
+every field the action may write: object attributes, dict entries, set
+membership, or whole small containers. `revert()` puts those values back,
+so undoing costs time proportional to what the action could touch, not
+to the size of the game.
+"""
+from typing import Any, Callable, List, Tuple
+
+
+# old value of a dict entry that was absent, see `Delta.item`
+MISSING = object()
+
+
+class Delta:
+    __slots__ = ("attrs", "items", "members", "containers", "hooks")
+
+    def __init__(self):
+        self.attrs: List[Tuple[Any, str, Any]] = []
+        self.items: List[Tuple[dict, Any, Any]] = []
+        self.members: List[Tuple[set, Any, bool]] = []
+        self.containers: List[Tuple[Any, Any]] = []
+        # called after all values are restored, e.g. to re-sync an index
+        self.hooks: List[Callable[[], None]] = []
+
+    def attr(self, obj, name: str) -> None:
+        self.attrs.append((obj, name, getattr(obj, name)))
+
+    def item(self, d: dict, key) -> None:
+        self.items.append((d, key, d.get(key, MISSING)))
+
+    def member(self, s: set, value) -> None:
+        self.members.append((s, value, value in s))
+
+    def contents(self, container) -> None:
+        """Record a whole list, set or dict; only for containers that stay small."""
+        self.containers.append((container, container.copy()))
+
+    def on_revert(self, fn: Callable[[], None]) -> None:
+        self.hooks.append(fn)
+
+    def revert(self) -> None:
+        for container, old in reversed(self.containers):
+            if isinstance(container, list):
+                container[:] = old
+            else:
+                container.clear()
+                container.update(old)
+        for s, value, present in reversed(self.members):
+            if present:
+                s.add(value)
+            else:
+                s.discard(value)
+        for d, key, old in reversed(self.items):
+            if old is MISSING:
+                d.pop(key, None)
+            else:
+                d[key] = old
+        for obj, name, old in reversed(self.attrs):
+            setattr(obj, name, old)
+        for fn in self.hooks:
+            fn()
@@ -0,0 +1,182 @@
+"""Zobrist hashing of game state.
+
+The hash of a state is the XOR of one 64-bit key per (feature, value)
+pair, where a feature is a single field such as ("truck", "p1_t0",
+"position") or ("cargo", "p1_t0", "ammo"). A key is the splitmix64 mix of
+a per-feature seed and an integer code of the value, so keys are
+identical in every process and never need to be stored. Feature seeds
+and the codes of id strings are memoized (both bounded by the fields and
+ids of a game); computed keys go through a cache of at most `KEY_CACHE`
+entries that is simply dropped when full. Tuple values such as paths
+fold one mixing step per element. Default values
+(0, False, absent) contribute no key, which lets whole-map features be
+hashed from `Map.upgrade_state` alone.
+
+`GameEngine` keeps `engine.hash` current by feeding each action's `Delta`
+(see `board.undo`) to `update`, which touches only the recorded fields.
+"""
+from hashlib import blake2b
+from typing import Dict, Optional, Tuple
+
+from .undo import Delta, MISSING
+
+
+_MASK = (1 << 64) - 1
+
+KEY_CACHE = 1 << 16
+
+# feature -> seed, id string -> code, (feature, value) -> key
+_features: Dict[Tuple, int] = {}
+_strings: Dict[str, int] = {}
+_keys: Dict[Tuple, int] = {}
+
+
+def _mix(x: int) -> int:
+    """splitmix64 output function."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+
+def _code(value) -> int:
+    if isinstance(value, str):
+        c = _strings.get(value)
+        if c is None:
+            c = _strings[value] = int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "little")
+        return c
+    if isinstance(value, (tuple, list)):
+        # Coord, paths, queue entries
+        acc = len(value)
+        for v in value:
+            acc = _mix(acc ^ _code(v))
+        return acc
+    return int(value) & _MASK
+
+
+def zobrist_key(feature: Tuple, value) -> int:
+    if value is MISSING or value is None or value == 0:
+        return 0
+    pair = (feature, value)
+    try:
+        k = _keys.get(pair)
+    except TypeError:
+        # queued paths are lists
+        return _compute_key(feature, value)
+    if k is None:
+        if len(_keys) >= KEY_CACHE:
+            _keys.clear()
+        k = _keys[pair] = _compute_key(feature, value)
+    return k
+
+
+def _compute_key(feature: Tuple, value) -> int:
+    seed = _features.get(feature)
+    if seed is None:
+        seed = _features[feature] = _mix(_code(feature))
+    return _mix(seed ^ _code(value))
+
+
+class EngineHasher:
+    """Maps an engine's objects to feature names and hashes them."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        # id(object) -> feature prefix
+        self._prefix: Dict[int, Tuple] = {}
+        for pid, p in engine.players.items():
+            self._prefix[id(p)] = ("player", pid)
+            for tid, t in p.trucks.items():
+                self._prefix[id(t)] = ("truck", tid)
+                self._prefix[id(t.cargo)] = ("cargo", tid)
+            for wid, w in p.warehouses.items():
+                self._prefix[id(w.stock)] = ("stock", wid)
+        if engine.frontline is not None:
+            self._prefix[id(engine.frontline.stock)] = ("front",)
+        self._prefix[id(engine.moved_this_round)] = ("moved",)
+        self._prefix[id(engine.upgrades_this_round)] = ("upgrades",)
+        self._prefix[id(engine.attack_queue)] = ("attack",)
+        self._prefix[id(engine.movement_queue)] = ("queued",)
+
+    def tag(self, obj) -> Optional[Tuple]:
+        """Feature prefix of an engine object, e.g. ("truck", id); None for hexes and others."""
+        return self._prefix.get(id(obj))
+
+    def _attr_feature(self, obj, name: str) -> Tuple:
+        prefix = self._prefix.get(id(obj))
+        if prefix is None:
+            # hexes: Map keeps Hex objects, ArrayMap hands out fresh views
+            prefix = ("hex", obj.q, obj.r)
+        return prefix + (name,)
+
+    @staticmethod
+    def _contents_hash(prefix: Tuple, contents) -> int:
+        h = 0
+        if isinstance(contents, set):
+            for value in contents:
+                h ^= zobrist_key(prefix + (value,), True)
+        elif isinstance(contents, dict):
+            for key, value in contents.items():
+                h ^= zobrist_key(prefix + (key,), value)
+        elif prefix == ("attack",):
+            for i, a in enumerate(contents):
+                h ^= zobrist_key(prefix + (i,), tuple(sorted(a.items())))
+        else:
+            for i, (pid, tid, path) in enumerate(contents):
+                h ^= zobrist_key(prefix + (i,), (pid, tid, path))
+        return h
+
+    def full_hash(self) -> int:
+        """Hash of the engine's current state, computed from scratch."""
+        e = self.engine
+        h = 0
+        for pid, p in e.players.items():
+            for name in ("soldiers", "ammo", "food"):
+                h ^= zobrist_key(("player", pid, name), getattr(p, name))
+            for tid, t in p.trucks.items():
+                h ^= zobrist_key(("truck", tid, "position"), t.position)
+                h ^= zobrist_key(("truck", tid, "remaining_mp"), t.remaining_mp)
+                for res, n in t.cargo.items():
+                    h ^= zobrist_key(("cargo", tid, res), n)
+            for wid, w in p.warehouses.items():
+                for res, n in w.stock.items():
+                    h ^= zobrist_key(("stock", wid, res), n)
+        if e.frontline is not None:
+            for res, n in e.frontline.stock.items():
+                h ^= zobrist_key(("front", res), n)
+        for (q, r), road, in_progress, turns in e.map.upgrade_state():
+            h ^= zobrist_key(("hex", q, r, "road_upgraded"), road)
+            h ^= zobrist_key(("hex", q, r, "upgrade_in_progress"), in_progress)
+            h ^= zobrist_key(("hex", q, r, "upgrade_turns_left"), turns)
+        for c in (e.moved_this_round, e.upgrades_this_round, e.attack_queue, e.movement_queue):
+            h ^= self._contents_hash(self._prefix[id(c)], c)
+        return h
+
+    def update(self, h: int, delta: Delta) -> int:
+        """Hash after the action recorded in `delta` ran, given the hash `h` before it."""
+        seen = set()
+        for obj, name, old in delta.attrs:
+            if (id(obj), name) in seen:
+                continue
+            seen.add((id(obj), name))
+            feature = self._attr_feature(obj, name)
+            h ^= zobrist_key(feature, old) ^ zobrist_key(feature, getattr(obj, name))
+        for d, key, old in delta.items:
+            if (id(d), key) in seen:
+                continue
+            seen.add((id(d), key))
+            feature = self._prefix[id(d)] + (key,)
+            h ^= zobrist_key(feature, old) ^ zobrist_key(feature, d.get(key, MISSING))
+        for s, value, present in delta.members:
+            if (id(s), value) in seen:
+                continue
+            seen.add((id(s), value))
+            feature = self._prefix[id(s)] + (value,)
+            h ^= zobrist_key(feature, present) ^ zobrist_key(feature, value in s)
+        for container, old in delta.containers:
+            if id(container) in seen:
+                continue
+            seen.add(id(container))
+            prefix = self._prefix[id(container)]
+            h ^= self._contents_hash(prefix, old) ^ self._contents_hash(prefix, container)
+        return h
@@ -9,8 +9,10 @@ Commands (interactive): status, move <player> <truck> q,r [q,r ...], attack <att
 import argparse
 from board.map import Map
 from board.entities import PlayerState, Truck, Warehouse, Engineer
+from board.coords import coord, format_coord, parse_coord
 from board import rules
 from board.game_engine import GameEngine
+from board.rng import RngService
 
 
 def create_demo_game() -> (Map, dict):
@@ -31,8 +33,8 @@ def create_demo_game() -> (Map, dict):
 
     # trucks: place p1 at -3, p2 at 3
     for i in range(rules.TRUCK_COUNT):
-        t1 = Truck(id=f"p1_t{i}", owner_id="p1", position=f"{-3},{0}", capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
-        t2 = Truck(id=f"p2_t{i}", owner_id="p2", position=f"3,{0}", capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
+        t1 = Truck(id=f"p1_t{i}", owner_id="p1", position=coord(-3, 0), capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
+        t2 = Truck(id=f"p2_t{i}", owner_id="p2", position=coord(3, 0), capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
         p1.trucks[t1.id] = t1
         p2.trucks[t2.id] = t2
 
@@ -43,12 +45,7 @@ def print_status(players):
     for pid, p in players.items():
         print(f"Player {pid}: soldiers={p.soldiers}, ammo={p.ammo}, food={p.food}")
         for tid, t in p.trucks.items():
-            print(f"  Truck {tid}: pos={t.position} MP={t.remaining_mp} cargo={t.cargo}")
-
-
-def parse_coord(s: str):
-    q, r = s.split(",")
-    return int(q), int(r)
+            print(f"  Truck {tid}: pos={format_coord(t.position)} MP={t.remaining_mp} cargo={t.cargo}")
 
 
 def interactive_loop(engine: GameEngine, players):
@@ -102,10 +99,11 @@ def interactive_loop(engine: GameEngine, players):
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--demo", action="store_true", help="run demo sequence")
+    ap.add_argument("--seed", type=int, default=0, help="seed for combat rolls")
     args = ap.parse_args()
 
     m, players = create_demo_game()
-    engine = GameEngine(m, players, rng=lambda: 0.1)
+    engine = GameEngine(m, players, rng=RngService(args.seed))
 
     if args.demo:
         print("Demo start")
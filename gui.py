@@ -10,7 +10,10 @@ import sys
 import pygame
 from board.map import Map
 from board.game_engine import GameEngine
+from board.rng import RngService
+from board.events import ChangeTracker
 from board.entities import PlayerState, Truck, Warehouse
+from board.coords import coord
 from board import rules
 
 
@@ -28,8 +31,8 @@ def create_demo():
     p1 = PlayerState(id="p1", soldiers=rules.INITIAL_SOLDIERS, ammo=rules.INITIAL_AMMO, food=rules.INITIAL_FOOD)
     p2 = PlayerState(id="p2", soldiers=rules.INITIAL_SOLDIERS, ammo=rules.INITIAL_AMMO, food=rules.INITIAL_FOOD)
     for i in range(rules.TRUCK_COUNT):
-        t1 = Truck(id=f"p1_t{i}", owner_id="p1", position=f"{-6},{0}", capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
-        t2 = Truck(id=f"p2_t{i}", owner_id="p2", position=f"6,{0}", capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
+        t1 = Truck(id=f"p1_t{i}", owner_id="p1", position=coord(-6, 0), capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
+        t2 = Truck(id=f"p2_t{i}", owner_id="p2", position=coord(6, 0), capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
         p1.trucks[t1.id] = t1
         p2.trucks[t2.id] = t2
 
@@ -46,7 +49,8 @@ def world_to_screen(q: int, r: int) -> (int, int):
 def draw(screen, board_map: Map, players):
     screen.fill(BG)
     # draw hex placeholders
-    for (q, r), h in board_map._hexes.items():
+    for h in board_map.hexes():
+        q, r = h.q, h.r
         x, y = world_to_screen(q, r)
         pygame.draw.circle(screen, (60, 60, 60), (x, y), 20)
         if h.road_upgraded:
@@ -55,7 +59,7 @@ def draw(screen, board_map: Map, players):
     # draw trucks
     for pid, p in players.items():
         for tid, t in p.trucks.items():
-            q, r = map(int, t.position.split(","))
+            q, r = t.position
             x, y = world_to_screen(q, r)
             pygame.draw.rect(screen, COLORS.get(pid, (200, 200, 200)), (x - 8, y - 8, 16, 16))
 
@@ -77,7 +81,10 @@ def main():
     clock = pygame.time.Clock()
 
     board_map, players = create_demo()
-    engine = GameEngine(board_map, players, rng=lambda: 0.1)
+    engine = GameEngine(board_map, players, rng=RngService(0))
+    # redraw only after the engine reports a change
+    changes = ChangeTracker(engine.events)
+    dirty = True
 
     running = True
     while running:
@@ -91,9 +98,13 @@ def main():
                     # demo: queue a simple attack and run one round
                     engine.queue_attack("p1", "p2", 3)
                     engine.run_round()
+            elif event.type == pygame.VIDEOEXPOSE:
+                dirty = True
 
-        draw(screen, board_map, players)
-        pygame.display.flip()
+        if changes.take() or dirty:
+            draw(screen, board_map, players)
+            pygame.display.flip()
+            dirty = False
         clock.tick(30)
 
     pygame.quit()
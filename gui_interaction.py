@@ -8,10 +8,13 @@ Controls:
  - Esc: quit
 """
 import pygame
-from gui_map import axial_to_pixel, hex_corners
+from gui_map import axial_to_pixel, pixel_to_axial, hex_corners
 from gui_units import create_demo, find_truck_at, OWNER_COLORS
+from board.coords import coord, format_coord
+from board.entities import Frontline, Warehouse
 from board.game_engine import GameEngine
-from board.pathfinding import find_path
+from board.rng import RngService
+from board.pathfinding import PathCache, truck_reach
 from board import rules
 
 SCREEN_W = 1200
@@ -22,13 +25,25 @@ MAP_ORIGIN = (SCREEN_W // 2 - 10, SCREEN_H // 2 - 20)
 
 
 def hex_at_pos(board_map, pos):
-    x, y = pos
-    for (q, r), h in board_map._hexes.items():
-        cx, cy = axial_to_pixel(q, r, origin=MAP_ORIGIN)
-        # use radius approx
-        if (x - cx) ** 2 + (y - cy) ** 2 <= (24) ** 2:
-            return (q, r)
-    return None
+    q, r = pixel_to_axial(pos[0], pos[1], origin=MAP_ORIGIN)
+    if board_map.get_hex(q, r) is None:
+        return None
+    return (q, r)
+
+
+def adjacent_frontline(board_map, truck):
+    """The frontline next to `truck`, or None."""
+    coord = board_map.occupancy.position_of(truck.id)
+    found = board_map.occupancy.entities_adjacent(coord, Frontline) if coord else []
+    return found[0] if found else None
+
+
+def near_own_warehouse(board_map, truck):
+    """True if one of the truck owner's warehouses is next to `truck`."""
+    coord = board_map.occupancy.position_of(truck.id)
+    if coord is None:
+        return False
+    return any(w.owner_id == truck.owner_id for w in board_map.occupancy.entities_adjacent(coord, Warehouse))
 
 
 def draw_queued_moves(surface, board_map, engine):
@@ -63,11 +78,13 @@ def animate_moves(screen, clock, board_map, players, engine):
 
         for node in path:
             # move truck visually to node
-            truck.position = f"{node[0]},{node[1]}"
+            truck.position = coord(*node)
+            board_map.occupancy.place(truck, node)
             # redraw
             screen.fill(BG)
             # draw map
-            for (q, r), h in board_map._hexes.items():
+            for h in board_map.hexes():
+                q, r = h.q, h.r
                 cx, cy = axial_to_pixel(q, r, origin=MAP_ORIGIN)
                 corners = hex_corners(cx, cy)
                 if (q, r) == (0, 0):
@@ -79,7 +96,7 @@ def animate_moves(screen, clock, board_map, players, engine):
 
             # draw trucks
             from gui_units import draw_trucks
-            draw_trucks(screen, players, selected_id=None, origin=MAP_ORIGIN)
+            draw_trucks(screen, board_map, selected_id=None, origin=MAP_ORIGIN)
 
             pygame.display.flip()
             # wait small delay
@@ -97,10 +114,16 @@ def demo():
     clock = pygame.time.Clock()
 
     board_map, players = create_demo()
-    engine = GameEngine(board_map, players, rng=lambda: 0.1)
+    engine = GameEngine(board_map, players, rng=RngService(0))
+    # hover previews repeat the same queries every frame; memoize them
+    path_cache = PathCache(board_map)
 
     selected_truck = None
     hover_hex = None
+    # move range of the selected truck, recomputed only when the truck, its
+    # position or MP, or the map's costs change
+    move_range = None
+    move_range_for = None
     # phase state: 'A_move' -> 'B_move' -> 'attack'
     phase = 'A_move'
     # map phase to player id for movement phases
@@ -146,44 +169,22 @@ def demo():
                             break
                     # only allow loading from warehouse if truck is adjacent to one of owner's warehouses
                     if owner and owner.warehouses:
-                        # find any warehouse adjacent to truck
                         t = owner.trucks[selected_truck]
-                        tq, tr = map(int, t.position.split(","))
-                        adj = False
                         # check adjacency to frontline first
-                        if hasattr(board_map, 'frontline') and board_map.frontline:
-                            # frontend position should be (0,0)
-                            fl_q, fl_r = 0, 0
-                            # check if truck is neighbor of frontline
-                            neighs = board_map.neighbors(fl_q, fl_r)
-                            for n in neighs:
-                                if (n.q, n.r) == (tq, tr):
-                                    adj = True
-                                    # perform load from frontline if available
-                                    if sum(t.cargo.values()) < t.capacity and board_map.frontline.stock.get("soldiers", 0) > 0:
-                                        board_map.frontline.stock["soldiers"] -= 1
-                                        t.cargo["soldiers"] += 1
-                                    break
+                        fl = adjacent_frontline(board_map, t)
+                        if fl:
+                            # perform load from frontline if available
+                            if sum(t.cargo.values()) < t.capacity and fl.stock.get("soldiers", 0) > 0:
+                                fl.stock["soldiers"] -= 1
+                                t.cargo["soldiers"] += 1
                         # fallback: check owner's warehouses adjacency
-                        if not adj:
+                        elif near_own_warehouse(board_map, t) and sum(t.cargo.values()) < t.capacity:
+                            # transfer 1 soldier from warehouse stock if available
                             for wid, wh in owner.warehouses.items():
-                                wq, wr = map(int, wh.position.split(","))
-                                hex_obj = board_map.get_hex(wq, wr)
-                                if hex_obj:
-                                    neighs = board_map.neighbors(wq, wr)
-                                    for n in neighs:
-                                        if (n.q, n.r) == (tq, tr):
-                                            adj = True
-                                            break
-                                if adj:
+                                if wh.stock.get("soldiers", 0) > 0:
+                                    wh.stock["soldiers"] -= 1
+                                    t.cargo["soldiers"] += 1
                                     break
-                            if adj and sum(t.cargo.values()) < t.capacity and owner.warehouses:
-                                # transfer 1 soldier from warehouse stock if available
-                                for wid, wh in owner.warehouses.items():
-                                    if wh.stock.get("soldiers", 0) > 0:
-                                        wh.stock["soldiers"] -= 1
-                                        t.cargo["soldiers"] += 1
-                                        break
                 elif ev.key == pygame.K_u and selected_truck:
                     # unload 1 soldier from truck to player pool
                     owner = None
@@ -194,18 +195,14 @@ def demo():
                     if owner:
                         t = owner.trucks[selected_truck]
                         # if adjacent to frontline, unload to frontline stock; else unload to owner pool
-                        tq, tr = map(int, t.position.split(","))
                         unloaded = False
-                        if hasattr(board_map, 'frontline') and board_map.frontline:
-                            neighs = board_map.neighbors(0, 0)
-                            for n in neighs:
-                                if (n.q, n.r) == (tq, tr):
-                                    # unload to frontline if truck has soldiers
-                                    if t.cargo.get("soldiers", 0) > 0:
-                                        t.cargo["soldiers"] -= 1
-                                        board_map.frontline.stock["soldiers"] = board_map.frontline.stock.get("soldiers", 0) + 1
-                                        unloaded = True
-                                    break
+                        fl = adjacent_frontline(board_map, t)
+                        if fl:
+                            # unload to frontline if truck has soldiers
+                            if t.cargo.get("soldiers", 0) > 0:
+                                t.cargo["soldiers"] -= 1
+                                fl.stock["soldiers"] = fl.stock.get("soldiers", 0) + 1
+                                unloaded = True
                         if not unloaded:
                             if t.cargo.get("soldiers", 0) > 0:
                                 t.cargo["soldiers"] -= 1
@@ -260,35 +257,19 @@ def demo():
                                 break
                         if owner:
                             t = owner.trucks[selected_truck]
-                            tq, tr = map(int, t.position.split(","))
                             done = False
                             # attempt frontline load first
-                            if hasattr(board_map, 'frontline') and board_map.frontline:
-                                neighs = board_map.neighbors(0, 0)
-                                for n in neighs:
-                                    if (n.q, n.r) == (tq, tr):
-                                        if sum(t.cargo.values()) < t.capacity and board_map.frontline.stock.get("soldiers", 0) > 0:
-                                            board_map.frontline.stock["soldiers"] -= 1
-                                            t.cargo["soldiers"] += 1
-                                            popup = "Loaded 1 soldier from frontline"
-                                            popup_until = pygame.time.get_ticks() + 1200
-                                            done = True
-                                        break
+                            fl = adjacent_frontline(board_map, t)
+                            if fl:
+                                if sum(t.cargo.values()) < t.capacity and fl.stock.get("soldiers", 0) > 0:
+                                    fl.stock["soldiers"] -= 1
+                                    t.cargo["soldiers"] += 1
+                                    popup = "Loaded 1 soldier from frontline"
+                                    popup_until = pygame.time.get_ticks() + 1200
+                                    done = True
                             # fallback: warehouses
                             if not done and owner.warehouses:
-                                adj = False
-                                for wid, wh in owner.warehouses.items():
-                                    wq, wr = map(int, wh.position.split(","))
-                                    hex_obj = board_map.get_hex(wq, wr)
-                                    if hex_obj:
-                                        neighs = board_map.neighbors(wq, wr)
-                                        for n in neighs:
-                                            if (n.q, n.r) == (tq, tr):
-                                                adj = True
-                                                break
-                                    if adj:
-                                        break
-                                if adj and sum(t.cargo.values()) < t.capacity:
+                                if near_own_warehouse(board_map, t) and sum(t.cargo.values()) < t.capacity:
                                     for wid, wh in owner.warehouses.items():
                                         if wh.stock.get("soldiers", 0) > 0:
                                             wh.stock["soldiers"] -= 1
@@ -306,19 +287,15 @@ def demo():
                                 break
                         if owner:
                             t = owner.trucks[selected_truck]
-                            tq, tr = map(int, t.position.split(","))
                             done = False
-                            if hasattr(board_map, 'frontline') and board_map.frontline:
-                                neighs = board_map.neighbors(0, 0)
-                                for n in neighs:
-                                    if (n.q, n.r) == (tq, tr):
-                                        if t.cargo.get("soldiers", 0) > 0:
-                                            t.cargo["soldiers"] -= 1
-                                            board_map.frontline.stock["soldiers"] = board_map.frontline.stock.get("soldiers", 0) + 1
-                                            popup = "Unloaded 1 soldier to frontline"
-                                            popup_until = pygame.time.get_ticks() + 1200
-                                            done = True
-                                        break
+                            fl = adjacent_frontline(board_map, t)
+                            if fl:
+                                if t.cargo.get("soldiers", 0) > 0:
+                                    t.cargo["soldiers"] -= 1
+                                    fl.stock["soldiers"] = fl.stock.get("soldiers", 0) + 1
+                                    popup = "Unloaded 1 soldier to frontline"
+                                    popup_until = pygame.time.get_ticks() + 1200
+                                    done = True
                             if not done:
                                 if t.cargo.get("soldiers", 0) > 0:
                                     t.cargo["soldiers"] -= 1
@@ -328,7 +305,7 @@ def demo():
                         continue
 
                     # click: first try truck
-                    tid = find_truck_at(players, ev.pos, origin=MAP_ORIGIN)
+                    tid = find_truck_at(board_map, ev.pos, origin=MAP_ORIGIN)
                     if tid:
                         # determine owner
                         owner = None
@@ -351,16 +328,14 @@ def demo():
                         if hx and selected_truck:
                             # find owner of selected truck
                             owner = None
-                            truck_pos = None
                             for pid, p in players.items():
                                 if selected_truck in p.trucks:
                                     owner = pid
-                                    truck_pos = p.trucks[selected_truck].position
                                     break
-                            if owner and truck_pos:
+                            start = board_map.occupancy.position_of(selected_truck)
+                            if owner and start:
                                 # validate path cost before queuing
-                                start = tuple(map(int, truck_pos.split(",")))
-                                res = find_path(board_map, start, hx)
+                                res = path_cache.find_path(start, hx)
                                 if res is None:
                                     popup = f"No path found from {start} to {hx}"
                                     popup_until = pygame.time.get_ticks() + 1200
@@ -382,7 +357,8 @@ def demo():
 
         screen.fill(BG)
         # draw map (highlight central hex as frontline)
-        for (q, r), h in board_map._hexes.items():
+        for h in board_map.hexes():
+            q, r = h.q, h.r
             cx, cy = axial_to_pixel(q, r, origin=MAP_ORIGIN)
             corners = hex_corners(cx, cy)
             # central frontline tile
@@ -396,10 +372,7 @@ def demo():
         # draw warehouses (marker) on top of map but below units
         for pid, p in players.items():
             for wid, wh in p.warehouses.items():
-                try:
-                    wq, wr = map(int, wh.position.split(","))
-                except Exception:
-                    continue
+                wq, wr = wh.position
                 wx, wy = axial_to_pixel(wq, wr, origin=MAP_ORIGIN)
                 col = OWNER_COLORS.get(pid, (180, 180, 180))
                 # small house marker
@@ -410,6 +383,17 @@ def demo():
                 txt = font.render("WH", True, (0, 0, 0))
                 screen.blit(txt, (wx - txt.get_width() // 2, wy - txt.get_height() // 2))
 
+        # highlight hexes the selected truck can reach this turn (one search per state)
+        truck = next((p.trucks[selected_truck] for p in players.values() if selected_truck in p.trucks), None)
+        key = None if truck is None else (truck.id, truck.position, truck.remaining_mp, board_map.version)
+        if key != move_range_for:
+            move_range_for = key
+            move_range = truck_reach(board_map, truck) if truck is not None else None
+        if move_range:
+            for (rq, rr) in move_range["cost"]:
+                rx, ry = axial_to_pixel(rq, rr, origin=MAP_ORIGIN)
+                pygame.draw.circle(screen, (90, 140, 90), (rx, ry), 4)
+
         # highlight hover hex
         if hover_hex:
             hx, hy = hover_hex
@@ -418,17 +402,9 @@ def demo():
 
             # if a truck is selected, show path preview and cost
             if selected_truck:
-                # find truck owner and position
-                owner = None
-                truck_pos = None
-                for pid, p in players.items():
-                    if selected_truck in p.trucks:
-                        owner = pid
-                        truck_pos = p.trucks[selected_truck].position
-                        break
-                if truck_pos:
-                    sq = tuple(map(int, truck_pos.split(",")))
-                    res = find_path(board_map, sq, (hx, hy))
+                sq = board_map.occupancy.position_of(selected_truck)
+                if sq:
+                    res = path_cache.find_path(sq, (hx, hy))
                     if res:
                         path = res["path"]
                         cost = res["cost"]
@@ -445,7 +421,7 @@ def demo():
 
         # draw trucks
         from gui_units import draw_trucks
-        draw_trucks(screen, players, selected_id=selected_truck, origin=MAP_ORIGIN)
+        draw_trucks(screen, board_map, selected_id=selected_truck, origin=MAP_ORIGIN)
 
         # Right-side detail panel for selected unit (G7)
         panel_x = SCREEN_W - 220
@@ -465,7 +441,7 @@ def demo():
                     truck_obj = p.trucks[selected_truck]
                     break
             if truck_obj:
-                lines = [f"Truck: {truck_obj.id}", f"Owner: {owner.id}", f"Pos: {truck_obj.position}", f"MP: {truck_obj.remaining_mp}", "cargo:"]
+                lines = [f"Truck: {truck_obj.id}", f"Owner: {owner.id}", f"Pos: {format_coord(truck_obj.position)}", f"MP: {truck_obj.remaining_mp}", "cargo:"]
                 y = panel_y + 8
                 for ln in lines:
                     surf = font.render(ln, True, (220, 220, 220))
@@ -480,7 +456,7 @@ def demo():
                 y += 6
                 ws = []
                 for wid, wh in owner.warehouses.items():
-                    ws.append(f"WH {wid} @ {wh.position}")
+                    ws.append(f"WH {wid} @ {format_coord(wh.position)}")
                     for kk, vv in wh.stock.items():
                         ws.append(f"  {kk}: {vv}")
                 for ln in ws:
@@ -11,6 +11,8 @@ except Exception:
     raise ImportError("pygame is required. Install with: pip install pygame")
 
 from board.map import Map
+from board import hexgeom
+from board.coords import format_coord
 
 
 HEX_SIZE = 30  # radius in pixels
@@ -21,11 +23,15 @@ UPGRADED_COLOR = (160, 120, 60)
 
 def axial_to_pixel(q: int, r: int, size: int = HEX_SIZE, origin=(400, 200)):
     """Convert axial coords (q,r) to pixel (x,y) for pointy-top hexes."""
-    x = size * math.sqrt(3) * (q + r / 2) + origin[0]
-    y = size * 1.5 * r + origin[1]
+    x, y = hexgeom.axial_to_pixel(q, r, size, origin)
     return int(x), int(y)
 
 
+def pixel_to_axial(x: int, y: int, size: int = HEX_SIZE, origin=(400, 200)):
+    """Convert pixel (x,y) to the axial coords (q,r) of the hex under it."""
+    return hexgeom.pixel_to_axial(x, y, size, origin)
+
+
 def hex_corners(center_x: int, center_y: int, size: int = HEX_SIZE):
     corners = []
     for i in range(6):
@@ -38,7 +44,8 @@ def hex_corners(center_x: int, center_y: int, size: int = HEX_SIZE):
 
 def draw_map(surface: 'pygame.Surface', board_map: Map):
     # iterate hexes and draw
-    for (q, r), h in board_map._hexes.items():
+    for h in board_map.hexes():
+        q, r = h.q, h.r
         cx, cy = axial_to_pixel(q, r)
         corners = hex_corners(cx, cy)
         # fill based on upgraded
@@ -47,7 +54,7 @@ def draw_map(surface: 'pygame.Surface', board_map: Map):
         pygame.draw.polygon(surface, HEX_BORDER, corners, 2)
         # draw id
         font = pygame.font.SysFont(None, 16)
-        txt = font.render(h.id, True, (220, 220, 220))
+        txt = font.render(format_coord(h.id), True, (220, 220, 220))
         surface.blit(txt, (cx - txt.get_width() // 2, cy - txt.get_height() // 2))
 
 
@@ -67,9 +74,11 @@ def demo():
     h = m.get_hex(0, 0)
     if h:
         h.road_upgraded = True
+        m.mark_changed(0, 0)
     h2 = m.get_hex(2, 0)
     if h2:
         h2.road_upgraded = True
+        m.mark_changed(2, 0)
 
     running = True
     while running:
@@ -8,9 +8,10 @@ try:
 except Exception:
     raise ImportError("pygame is required. Install with: pip install pygame")
 
-from gui_map import axial_to_pixel, hex_corners
+from gui_map import axial_to_pixel, pixel_to_axial, hex_corners
 from board.map import Map
 from board.entities import PlayerState, Truck, Warehouse, Frontline
+from board.coords import coord
 from board import rules
 
 
@@ -39,8 +40,8 @@ def create_demo():
     p2 = PlayerState(id="p2", soldiers=rules.INITIAL_SOLDIERS, ammo=rules.INITIAL_AMMO, food=rules.INITIAL_FOOD)
 
     # --- warehouse placement: top/bottom rows, one tile inward, centered horizontally ---
-    qs = [q for (q, r) in m._hexes.keys()]
-    rs = [r for (q, r) in m._hexes.keys()]
+    qs = [h.q for h in m.hexes()]
+    rs = [h.r for h in m.hexes()]
     min_r = min(rs)
     max_r = max(rs)
 
@@ -48,7 +49,7 @@ def create_demo():
     bot_r = max_r
 
     def pick_center_q(row):
-        vals = sorted([q for (q, r) in m._hexes.keys() if r == row])
+        vals = sorted([h.q for h in m.hexes() if h.r == row])
         if not vals:
             return 0
         return vals[len(vals) // 2]
@@ -58,25 +59,20 @@ def create_demo():
     w2_q = pick_center_q(bot_r)
     w2_r = bot_r
 
-    w1 = Warehouse(id="p1_wh", owner_id="p1", position=f"{w1_q},{w1_r}", stock={"soldiers": rules.INITIAL_SOLDIERS, "ammo": rules.INITIAL_AMMO, "food": rules.INITIAL_FOOD})
-    w2 = Warehouse(id="p2_wh", owner_id="p2", position=f"{w2_q},{w2_r}", stock={"soldiers": rules.INITIAL_SOLDIERS, "ammo": rules.INITIAL_AMMO, "food": rules.INITIAL_FOOD})
+    w1 = Warehouse(id="p1_wh", owner_id="p1", position=coord(w1_q, w1_r), stock={"soldiers": rules.INITIAL_SOLDIERS, "ammo": rules.INITIAL_AMMO, "food": rules.INITIAL_FOOD})
+    w2 = Warehouse(id="p2_wh", owner_id="p2", position=coord(w2_q, w2_r), stock={"soldiers": rules.INITIAL_SOLDIERS, "ammo": rules.INITIAL_AMMO, "food": rules.INITIAL_FOOD})
     p1.warehouses[w1.id] = w1
     p2.warehouses[w2.id] = w2
 
-    # mark warehouse tiles
-    h1 = m.get_hex(w1_q, w1_r)
-    if h1:
-        h1.occupants.append('warehouse')
-    h2 = m.get_hex(w2_q, w2_r)
-    if h2:
-        h2.occupants.append('warehouse')
+    # index warehouse tiles
+    m.occupancy.place(w1)
+    m.occupancy.place(w2)
 
     # create a Frontline object at central tile (0,0) and attach to map for easy access
-    fl = Frontline(id="frontline", owner_id="neutral", position="0,0", stock={"soldiers": 5, "ammo": 5, "food": 5})
-    # mark frontline tile occupant if present
-    center_hex = m.get_hex(0, 0)
-    if center_hex:
-        center_hex.occupants.append('frontline')
+    fl = Frontline(id="frontline", owner_id="neutral", position=coord(0, 0), stock={"soldiers": 5, "ammo": 5, "food": 5})
+    # index the frontline tile if present
+    if m.get_hex(0, 0):
+        m.occupancy.place(fl)
     # attach to map so GUI and logic can find it
     m.frontline = fl
 
@@ -85,7 +81,7 @@ def create_demo():
     center_r = sum(rs) / len(rs) if rs else 0
 
     def choose_positions_on_row(target_r, count):
-        q_on_row = sorted([q for (q, r) in m._hexes.keys() if r == target_r])
+        q_on_row = sorted([h.q for h in m.hexes() if h.r == target_r])
         if len(q_on_row) >= count:
             mid = len(q_on_row) // 2
             start = max(0, mid - (count // 2))
@@ -117,46 +113,47 @@ def create_demo():
             p2_positions = [(w2_q + i, w2_r) for i in range(rules.TRUCK_COUNT)]
 
     for i, (pos_q, pos_r) in enumerate(p1_positions):
-        t = Truck(id=f"p1_t{i}", owner_id="p1", position=f"{pos_q},{pos_r}", capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
+        t = Truck(id=f"p1_t{i}", owner_id="p1", position=coord(pos_q, pos_r), capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
         t.cargo["soldiers"] = 2 + i
         t.cargo["ammo"] = 3
         p1.trucks[t.id] = t
+        m.occupancy.place(t)
 
     for i, (pos_q, pos_r) in enumerate(p2_positions):
-        t = Truck(id=f"p2_t{i}", owner_id="p2", position=f"{pos_q},{pos_r}", capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
+        t = Truck(id=f"p2_t{i}", owner_id="p2", position=coord(pos_q, pos_r), capacity=rules.TRUCK_CAPACITY, remaining_mp=rules.MP_PER_TURN)
         t.cargo["soldiers"] = 1 + i
         t.cargo["ammo"] = 2
         p2.trucks[t.id] = t
+        m.occupancy.place(t)
 
     return m, {"p1": p1, "p2": p2}
 
 
-def draw_trucks(surface, players, selected_id=None, origin=(400, 200)):
+def draw_trucks(surface, board_map, selected_id=None, origin=(400, 200)):
     font = pygame.font.SysFont(None, 16)
-    for pid, p in players.items():
-        color = OWNER_COLORS.get(pid, (190, 190, 190))
-        for tid, t in p.trucks.items():
-            q, r = map(int, t.position.split(","))
+    occupancy = board_map.occupancy
+    for q, r in occupancy.occupied():
+        for t in occupancy.entities_at((q, r), Truck):
+            color = OWNER_COLORS.get(t.owner_id, (190, 190, 190))
             x, y = axial_to_pixel(q, r, origin=origin)
             # draw truck body
             rect = pygame.Rect(x - 10, y - 10, 20, 20)
             pygame.draw.rect(surface, color, rect)
             # highlight selection
-            if tid == selected_id:
+            if t.id == selected_id:
                 pygame.draw.rect(surface, (255, 255, 0), rect, 3)
             # draw cargo soldiers count
             txt = font.render(str(t.cargo.get("soldiers", 0)), True, (0, 0, 0))
             surface.blit(txt, (x - txt.get_width() // 2, y - txt.get_height() // 2))
 
 
-def find_truck_at(players, pos, origin=(400, 200)):
+def find_truck_at(board_map, pos, origin=(400, 200)):
     x, y = pos
-    for pid, p in players.items():
-        for tid, t in p.trucks.items():
-            tq, tr = map(int, t.position.split(","))
-            tx, ty = axial_to_pixel(tq, tr, origin=origin)
-            if (x - tx) ** 2 + (y - ty) ** 2 <= 16 ** 2:
-                return tid
+    coord = pixel_to_axial(x, y, origin=origin)
+    for t in board_map.occupancy.entities_at(coord, Truck):
+        tx, ty = axial_to_pixel(coord[0], coord[1], origin=origin)
+        if (x - tx) ** 2 + (y - ty) ** 2 <= 16 ** 2:
+            return t.id
     return None
 
 
@@ -179,12 +176,13 @@ def demo():
                     running = False
             elif ev.type == pygame.MOUSEBUTTONDOWN:
                 if ev.button == 1:
-                    tid = find_truck_at(players, ev.pos)
+                    tid = find_truck_at(board_map, ev.pos)
                     selected = tid
 
         screen.fill(BG)
         # draw map via small copy of draw_map to keep demo self-contained
-        for (q, r), h in board_map._hexes.items():
+        for h in board_map.hexes():
+            q, r = h.q, h.r
             cx, cy = axial_to_pixel(q, r)
             corners = hex_corners(cx, cy)
             if (q, r) == (0, 0):
@@ -194,7 +192,7 @@ def demo():
             pygame.draw.polygon(screen, color, corners)
             pygame.draw.polygon(screen, (40, 40, 50), corners, 2)
 
-        draw_trucks(screen, players, selected_id=selected)
+        draw_trucks(screen, board_map, selected_id=selected)
 
         # HUD
         font = pygame.font.SysFont(None, 20)
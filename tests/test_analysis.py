@@ -0,0 +1,87 @@
+import numpy as np
+
+from board import analysis, scenario
+from board.analysis import AttritionTable, estimate_win_probability, solve, transitions, wilson_interval
+from board.game_engine import GameEngine
+
+
+def test_transitions_match_engine_rounds():
+    state = (9, 7, 5, 4)
+    dist = transitions(state)
+    assert abs(sum(dist.values()) - 1.0) < 1e-12
+    for roll in (0.01, 0.3, 0.6, 0.99):
+        board_map, players = scenario.standard_game()
+        own, enemy = players["p1"], players["p2"]
+        own.soldiers, enemy.soldiers, own.ammo, own.food = state
+        enemy.ammo = enemy.food = 1000
+        engine = GameEngine(board_map, players, rng=lambda: roll)
+        engine.queue_attack("p1", "p2", min(own.soldiers, own.ammo))
+        engine.queue_attack("p2", "p1", enemy.soldiers)
+        engine.run_round()
+        assert (own.soldiers, enemy.soldiers, own.ammo, own.food) in dist
+
+
+def test_solution_satisfies_bellman_equations():
+    table = solve(6, 6, 6, 6)
+    assert table.win_probability(3, 0, 0, 0) == 1.0
+    assert table.loss_probability(0, 3, 5, 5) == 1.0
+    assert table.expected_rounds(0, 3, 5, 5) == 0.0
+    s = (5, 4, 6, 3)
+    dist = transitions(s)
+    assert np.isclose(table.win[s], sum(p * table.win[n] for n, p in dist.items()))
+    assert np.isclose(table.rounds[s], 1 + sum(p * table.rounds[n] for n, p in dist.items()))
+    total = table.win + table.draw
+    assert (total <= 1 + 1e-9).all()
+
+
+def test_save_and_load(tmp_path):
+    table = solve(4, 4, 4, 4, own_first=False)
+    path = tmp_path / "attrition.npz"
+    table.save(str(path))
+    loaded = AttritionTable.load(str(path))
+    assert loaded.own_first is False
+    assert np.array_equal(loaded.win, table.win)
+    assert np.array_equal(loaded.rounds, table.rounds)
+
+
+def test_lookup_grows_the_memoized_table():
+    analysis._table.clear()
+    p = analysis.win_probability(4, 2, 4, 4)
+    assert analysis.lookup((3, 2, 1, 1)).shape == (5, 3, 5, 5)
+    analysis.win_probability(2, 5, 1, 1)
+    assert analysis.lookup((0, 0, 0, 0)).shape == (5, 6, 5, 5)
+    assert analysis.win_probability(4, 2, 4, 4) == p
+
+
+def _engine(**soldiers):
+    board_map, players = scenario.standard_game()
+    for pid, n in soldiers.items():
+        players[pid].soldiers = n
+    return GameEngine(board_map, players)
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high
+    assert np.isclose((low + high) / 2, 0.5)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_estimate_is_reproducible_and_leaves_engine_alone():
+    engine = _engine()
+    snap = engine.snapshot()
+    kwargs = dict(policies=("aggressive", "passive"), max_rounds=20, chunk_size=10, tolerance=0.0)
+    serial = estimate_win_probability(engine, 40, workers=1, **kwargs)
+    parallel = estimate_win_probability(engine, 40, workers=2, **kwargs)
+    assert serial == parallel
+    assert serial.playouts == 40
+    assert serial.low <= serial.probability <= serial.high
+    assert engine.snapshot() == snap
+
+
+def test_estimate_stops_early():
+    engine = _engine(p2=1)
+    est = estimate_win_probability(engine, 1000, policies=("aggressive", "passive"), max_rounds=20,
+                                   chunk_size=10, tolerance=0.1)
+    assert est.playouts < 1000
+    assert est.probability > 0.8
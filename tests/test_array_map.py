@@ -0,0 +1,67 @@
+import pytest
+from board.map import Map, ArrayMap
+from board.engineering import start_upgrade, advance_upgrades
+from board.entities import Engineer, Frontline
+from board.pathfinding import find_path
+
+
+def test_array_map_get_and_neighbors():
+    m = ArrayMap(-2, 2, -2, 2)
+    m.add_hex(0, 0)
+    m.add_hex(1, 0)
+    m.add_hex(0, 1, terrain="forest")
+    assert len(m) == 3
+    assert m.get_hex(5, 5) is None
+    assert m.get_hex(-1, 0) is None
+    ids = {h.id for h in m.neighbors(0, 0)}
+    assert ids == {(1, 0), (0, 1)}
+    assert m.get_hex(0, 1).terrain == "forest"
+
+
+def test_array_map_views_write_through():
+    m = ArrayMap(0, 3, 0, 3)
+    m.add_hex(1, 1)
+    h = m.get_hex(1, 1)
+    h.road_upgraded = True
+    again = m.get_hex(1, 1)
+    assert again.road_upgraded is True
+    assert again == h
+    with pytest.raises(ValueError):
+        m.add_hex(4, 0)
+
+
+def test_array_map_upgrades_and_pathfinding():
+    m = ArrayMap(0, 3, 0, 2)
+    for q in range(0, 4):
+        for r in range(0, 3):
+            m.add_hex(q, r)
+    start_upgrade(m, Engineer(id="e1", owner_id="p1", position="1,0"), 1, 0)
+    advance_upgrades(m)
+    assert m.get_hex(1, 0).road_upgraded is True
+    res = find_path(m, (0, 0), (3, 0))
+    assert res["path"][-1] == (3, 0)
+
+
+def test_from_map_copies_state():
+    src = Map()
+    src.add_hex(0, 0)
+    src.add_hex(2, -1, terrain="hill")
+    src.get_hex(2, -1).road_upgraded = True
+    src.occupancy.place(Frontline(id="frontline", owner_id="neutral"))
+    m = ArrayMap.from_map(src)
+    assert len(m) == 2
+    assert {(h.q, h.r) for h in m.hexes()} == {(0, 0), (2, -1)}
+    assert m.get_hex(2, -1).terrain == "hill"
+    assert m.get_hex(2, -1).road_upgraded is True
+    assert [e.id for e in m.occupancy.entities_at((0, 0))] == ["frontline"]
+
+
+def test_array_map_cost_table_matches_dict_map():
+    src = Map()
+    for q in range(0, 4):
+        src.add_hex(q, 0, terrain="offroad" if q == 2 else "plain")
+    src.get_hex(1, 0).road_upgraded = True
+    m = ArrayMap.from_map(src)
+    assert dict(src.cost_table()) == {c: m.cost_table()[c] for c in src.cost_table()}
+    assert (9, 9) not in m.cost_table()
+    assert find_path(m, (0, 0), (3, 0))["cost"] == find_path(src, (0, 0), (3, 0))["cost"]
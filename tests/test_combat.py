@@ -1,4 +1,6 @@
-from board.combat import resolve_attack, success_probability
+import numpy as np
+
+from board.combat import outcome_distribution, resolve_attack, resolve_attacks_batch, success_probability
 
 
 def fixed_rng_success():
@@ -33,3 +35,33 @@ def test_no_ammo():
     res = resolve_attack(5, 3, 0)
     assert res["participating"] == 0
     assert res["ammo_used"] == 0
+
+
+def test_batch_matches_scalar_rules():
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 30, 500)
+    d = rng.integers(0, 30, 500)
+    ammo = rng.integers(0, 30, 500)
+    res = resolve_attacks_batch(a, d, ammo, rng=42)
+    for i in range(500):
+        roll = res["roll"][i]
+        one = resolve_attack(int(a[i]), int(d[i]), int(ammo[i]), rng=lambda: roll)
+        assert one["damage"] == res["damage"][i]
+        assert one["attacker_loss"] == res["attacker_loss"][i]
+        assert one["ammo_used"] == res["ammo_used"][i]
+        assert one["success"] == res["success"][i]
+
+
+def test_batch_is_reproducible():
+    a = resolve_attacks_batch([10] * 100, [8] * 100, [6] * 100, rng=7)
+    b = resolve_attacks_batch([10] * 100, [8] * 100, [6] * 100, rng=np.random.default_rng(7))
+    for key in a:
+        assert np.array_equal(a[key], b[key])
+
+
+def test_outcome_distribution():
+    dist = outcome_distribution(10, 5, 10)
+    p = success_probability(10, 5)
+    assert dist == {(4, 0): p, (0, 1): 1.0 - p}
+    assert outcome_distribution(5, 0, 5) == {(2, 0): 1.0}
+    assert outcome_distribution(5, 5, 0) == {(0, 0): 1.0}
@@ -0,0 +1,56 @@
+from board.map import Map
+from board.cooperative import CooperativePlanner
+from board.pathfinding import find_path
+
+
+def corridor_map():
+    # a one-hex-wide corridor q=1..8 with a wider bay at q=4
+    m = Map()
+    for q in range(1, 9):
+        m.add_hex(q, 0)
+    m.add_hex(4, 1)
+    m.add_hex(3, 1)
+    return m
+
+
+def max_occupancy(planner, m, ticks=64):
+    return max(planner.occupancy((h.q, h.r), t) for h in m.hexes() for t in range(1, ticks))
+
+
+def test_routes_respect_stack_limit():
+    m = corridor_map()
+    planner = CooperativePlanner(m, stack_limit=1)
+    routes = planner.plan_all({
+        "a": ((1, 0), (8, 0)),
+        "b": ((2, 0), (7, 0)),
+        "c": ((3, 0), (6, 0)),
+    })
+    assert all(r is not None for r in routes.values())
+    assert routes["a"]["path"][-1] == (8, 0)
+    assert max_occupancy(planner, m) <= 1
+
+
+def test_single_truck_matches_find_path_cost():
+    m = corridor_map()
+    planner = CooperativePlanner(m)
+    res = planner.plan("a", (1, 0), (8, 0))
+    assert res["cost"] == find_path(m, (1, 0), (8, 0))["cost"]
+
+
+def test_replan_keeps_other_reservations():
+    m = corridor_map()
+    planner = CooperativePlanner(m, stack_limit=1)
+    planner.plan_all({"a": ((1, 0), (8, 0)), "b": ((2, 0), (7, 0))})
+    kept = planner.schedule("a")
+    res = planner.plan("b", (2, 0), (4, 1))
+    assert res["path"][-1] == (4, 1)
+    assert planner.schedule("a") is kept
+    assert max_occupancy(planner, m) <= 1
+
+
+def test_blocked_goal_holds_start():
+    m = corridor_map()
+    planner = CooperativePlanner(m, stack_limit=1)
+    planner.hold("parked", (8, 0))
+    assert planner.plan("a", (1, 0), (8, 0)) is None
+    assert planner.schedule("a") == [((1, 0), 0)]
@@ -0,0 +1,22 @@
+from board.coords import Coord, as_coord, coord, format_coord, parse_coord
+from board.entities import Truck
+from board.map import Map
+
+
+def test_coords_are_interned_tuples():
+    c = coord(2, -1)
+    assert c is coord(2, -1)
+    assert c == (2, -1) and hash(c) == hash((2, -1))
+    assert (c.q, c.r) == (2, -1)
+    assert parse_coord("2,-1") is c
+    assert format_coord(c) == "2,-1" == str(c)
+    assert as_coord((2, -1)) is c
+
+
+def test_entities_and_hexes_use_coords():
+    t = Truck(id="t1", owner_id="p1", position="3,0")
+    assert isinstance(t.position, Coord) and t.position == (3, 0)
+    m = Map()
+    m.add_hex(3, 0)
+    assert m.get_hex(3, 0).id is t.position
+    assert m.cost_table()[t.position] == m.cost_table()[(3, 0)]
@@ -15,3 +15,14 @@ def test_start_and_complete_upgrade():
     advance_upgrades(m)
     assert h.upgrade_in_progress is False
     assert h.road_upgraded is True
+
+
+def test_completed_upgrade_bumps_map_version():
+    m = Map()
+    m.add_hex(1, 0)
+    version = m.version
+    start_upgrade(m, Engineer(id="e1", owner_id="p1", position="1,0"), 1, 0)
+    assert m.version == version
+    advance_upgrades(m)
+    assert m.version == version + 1
+    assert m.changes_since(version) == [((1, 0), False)]
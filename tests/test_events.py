@@ -0,0 +1,84 @@
+from board import scenario
+from board.events import (AttackResolved, CargoChanged, ChangeTracker, PoolChanged, Restored, StockChanged,
+                          Starvation, TruckMoved, UpgradeCompleted, UpgradeStarted)
+from board.game_engine import GameEngine
+from board.mcts import MCTSPlayer
+
+
+def _engine():
+    board_map, players = scenario.standard_game()
+    return GameEngine(board_map, players, rng=lambda: 0.0)
+
+
+def test_actions_publish_typed_events():
+    engine = _engine()
+    seen = []
+    engine.events.subscribe(seen.append)
+    truck = engine.players["p1"].trucks["p1_t2"]
+    start = truck.position
+    engine.load_truck("p1", "p1_t2", "ammo", 5)
+    engine.queue_move("p1", "p1_t2", [(start[0], start[1] + 1)])
+    engine.start_upgrade("p1", 0, -3)
+    assert seen == [
+        CargoChanged("p1_t2", "ammo", 0, 5),
+        StockChanged("p1_wh", "ammo", 20, 15),
+        TruckMoved("p1_t2", "p1", start, (start[0], start[1] + 1)),
+        UpgradeStarted(0, -3),
+    ]
+
+
+def test_round_events_and_change_set():
+    engine = _engine()
+    tracker = ChangeTracker(engine.events)
+    starving = []
+    engine.events.subscribe(starving.append, Starvation)
+    engine.players["p2"].food = 0
+    engine.start_upgrade("p1", 0, -3)
+    engine.queue_attack("p1", "p2", 10)
+    engine.run_round()
+    changes = tracker.take()
+    assert changes.pools == {"p1", "p2"}
+    assert changes.hexes == {(0, -3)}
+    assert changes.attacks == [AttackResolved("p1", "p2", 10, True, 4, 0)]
+    assert starving == [Starvation("p2", 1)]
+    assert not tracker.take()
+
+
+def test_upgrade_completed_event():
+    engine = _engine()
+    done = []
+    engine.events.subscribe(done.append, UpgradeCompleted, PoolChanged)
+    engine.start_upgrade("p1", 0, -3)
+    engine.run_round()
+    assert UpgradeCompleted(0, -3) in done
+
+
+def test_push_unsubscribe_and_search_are_silent():
+    engine = _engine()
+    seen = []
+    unsubscribe = engine.events.subscribe(seen.append)
+    engine.push(("attack", "p1", "p2", 3))
+    engine.push(("round",))
+    engine.pop()
+    engine.pop()
+    MCTSPlayer(iterations=10, seed=1).search(engine, "p1")
+    assert seen == []
+    unsubscribe()
+    assert not engine.events
+    engine.run_round()
+    assert seen == []
+
+
+def test_restore_marks_everything_changed():
+    engine = _engine()
+    snap = engine.snapshot()
+    tracker = ChangeTracker(engine.events)
+    seen = []
+    engine.events.subscribe(seen.append, Restored)
+    engine.run_round()
+    tracker.take()
+    engine.restore(snap)
+    assert seen == [Restored()]
+    changes = tracker.take()
+    assert changes and changes.everything
+    assert not tracker.take()
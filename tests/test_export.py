@@ -0,0 +1,57 @@
+import csv
+
+import numpy as np
+
+from board import scenario
+from board.export import NO_TRUCK, RoundExporter, load_rounds, round_rows
+from board.game_engine import GameEngine
+from board.sim import run_games
+
+
+def test_round_rows_from_run_round():
+    board_map, players = scenario.standard_game()
+    engine = GameEngine(board_map, players, rng=lambda: 0.0)
+    players["p2"].food = 0
+    engine.queue_attack("p1", "p2", 10)
+    result = engine.run_round()
+    assert result["starvation"] == {"p1": 0, "p2": 1}
+    rows = round_rows(engine, 3, 1, result)
+    p1, p2 = rows
+    assert (p1["game"], p1["round"], p1["player"]) == (3, 1, 0)
+    assert (p1["attack_participating"], p1["attack_success"], p1["attack_damage"]) == (10, 1, 4)
+    assert p2["attack_success"] == -1
+    assert p2["starvation_loss"] == 1
+    assert p2["soldiers"] == players["p2"].soldiers
+    assert tuple(p1["truck_q"]) == tuple(t.position[0] for t in players["p1"].trucks.values())
+
+
+def test_npy_export_streams_in_chunks(tmp_path):
+    path = str(tmp_path / "rounds.npy")
+    with RoundExporter(path, trucks=2, chunk_rows=3) as out:
+        serial = sorted(run_games(5, seed=1, workers=1, max_rounds=20, exporter=out), key=lambda r: r.game)
+    rows = load_rounds(path)
+    assert isinstance(rows, np.memmap)
+    assert len(rows) == 2 * sum(r.rounds for r in serial)
+    assert rows.dtype["truck_q"].shape == (2,)
+    last = rows[rows["game"] == 4][-2:]
+    assert tuple(last["soldiers"]) == (serial[4].final["p1"]["soldiers"], serial[4].final["p2"]["soldiers"])
+
+
+def test_parallel_export_matches_serial(tmp_path):
+    a, b = str(tmp_path / "a.npy"), str(tmp_path / "b.npy")
+    with RoundExporter(a) as out:
+        list(run_games(4, seed=2, workers=1, max_rounds=20, exporter=out))
+    with RoundExporter(b) as out:
+        list(run_games(4, seed=2, workers=2, max_rounds=20, chunk_size=1, exporter=out))
+    key = lambda rows: np.sort(rows, order=["game", "round", "player"])
+    assert np.array_equal(key(load_rounds(a, mmap=False)), key(load_rounds(b, mmap=False)))
+
+
+def test_csv_export(tmp_path):
+    path = str(tmp_path / "rounds.csv")
+    with RoundExporter(path, trucks=6, chunk_rows=4) as out:
+        results = list(run_games(2, seed=3, workers=1, max_rounds=10, exporter=out))
+    with open(path) as f:
+        lines = list(csv.DictReader(f))
+    assert len(lines) == 2 * sum(r.rounds for r in results)
+    assert lines[0]["truck5_q"] == str(NO_TRUCK)
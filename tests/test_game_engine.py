@@ -1,5 +1,5 @@
 from board.map import Map
-from board.entities import PlayerState, Warehouse, Truck
+from board.entities import Frontline, PlayerState, Warehouse, Truck
 from board.game_engine import GameEngine
 
 
@@ -25,6 +25,28 @@ def test_round_flow_and_victory():
     engine.queue_attack("p1", "p2", 3)
     engine.run_round()
     # after round: p1's truck moved, p2 may have lost soldiers
-    assert players["p1"].trucks["t1"].position == "1,0"
+    assert players["p1"].trucks["t1"].position == (1, 0)
     # food was consumed (5 food - 5 soldiers = 0)
     assert players["p1"].food == 0
+
+
+def test_load_and_unload_need_adjacency():
+    m = Map()
+    for q in range(-2, 3):
+        m.add_hex(q, 0)
+    p1 = PlayerState(id="p1", soldiers=5, ammo=0, food=0)
+    p1.warehouses["wh"] = Warehouse(id="wh", owner_id="p1", position="-2,0", stock={"soldiers": 0, "ammo": 4, "food": 0})
+    t = Truck(id="t1", owner_id="p1", position="-1,0", capacity=10)
+    p1.trucks[t.id] = t
+    m.occupancy.place(Frontline(id="frontline", owner_id="neutral"))
+    engine = GameEngine(m, {"p1": p1})
+    # next to both the warehouse and the frontline
+    assert engine.load_truck("p1", "t1", "ammo", 5) is False
+    assert engine.load_truck("p1", "t1", "ammo", 3) is True
+    assert engine.unload_truck("p1", "t1", "ammo", 3) is True
+    assert p1.ammo == 3 and t.cargo["ammo"] == 0
+    engine.load_truck("p1", "t1", "ammo", 1)
+    assert engine.queue_move("p1", "t1", [(-1, 1)]) is False  # off the map
+    m.add_hex(-1, -1)
+    assert engine.queue_move("p1", "t1", [(-1, -1)]) is True
+    assert engine.unload_truck("p1", "t1", "ammo", 1) is False
@@ -0,0 +1,43 @@
+import numpy as np
+
+from board import hexgeom
+from board.map import Map
+
+
+def test_batch_matches_scalar():
+    coords = [(q, r) for q in range(-4, 5) for r in range(-4, 5)]
+    dist = hexgeom.hex_distance_batch((1, -2), coords)
+    assert list(dist) == [hexgeom.hex_distance((1, -2), c) for c in coords]
+    nbrs = hexgeom.neighbors_batch(coords)
+    assert nbrs.shape == (len(coords), 6, 2)
+    assert hexgeom.to_tuples(nbrs[5]) == hexgeom.neighbors(coords[5])
+
+
+def test_ring_and_spiral():
+    for k in range(4):
+        ring = hexgeom.ring((2, -1), k)
+        assert len(ring) == max(1, 6 * k)
+        assert len(set(hexgeom.to_tuples(ring))) == len(ring)
+        assert (hexgeom.hex_distance_batch((2, -1), ring) == k).all()
+    assert len(hexgeom.spiral((0, 0), 3)) == 1 + 3 * 3 * 4
+
+
+def test_pixel_round_trip():
+    coords = hexgeom.spiral((0, 0), 5)
+    pixels = hexgeom.axial_to_pixel_batch(coords, 30, (400, 200))
+    # nudge off-center; any point well inside the hex maps back to it
+    back = hexgeom.pixel_to_axial_batch(pixels + 7, 30, (400, 200))
+    assert np.array_equal(back, coords)
+    x, y = hexgeom.axial_to_pixel(2, -3, 30, (400, 200))
+    assert hexgeom.pixel_to_axial(x, y, 30, (400, 200)) == (2, -3)
+
+
+def test_coords_array_and_within():
+    m = Map()
+    for q in range(-3, 4):
+        for r in range(-3, 4):
+            m.add_hex(q, r)
+    coords = hexgeom.coords_array(m)
+    assert len(coords) == len(m)
+    near = coords[hexgeom.within(coords, (0, 0), 1)]
+    assert sorted(hexgeom.to_tuples(near)) == sorted([(0, 0)] + hexgeom.neighbors((0, 0)))
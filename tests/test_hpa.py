@@ -0,0 +1,57 @@
+import random
+from board.map import Map
+from board.hpa import HierarchicalPathfinder
+from board.pathfinding import find_path, FRONTLINE
+
+
+def make_map(seed, radius=10):
+    rnd = random.Random(seed)
+    m = Map()
+    for q in range(-radius, radius + 1):
+        for r in range(-radius, radius + 1):
+            if rnd.random() < 0.2:
+                continue
+            m.add_hex(q, r).road_upgraded = rnd.random() < 0.3
+    return m, rnd
+
+
+def crossings(hpa, path):
+    return sum(1 for a, b in zip(path, path[1:]) if hpa.cluster_of(a) != hpa.cluster_of(b))
+
+
+def test_hpa_within_bound_and_exact_with_unit_entrances():
+    for seed in range(5):
+        m, rnd = make_map(seed)
+        coords = [(h.q, h.r) for h in m.hexes() if (h.q, h.r) != FRONTLINE]
+        approx = HierarchicalPathfinder(m, cluster_size=4, entrance_width=3)
+        exact = HierarchicalPathfinder(m, cluster_size=4, entrance_width=1)
+        for _ in range(20):
+            start, goal = rnd.choice(coords), rnd.choice(coords)
+            ref = find_path(m, start, goal)
+            got = approx.find_path(start, goal)
+            if ref is None:
+                assert got is None
+                continue
+            assert got["path"][0] == start and got["path"][-1] == goal
+            assert ref["cost"] <= got["cost"] <= ref["cost"] + approx.error_bound(crossings(approx, ref["path"]))
+            assert exact.find_path(start, goal)["cost"] == ref["cost"]
+
+
+def test_hpa_follows_road_upgrades():
+    m = Map()
+    for q in range(1, 13):
+        for r in range(0, 3):
+            m.add_hex(q, r)
+    hpa = HierarchicalPathfinder(m, cluster_size=4, entrance_width=1)
+    before = hpa.find_path((1, 1), (12, 1))
+    assert before["cost"] == find_path(m, (1, 1), (12, 1))["cost"]
+    for q in range(5, 9):
+        m.get_hex(q, 1).road_upgraded = True
+        m.mark_changed(q, 1)
+    ready = set(hpa._intra_ready)
+    hpa._sync()
+    # only the chunks holding the upgraded hexes are dirtied
+    assert hpa._intra_ready == ready - {(1, 0), (2, 0)}
+    assert (0, 0) in hpa._intra_ready
+    after = hpa.find_path((1, 1), (12, 1))
+    assert after["cost"] == find_path(m, (1, 1), (12, 1))["cost"] < before["cost"]
@@ -0,0 +1,84 @@
+import json
+import timeit
+
+from board import instrument, scenario
+from board.game_engine import GameEngine
+from board.movement import move_truck
+from board.pathfinding import find_path
+from board.sim import run_games
+
+
+def test_disabled_records_nothing():
+    instrument.reset()
+    board_map, players = scenario.standard_game()
+    GameEngine(board_map, players).run_round()
+    find_path(board_map, (-3, -7), (3, 6))
+    assert instrument.stats() == {"counters": {}, "timings": {}}
+
+
+def test_disabled_move_truck_has_no_wrapper():
+    # timing is inline, so a disabled call runs a single frame
+    assert not hasattr(move_truck, "__wrapped__")
+    assert not hasattr(find_path, "__wrapped__")
+    board_map, players = scenario.standard_game()
+    truck = players["p1"].trucks["p1_t0"]
+    truck.remaining_mp = 10 ** 9
+    path = [(-3, -5)]
+
+    def wrapped(*args):
+        # what a disabled decorator costs: one extra frame and a flag check
+        if not instrument.STATE.enabled:
+            return move_truck(*args)
+
+    args = (board_map, truck, path)
+    direct = min(timeit.repeat(lambda: move_truck(*args), number=2000, repeat=7))
+    through = min(timeit.repeat(lambda: wrapped(*args), number=2000, repeat=7))
+    assert direct < through
+
+
+def test_phases_and_find_path_are_recorded():
+    board_map, players = scenario.standard_game()
+    engine = GameEngine(board_map, players)
+    with instrument.profiling():
+        engine.queue_move("p1", "p1_t0", [(-3, -5)])
+        engine.run_round()
+        res = find_path(board_map, (-3, -7), (3, 6))
+    assert not instrument.STATE.enabled
+    s = instrument.stats()
+    for name in ("engine.run_round", "engine.process_movement_phase", "engine.process_attack_phase",
+                 "engine.process_food_phase", "engine.check_victory", "movement.move_truck",
+                 "pathfinding.find_path"):
+        assert s["timings"][name]["count"] >= 1, name
+    assert s["counters"]["move_truck.moved"] == 1
+    assert s["counters"]["find_path.nodes_expanded"] >= len(res["path"]) - 1
+    assert s["counters"]["find_path.heap_pushes"] >= s["counters"]["find_path.nodes_expanded"]
+    assert json.loads(instrument.to_json()) == s
+    assert "engine.run_round" in instrument.report()
+
+
+def test_goal_is_not_counted_as_expanded():
+    board_map, _ = scenario.standard_game()
+    with instrument.profiling():
+        res = find_path(board_map, (-3, -7), (-3, -6))
+    assert len(res["path"]) == 2
+    assert instrument.stats()["counters"]["find_path.nodes_expanded"] == 1
+
+
+def test_merge_adds_up():
+    with instrument.profiling():
+        instrument.count("x", 2)
+        instrument.record_time("t", 1000)
+    other = instrument.stats()
+    instrument.merge(other)
+    s = instrument.stats()
+    assert s["counters"]["x"] == 4
+    assert s["timings"]["t"]["count"] == 2
+    assert s["timings"]["t"]["buckets"] == {"10": 2}
+    instrument.reset()
+
+
+def test_worker_profiles_are_merged():
+    with instrument.profiling():
+        list(run_games(4, seed=1, workers=2, max_rounds=10, chunk_size=1))
+    assert instrument.stats()["timings"]["engine.run_round"]["count"] >= 4
+    instrument.reset()
@@ -0,0 +1,88 @@
+import io
+import random
+
+import pytest
+
+from board import scenario
+from board.game_engine import GameEngine
+from board.journal import Journal, _pack_keyframe, _unpack_keyframe
+from board.mcts import MCTSPlayer
+from board.rng import RngService
+from board.sim import SupplyPolicy, aggressive
+
+
+def _record(rounds=12, keyframe_every=4):
+    board_map, players = scenario.standard_game()
+    engine = GameEngine(board_map, players, rng=RngService(8).split("game", 2))
+    out = io.BytesIO()
+    engine.start_journal(out, keyframe_every=keyframe_every)
+    policy = SupplyPolicy()
+    rng = random.Random(1)
+    snaps = [engine.snapshot()]
+    for _ in range(rounds):
+        policy(engine, "p1", rng)
+        aggressive(engine, "p2", rng)
+        engine.start_upgrade("p2", 1, 3)
+        engine.run_round()
+        snaps.append(engine.snapshot())
+    return engine, out.getvalue(), snaps
+
+
+def test_replay_is_exact():
+    _, data, snaps = _record()
+    journal = Journal.read(data)
+    assert journal.rounds == 12
+    assert [k[0] for k in journal.keyframes] == [0, 4, 8, 12]
+    engine = journal.replay(*scenario.standard_game())
+    assert engine.snapshot() == snaps[-1]
+
+
+def test_seek_to_any_round():
+    _, data, snaps = _record()
+    journal = Journal.read(data)
+    for n in range(journal.rounds + 1):
+        engine = journal.replay(*scenario.standard_game(), round=n)
+        assert engine.snapshot() == snaps[n]
+        assert engine.hash == snaps[n].hash
+    with pytest.raises(ValueError):
+        journal.replay(*scenario.standard_game(), round=13)
+
+
+def test_search_is_not_journaled(tmp_path):
+    board_map, players = scenario.standard_game()
+    engine = GameEngine(board_map, players, rng=RngService(1))
+    path = str(tmp_path / "game.bgj")
+    journal = engine.start_journal(path)
+    MCTSPlayer(iterations=10, seed=1)(engine, "p1", random.Random(0))
+    engine.run_round()
+    journal.close()
+    replayed = Journal.read(path).replay(*scenario.standard_game())
+    assert replayed.snapshot() == engine.snapshot()
+
+
+def test_needs_an_rng_service():
+    board_map, players = scenario.standard_game()
+    engine = GameEngine(board_map, players, rng=lambda: 0.5)
+    with pytest.raises(ValueError):
+        engine.start_journal(io.BytesIO())
+
+
+def test_keyframe_round_trips_queues_and_streams():
+    board_map, players = scenario.standard_game()
+    engine = GameEngine(board_map, players, rng=RngService(3))
+    SupplyPolicy()(engine, "p1", random.Random(2))
+    engine.start_upgrade("p1", 1, 0)
+    engine.queue_attack("p1", "p2", 5)
+    engine.movement_queue.append(("p2", "p2_t0", [(1, 4), (1, 3)]))
+    engine.rngs.stream("attack", "p1").draw(7)
+    strings = []
+
+    def sid(s):
+        if s not in strings:
+            strings.append(s)
+        return strings.index(s)
+
+    snap, positions = engine.snapshot(), engine.rngs.positions()
+    data = _pack_keyframe(snap, positions, sid)
+    assert b"soldiers" not in data
+    assert _unpack_keyframe(memoryview(data), strings) == (snap, positions)
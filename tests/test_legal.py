@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from board import scenario
+from board.coords import coord
+from board.game_engine import GameEngine
+
+
+def _engine():
+    board_map, players = scenario.standard_game()
+    return GameEngine(board_map, players, rng=random.Random(1).random)
+
+
+def test_every_action_is_accepted():
+    engine = _engine()
+    actions = list(engine.legal_actions("p1"))
+    assert {a[0] for a in actions} == {"attack", "load", "move", "upgrade"}
+    for action in actions:
+        assert engine.push(action) is not False, action
+        engine.pop()
+
+
+def test_generation_is_lazy():
+    engine = _engine()
+    assert next(engine.legal_actions("p1"))[0] == "attack"
+    assert engine._legal.rebuilds == 0
+
+
+def test_only_the_moved_truck_is_recomputed():
+    engine = _engine()
+    list(engine.legal_actions("p1"))
+    before = engine._legal.rebuilds
+    move = next(a for a in engine.legal_actions("p1") if a[0] == "move")
+    engine.push(move)
+    engine.push(("load", "p1", "p1_t0", "food", 1))
+    actions = list(engine.legal_actions("p1"))
+    assert not any(a[0] == "move" and a[2] == move[2] for a in actions)
+    engine.pop()
+    engine.pop()
+    list(engine.legal_actions("p1"))
+    # the moved truck's list came back from its cached key; nobody else rebuilt
+    assert engine._legal.rebuilds == before
+
+
+def test_unload_offered_next_to_the_frontline():
+    engine = _engine()
+    truck = engine.players["p1"].trucks["p1_t0"]
+    truck.position = coord(1, -1)
+    engine.map.occupancy.place(truck)
+    truck.cargo["ammo"] = 4
+    assert ("unload", "p1", "p1_t0", "ammo", 4) in list(engine.legal_actions("p1"))
+
+
+def test_upgradable_follows_map_changes_without_rescanning(monkeypatch):
+    engine = _engine()
+    first = list(engine._legal.upgradable("p1"))
+    target = first[0]
+    monkeypatch.setattr(engine.map, "hexes", lambda: pytest.fail("upgradable rescanned the map"))
+    engine.push(("upgrade", "p1", *target))
+    assert target not in list(engine._legal.upgradable("p1"))
+    engine.push(("round",))
+    assert list(engine._legal.upgradable("p1")) == first[1:]
+    engine.pop()
+    engine.pop()
+    assert list(engine._legal.upgradable("p1")) == first
+
+
+def test_player_without_warehouse():
+    board_map, players = scenario.standard_game()
+    players["p1"].warehouses.clear()
+    board_map.occupancy.remove("p1_wh")
+    engine = GameEngine(board_map, players, rng=random.Random(1).random)
+    actions = list(engine.legal_actions("p1"))
+    assert {a[0] for a in actions} == {"attack", "move", "upgrade"}
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from board import scenario
+from board.game_engine import GameEngine
+from board.mcts import END, MCTSPlayer, candidate_actions
+from board.sim import SupplyPolicy, play_game
+
+
+def _engine(seed=1):
+    board_map, players = scenario.standard_game()
+    return GameEngine(board_map, players, rng=random.Random(seed).random)
+
+
+def test_candidates_cover_moves_loads_upgrades_and_attacks():
+    engine = _engine()
+    kinds = {a[0] for a in candidate_actions(engine, "p1", SupplyPolicy())}
+    assert {"end", "move", "load", "upgrade", "attack"} <= kinds
+    for action in candidate_actions(engine, "p1", SupplyPolicy()):
+        if action != END:
+            engine.push(action)
+            engine.pop()
+
+
+def test_search_leaves_engine_untouched():
+    engine = _engine()
+    snap = engine.snapshot()
+    stats = MCTSPlayer(iterations=40, seed=3).search(engine, "p1")
+    assert sum(v for v, _ in stats.values()) == 40
+    assert engine.snapshot() == snap
+    assert engine.depth == 0
+
+
+def test_search_is_reproducible():
+    a = MCTSPlayer(iterations=30, seed=5).choose(_engine(), "p1")
+    b = MCTSPlayer(iterations=30, seed=5).choose(_engine(), "p1")
+    assert a == b
+
+
+def test_budget_required():
+    with pytest.raises(ValueError):
+        MCTSPlayer(iterations=None)
+
+
+def test_time_limit_stops_search():
+    stats = MCTSPlayer(iterations=None, time_limit=0.05, seed=1).search(_engine(), "p1")
+    assert sum(v for v, _ in stats.values()) >= 1
+
+
+def test_root_parallel_merges_worker_visits():
+    engine = _engine()
+    with MCTSPlayer(iterations=20, workers=2, seed=1) as player:
+        stats = player.search(engine, "p1")
+    assert sum(v for v, _ in stats.values()) == 20
+
+
+def test_plays_as_sim_policy():
+    res = play_game(0, 11, (lambda: MCTSPlayer(iterations=10), "passive"), max_rounds=2)
+    assert res.rounds == 2
+
+
+def test_player_without_warehouse():
+    board_map, players = scenario.standard_game()
+    players["p1"].warehouses.clear()
+    board_map.occupancy.remove("p1_wh")
+    engine = GameEngine(board_map, players, rng=random.Random(1).random)
+    kinds = {a[0] for a in candidate_actions(engine, "p1", SupplyPolicy())}
+    assert kinds == {"end", "attack", "move"}
@@ -12,8 +12,8 @@ def test_map_neighbors():
     n = m.neighbors(0, 0)
     # neighbors should include (1,0) and (0,1)
     ids = {h.id for h in n}
-    assert "1,0" in ids
-    assert "0,1" in ids
+    assert (1, 0) in ids
+    assert (0, 1) in ids
 
 
 def test_truck_and_player_defaults():
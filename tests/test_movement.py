@@ -1,5 +1,5 @@
 from board.map import Map
-from board.entities import Truck
+from board.entities import Truck, Warehouse
 from board.movement import path_cost, move_truck
 from board import rules
 
@@ -21,7 +21,7 @@ def test_move_truck_success_and_mp_deduction():
     t.remaining_mp = 6
     ok = move_truck(m, t, [(1, 0)])
     assert ok is True
-    assert t.position == "1,0"
+    assert t.position == (1, 0)
     assert t.remaining_mp == 6 - rules.UNUPGRADED_ROAD_COST
 
 
@@ -35,3 +35,39 @@ def test_move_truck_insufficient_mp():
     # path of two tiles costs 4 -> should fail
     ok = move_truck(m, t, [(1, 0), (2, 0)])
     assert ok is False
+
+
+def test_offroad_terrain_costs_more():
+    m = Map()
+    m.add_hex(1, 0)
+    m.add_hex(2, 0, terrain="offroad")
+    assert path_cost(m, [(1, 0), (2, 0)]) == rules.UNUPGRADED_ROAD_COST + rules.OFFROAD_COST
+    assert path_cost(m, [(1, 0), (5, 0)]) is None
+    # the compiled table follows completed upgrades
+    m.get_hex(2, 0).road_upgraded = True
+    m.mark_changed(2, 0)
+    assert path_cost(m, [(2, 0)]) == rules.UPGRADED_ROAD_COST
+
+
+def test_move_truck_cannot_cross_frontline():
+    m = Map()
+    for q in range(-1, 2):
+        m.add_hex(q, 0)
+    t = Truck(id="t1", owner_id="p1", position="-1,0", remaining_mp=6)
+    assert move_truck(m, t, [(0, 0), (1, 0)]) is False
+    assert t.position == (-1, 0)
+    assert t.remaining_mp == 6
+
+
+def test_move_truck_updates_occupancy_and_avoids_warehouses():
+    m = Map()
+    for q in range(0, 3):
+        m.add_hex(q, 0)
+    m.occupancy.place(Warehouse(id="wh", owner_id="p1", position="2,0"))
+    t = Truck(id="t1", owner_id="p1", position="0,0", remaining_mp=6)
+    m.occupancy.place(t)
+    assert move_truck(m, t, [(1, 0)]) is True
+    assert m.occupancy.position_of("t1") == (1, 0)
+    assert m.occupancy.entities_at((0, 0)) == []
+    assert move_truck(m, t, [(2, 0)]) is False
+    assert [e.id for e in m.occupancy.entities_adjacent((1, 0), Warehouse)] == ["wh"]
@@ -0,0 +1,27 @@
+from board.occupancy import OccupancyIndex
+from board.entities import Truck, Warehouse
+
+
+def test_place_move_and_remove():
+    idx = OccupancyIndex()
+    t1 = Truck(id="t1", owner_id="p1", position="1,0")
+    t2 = Truck(id="t2", owner_id="p2", position="1,0")
+    wh = Warehouse(id="wh", owner_id="p1", position="2,0")
+    for e in (t1, t2, wh):
+        idx.place(e)
+    assert len(idx) == 3
+    assert [e.id for e in idx.entities_at((1, 0))] == ["t1", "t2"]
+    assert idx.entities_at((1, 0), Warehouse) == []
+    assert [e.id for e in idx.entities_adjacent((1, 0))] == ["wh"]
+
+    idx.place(t1, (3, 0))
+    assert idx.position_of("t1") == (3, 0)
+    assert [e.id for e in idx.entities_at((1, 0))] == ["t2"]
+    assert {e.id for e in idx.entities_adjacent((2, 0), Truck)} == {"t1", "t2"}
+
+    idx.remove("t2")
+    assert "t2" not in idx
+    assert (1, 0) not in set(idx.occupied())
+    copy = idx.copy()
+    idx.remove("t1")
+    assert copy.position_of("t1") == (3, 0)
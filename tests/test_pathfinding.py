@@ -1,5 +1,8 @@
 from board.map import Map
-from board.pathfinding import find_path
+from board.entities import Truck
+from board.pathfinding import (find_path, reachable, path_to, truck_reach, neighbors, PathCache,
+                               DistanceField, find_paths, cost_for_tile, FRONTLINE)
+from board import rules
 
 
 def test_find_path_basic():
@@ -12,3 +15,155 @@ def test_find_path_basic():
     assert res is not None
     assert res["path"][0] == (0, 0)
     assert res["path"][-1] == (3, 0)
+
+
+def test_reachable_matches_find_path():
+    m = Map()
+    for q in range(-3, 4):
+        for r in range(-3, 4):
+            m.add_hex(q, r)
+    m.get_hex(2, -1).road_upgraded = True
+    start = (2, 0)
+    reach = reachable(m, start, 6)
+    assert FRONTLINE not in reach["cost"]
+    for q in range(-3, 4):
+        for r in range(-3, 4):
+            coord = (q, r)
+            res = find_path(m, start, coord)
+            if coord == FRONTLINE:
+                continue
+            if res["cost"] <= 6:
+                assert reach["cost"][coord] == res["cost"]
+                path = path_to(reach, coord)
+                assert path[0] == start and path[-1] == coord
+            else:
+                assert coord not in reach["cost"]
+                assert path_to(reach, coord) is None
+
+
+def test_truck_reach_uses_remaining_mp():
+    m = Map()
+    for q in range(0, 6):
+        m.add_hex(q, 0)
+    t = Truck(id="t1", owner_id="p1", position="1,0", remaining_mp=2)
+    assert set(truck_reach(m, t)["cost"]) == {(1, 0), (2, 0)}
+    t.remaining_mp = 0
+    assert set(truck_reach(m, t)["cost"]) == {(1, 0), (2, 0), (3, 0), (4, 0)}
+
+
+def make_grid(size=6):
+    m = Map()
+    for q in range(0, size):
+        for r in range(0, size):
+            m.add_hex(q, r)
+    return m
+
+
+def test_path_cache_hits_and_misses():
+    m = make_grid()
+    cache = PathCache(m)
+    first = cache.find_path((1, 0), (5, 0))
+    second = cache.find_path((1, 0), (5, 0))
+    assert second is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_path_cache_invalidates_only_affected_entries():
+    m = make_grid()
+    cache = PathCache(m)
+    route = cache.find_path((1, 0), (3, 0))
+    far = cache.find_path((0, 5), (1, 5))
+    assert len(cache) == 2
+    # upgrading a hex on the route drops it, the distant entry survives
+    on_route = route["path"][1]
+    m.get_hex(*on_route).road_upgraded = True
+    m.mark_changed(*on_route)
+    assert cache.find_path((0, 5), (1, 5)) is far
+    assert cache.find_path((1, 0), (3, 0))["cost"] == route["cost"] - 1
+    assert cache.misses == 3
+
+
+def test_path_cache_add_hex_and_lru():
+    m = Map()
+    m.add_hex(1, 0)
+    m.add_hex(3, 0)
+    cache = PathCache(m, maxsize=2)
+    assert cache.find_path((1, 0), (3, 0)) is None
+    m.add_hex(2, 0)
+    assert cache.find_path((1, 0), (3, 0))["path"] == [(1, 0), (2, 0), (3, 0)]
+    cache.find_path((3, 0), (1, 0))
+    cache.find_path((2, 0), (1, 0))
+    assert len(cache) == 2
+    assert ((1, 0), (3, 0)) not in cache._entries
+
+
+def brute_force_cost(m, start, targets):
+    costs = [find_path(m, start, t) for t in targets]
+    costs = [c["cost"] for c in costs if c is not None]
+    return min(costs) if costs else None
+
+
+def test_distance_field_matches_find_path():
+    m = make_grid()
+    field = DistanceField(m, [(5, 5)])
+    for q in range(0, 6):
+        for r in range(0, 6):
+            if (q, r) == FRONTLINE:
+                continue
+            assert field.cost_from((q, r)) == find_path(m, (q, r), (5, 5))["cost"]
+    res = field.path_from((0, 3))
+    assert res["path"][0] == (0, 3) and res["path"][-1] == (5, 5)
+    assert res["cost"] == field.cost_from((0, 3))
+
+
+def test_distance_field_repairs_after_upgrade():
+    m = make_grid()
+    field = DistanceField.to_frontline(m)
+    before = field.cost_from((5, 5))
+    for coord in field.path_from((5, 5))["path"][1:]:
+        m.get_hex(*coord).road_upgraded = True
+        m.mark_changed(*coord)
+    targets = [n for n in neighbors(FRONTLINE) if m.get_hex(*n)]
+    after = field.cost_from((5, 5))
+    assert after < before
+    for q in range(0, 6):
+        for r in range(0, 6):
+            if (q, r) != FRONTLINE:
+                assert field.cost_from((q, r)) == brute_force_cost(m, (q, r), targets)
+
+
+def test_distance_field_follows_added_hexes():
+    m = Map()
+    for q in range(1, 4):
+        m.add_hex(q, 0)
+    field = DistanceField(m, [(6, 0)])
+    assert field.cost_from((1, 0)) is None
+    for q in range(4, 7):
+        m.add_hex(q, 0)
+    assert field.cost_from((1, 0)) == 5 * rules.UNUPGRADED_ROAD_COST
+    assert field.path_from((1, 0))["path"] == [(q, 0) for q in range(1, 7)]
+
+
+def test_find_paths_matches_find_path_loop():
+    import random
+    rnd = random.Random(3)
+    m = Map()
+    for q in range(-5, 6):
+        for r in range(-5, 6):
+            if rnd.random() < 0.15 and (q, r) != (0, 0):
+                continue
+            m.add_hex(q, r).road_upgraded = rnd.random() < 0.3
+    coords = [(h.q, h.r) for h in m.hexes()]
+    goals = rnd.sample(coords, 3) + [FRONTLINE, (9, 9)]
+    requests = [(rnd.choice(coords), rnd.choice(goals)) for _ in range(40)] + [((2, 2), (2, 2))]
+    for workers in (None, 2):
+        batch = find_paths(m, requests, workers=workers)
+        for (start, goal), got in zip(requests, batch):
+            ref = find_path(m, start, goal)
+            if ref is None:
+                assert got is None
+                continue
+            path = got["path"]
+            assert got["cost"] == ref["cost"]
+            assert path[0] == start and path[-1] == goal
+            assert sum(cost_for_tile(m, c) for c in path[1:]) == got["cost"]
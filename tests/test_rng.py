@@ -0,0 +1,36 @@
+import numpy as np
+
+from board.rng import RngService
+from board.sim import play_game, run_games
+
+
+def test_streams_depend_only_on_seed_and_key():
+    a = RngService(5)
+    a.stream("other")
+    x = [a.stream("attack", "p1")() for _ in range(5)]
+    b = RngService(5)
+    assert [b.stream("attack", "p1")() for _ in range(5)] == x
+    assert [b.stream("attack", "p2")() for _ in range(5)] != x
+    assert [RngService(6).stream("attack", "p1")() for _ in range(5)] != x
+
+
+def test_block_size_does_not_change_the_numbers():
+    small = RngService(1, block=3).stream("s")
+    big = RngService(1).stream("s")
+    seq = [small() for _ in range(10)]
+    assert seq == [big() for _ in range(10)]
+    assert np.array_equal(small.draw(7), big.draw(7))
+    assert small() == big()
+
+
+def test_split_services_are_independent():
+    root = RngService(3)
+    g0, g1 = root.split("game", 0), root.split("game", 1)
+    assert g0.stream("x")() != g1.stream("x")()
+    assert RngService(3).split("game", 0).stream("x")() == RngService(3).split("game", 0).stream("x")()
+    assert g0.seed_for("policy") != g1.seed_for("policy")
+
+
+def test_parallel_games_replay_from_their_seed():
+    for res in run_games(4, ("supply", "aggressive"), seed=9, workers=2, max_rounds=30, chunk_size=1):
+        assert play_game(res.game, res.seed, ("supply", "aggressive"), max_rounds=30) == res
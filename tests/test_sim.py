@@ -0,0 +1,69 @@
+from board import scenario
+from board.game_engine import GameEngine
+from board.sim import SupplyPolicy, play_game, run_games
+import random
+
+
+def test_play_game_is_deterministic():
+    a = play_game(0, 1234, ("supply", "aggressive"))
+    b = play_game(0, 1234, ("supply", "aggressive"))
+    assert a == b
+    assert a.rounds >= 1
+    assert a.winner in (None, "p1", "p2")
+
+
+def test_results_do_not_depend_on_worker_count():
+    serial = sorted(run_games(6, seed=7, workers=1, max_rounds=30), key=lambda r: r.game)
+    parallel = sorted(run_games(6, seed=7, workers=2, max_rounds=30, chunk_size=2), key=lambda r: r.game)
+    assert [r.game for r in serial] == list(range(6))
+    assert serial == parallel
+
+
+def test_supply_policy_delivers_to_the_front():
+    board_map, players = scenario.standard_game()
+    engine = GameEngine(board_map, players, rng=lambda: 0.9)
+    delivered = []
+    unload = engine.unload_truck
+
+    def counting_unload(*args):
+        ok = unload(*args)
+        if ok:
+            delivered.append(args)
+        return ok
+
+    engine.unload_truck = counting_unload
+    policy = SupplyPolicy()
+    for _ in range(4):
+        policy(engine, "p1", random.Random(0))
+        engine.run_round()
+    assert delivered
+    assert players["p1"].warehouses["p1_wh"].stock["food"] < 20
+
+
+class Rewind:
+    """Puts the game back to where it first saw it, so rounds repeat."""
+
+    def __init__(self):
+        self.snap = None
+
+    def __call__(self, engine, player_id, rng):
+        if self.snap is None:
+            self.snap = engine.snapshot()
+        elif player_id == "p1":
+            engine.restore(self.snap)
+
+
+def test_repeated_positions_end_in_stalemate():
+    res = play_game(0, 1, (Rewind, "passive"))
+    assert res.stalemate is True
+    assert res.winner is None
+    assert res.rounds == 3
+
+
+def test_supply_policy_without_warehouse():
+    board_map, players = scenario.standard_game()
+    players["p1"].warehouses.clear()
+    board_map.occupancy.remove("p1_wh")
+    engine = GameEngine(board_map, players)
+    SupplyPolicy()(engine, "p1", random.Random(0))
+    assert not engine.moved_this_round
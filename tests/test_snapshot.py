@@ -0,0 +1,52 @@
+from board import scenario
+from board.engineering import start_upgrade, advance_upgrades
+from board.entities import Engineer
+from board.game_engine import GameEngine
+from board.pathfinding import find_path
+
+
+def make_engine():
+    board_map, players = scenario.standard_game()
+    return GameEngine(board_map, players, rng=lambda: 0.1)
+
+
+def test_restore_undoes_play():
+    engine = make_engine()
+    p1 = engine.players["p1"]
+    truck = p1.trucks["p1_t0"]
+    start = truck.position
+    snap = engine.snapshot()
+    assert snap == engine.snapshot()
+
+    dest = find_path(engine.map, start, (start[0], start[1] + 1))["path"][1:]
+    assert engine.queue_move("p1", "p1_t0", dest)
+    engine.load_truck("p1", "p1_t2", "ammo", 2)
+    engine.queue_attack("p1", "p2", 5)
+    engine.run_round()
+    assert engine.snapshot() != snap
+
+    engine.restore(snap)
+    assert engine.snapshot() == snap
+    assert truck.position == start
+    assert engine.map.occupancy.position_of("p1_t0") == start
+    assert p1.soldiers == 20 and engine.players["p2"].soldiers == 20
+    assert engine.attack_queue == [] and not engine.moved_this_round
+
+
+def test_map_state_is_shared_and_restored():
+    engine = make_engine()
+    m = engine.map
+    a = engine.snapshot()
+    assert engine.snapshot().upgrades is a.upgrades
+
+    start_upgrade(m, Engineer(id="e1", owner_id="p1", position=(1, 0)), 1, 0)
+    b = engine.snapshot()
+    advance_upgrades(m)
+    assert m.cost_table()[(1, 0)] == 1
+    engine.restore(b)
+    h = m.get_hex(1, 0)
+    assert h.upgrade_in_progress and not h.road_upgraded
+    assert m.cost_table()[(1, 0)] == 2
+    engine.restore(a)
+    assert not h.upgrade_in_progress
+    assert m.upgrade_state() == ()
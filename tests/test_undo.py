@@ -0,0 +1,69 @@
+import pytest
+
+from board import scenario
+from board.game_engine import GameEngine
+from board.pathfinding import find_path
+
+
+def make_engine():
+    board_map, players = scenario.standard_game()
+    return GameEngine(board_map, players, rng=lambda: 0.1)
+
+
+def test_push_pop_restores_every_level():
+    engine = make_engine()
+    t = engine.players["p1"].trucks["p1_t0"]
+    path = find_path(engine.map, t.position, (t.position[0], t.position[1] + 1))["path"][1:]
+    actions = [
+        ("move", "p1", "p1_t0", path),
+        ("load", "p1", "p1_t2", "ammo", 4),
+        ("upgrade", "p1", 1, 0),
+        ("attack", "p1", "p2", 10),
+        ("attack", "p2", "p1", 5),
+        ("round",),
+        ("resolve_attacks",),
+        ("food",),
+    ]
+    states = []
+    for action in actions:
+        states.append(engine.snapshot())
+        engine.push(action)
+    assert engine.depth == len(actions)
+    assert engine.map.cost_table()[(1, 0)] == 1
+    for expected in reversed(states):
+        engine.pop()
+        assert engine.snapshot() == expected
+    assert engine.map.cost_table()[(1, 0)] == 2
+    assert engine.map.occupancy.position_of("p1_t0") == t.position
+    with pytest.raises(IndexError):
+        engine.pop()
+
+
+def test_push_rejects_unknown_actions():
+    engine = make_engine()
+    with pytest.raises(ValueError):
+        engine.push(("teleport", "p1"))
+    assert engine.depth == 0
+
+
+def test_upgrades_limited_by_engineers():
+    engine = make_engine()
+    engine.players["p1"].engineers = 1
+    assert engine.push(("upgrade", "p1", 1, 0)) is True
+    assert engine.push(("upgrade", "p1", 2, 0)) is False
+    engine.pop()
+    engine.pop()
+    assert engine.push(("upgrade", "p1", 2, 0)) is True
+
+
+def test_round_touches_only_upgrading_hexes(monkeypatch):
+    engine = make_engine()
+    engine.push(("upgrade", "p1", 1, 0))
+    monkeypatch.setattr(engine.map, "hexes", lambda: pytest.fail("round scanned the map"))
+    engine.push(("round",))
+    assert engine.map.get_hex(1, 0).road_upgraded
+    engine.pop()
+    h = engine.map.get_hex(1, 0)
+    assert h.upgrade_in_progress and not h.road_upgraded
+    engine.push(("round",))
+    assert engine.map.get_hex(1, 0).road_upgraded
@@ -0,0 +1,65 @@
+import random
+
+from board import scenario
+from board.game_engine import GameEngine
+from board.pathfinding import find_path
+from board.sim import SupplyPolicy
+from board import zobrist
+from board.zobrist import EngineHasher, zobrist_key
+
+
+def make_engine(seed=0):
+    board_map, players = scenario.standard_game()
+    return GameEngine(board_map, players, rng=random.Random(seed).random)
+
+
+def step_path(engine, truck_id, dr):
+    t = engine.players[truck_id[:2]].trucks[truck_id]
+    return find_path(engine.map, t.position, (t.position[0], t.position[1] + dr))["path"][1:]
+
+
+def test_keys_are_deterministic():
+    assert zobrist_key(("truck", "t1", "position"), (1, 0)) == zobrist_key(("truck", "t1", "position"), (1, 0))
+    assert zobrist_key(("player", "p1", "food"), 0) == 0
+    assert zobrist_key(("player", "p1", "food"), 1) != zobrist_key(("player", "p1", "food"), 2)
+
+
+def test_key_tables_do_not_grow_with_values():
+    zobrist_key(("queued", 0), ("p1", "p1_t0", [(0, 0)]))
+    sizes = len(zobrist._features), len(zobrist._strings)
+    keys = {zobrist_key(("queued", 0), ("p1", "p1_t0", [(q, r) for r in range(q % 5 + 1)]))
+            for q in range(500)}
+    assert len(keys) == 500
+    assert (len(zobrist._features), len(zobrist._strings)) == sizes
+    for n in range(zobrist.KEY_CACHE + 10):
+        zobrist_key(("player", "p1", "food"), n + 1)
+    assert len(zobrist._keys) <= zobrist.KEY_CACHE
+
+
+def test_incremental_hash_matches_full_hash():
+    engine = make_engine()
+    policies = {pid: SupplyPolicy() for pid in engine.players}
+    rng = random.Random(3)
+    engine.push(("upgrade", "p1", 1, 0))
+    for _ in range(6):
+        for pid, policy in policies.items():
+            policy(engine, pid, rng)
+            assert engine.hash == EngineHasher(engine).full_hash()
+        engine.push(("round",))
+        assert engine.hash == EngineHasher(engine).full_hash()
+    start = engine.hash
+    engine.push(("food",))
+    engine.pop()
+    assert engine.hash == start
+
+
+def test_move_order_transpositions_hash_equal():
+    a = make_engine()
+    b = make_engine()
+    a.queue_move("p1", "p1_t0", step_path(a, "p1_t0", 1))
+    a.queue_move("p1", "p1_t4", step_path(a, "p1_t4", 1))
+    b.queue_move("p1", "p1_t4", step_path(b, "p1_t4", 1))
+    b.queue_move("p1", "p1_t0", step_path(b, "p1_t0", 1))
+    assert a.hash == b.hash
+    a.load_truck("p1", "p1_t2", "food", 1)
+    assert a.hash != b.hash